@@ -18,20 +18,27 @@
         - schedule - sets the time every day that the wordle should be solved
         - stats [player] - 
 """
+import asyncio
 import datetime
+import functools
 import os
 import random
-from typing import Dict, List, Tuple
+import time
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Tuple
 
 import discord
 import discord.ext
 import discord.ext.commands
 import discord.ext.tasks
+import feedback
+import metrics
 import pandas as pd
+import requests
 from dotenv import load_dotenv
+from query import load_query_index
 from real_player import RealPlayer
-from word_bank import WordBank
-from tester import Tester
+from sessions import SessionStore
+from sim_service import SimulationService
 
 # Set Discord intents (these are permissions that determine what the bot is allowed to observe)
 intents = discord.Intents.default()
@@ -47,6 +54,9 @@ TIMES = [
     datetime.time(0, tzinfo=LOCAL_TZ)
 ]
 
+NYT_URL = "https://www.nytimes.com/games/wordle/index.html"
+# Daily puzzle details, published by the NYT ahead of each day
+NYT_PUZZLE_URL = "https://www.nytimes.com/svc/wordle/v2/{date:%Y-%m-%d}.json"
 FIRST_WORDLE = datetime.date(2021, 6, 19)
 WORDLE_NUMBER = (datetime.date.today() - FIRST_WORDLE).days
 #############################################
@@ -56,13 +66,49 @@ RTDIR = os.path.dirname(__file__)
 
 load_dotenv(dotenv_path=f"{RTDIR}/.env")
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
+# Optional metrics export: a local port to serve /metrics on, and/or a .prom file to keep updated
+METRICS_PORT = os.getenv("METRICS_PORT")
+METRICS_FILE = os.getenv("METRICS_FILE")
 ###################################################
 
 # Default Channel to execute Wordle commands in
 CTX = None
 DF = pd.DataFrame(columns=["Time", "User", "Times Played", "Average Score", "Success Ratio", "Bot Win Ratio", "Guess 1", "Guess 2", "Guess 3", "Guess 4", "Guess 5", "Guess 6"])
-history: Dict[discord.User, List[Tuple[str, str]]] = {}
+# Every player's game on each puzzle, keyed by (user id, mode)
+sessions = SessionStore()
 solutions: List[str] = ["", "", ""]
+# Plays the bot's own games in worker processes, so the event loop stays responsive
+simulator: SimulationService = None
+
+
+@functools.lru_cache(maxsize=None)
+def read_solutions() -> Tuple[str, ...]:
+    """ Reads the solution list once, for picking random puzzles without loading the solver """
+    with open(f"{RTDIR}/../valid_solutions.csv", encoding="utf-8") as file:
+        return tuple(line.strip() for line in file if line.strip())
+
+
+class Puzzle(NamedTuple):
+    """ A puzzle with the bot's game already played, ready to announce """
+    solution: str
+    # (guess, result code) for every guess the bot played
+    game: List[Tuple[str, int]]
+    # How many options the bot had left after each guess (empty if it was played live)
+    remaining: List[int]
+
+# Puzzles being prepared before they are announced, keyed by (mode, release date)
+upcoming: Dict[Tuple[int, datetime.date], asyncio.Task] = {}
+
+COMMAND_SECONDS = metrics.histogram("wordle_bot_command_seconds", "Time spent handling each command")
+COMMAND_ERRORS = metrics.counter("wordle_bot_command_errors_total", "Commands that failed")
+TASK_SECONDS = metrics.histogram("wordle_bot_task_seconds", "Time each scheduled task took")
+TASK_ERRORS = metrics.counter("wordle_bot_task_errors_total", "Scheduled tasks that failed")
+# These are only read when the metrics are exported
+metrics.gauge("wordle_bot_active_games", "Player games being kept", lambda: len(sessions))
+metrics.gauge("wordle_bot_history_guesses", "Guesses kept across every game", sessions.guess_count)
+metrics.gauge("wordle_bot_upcoming_puzzles", "Puzzles prepared or being prepared", lambda: len(upcoming))
+metrics.gauge("wordle_bot_pending_solves", "Bot games being played by the simulator",
+              lambda: len(simulator.pending) if simulator is not None else 0)
 
 # NOTE: I use commands.Bot because it extends features of the Client to allow things like commands
 # Initialize Discord Bot
@@ -73,39 +119,135 @@ wordle_bot = discord.ext.commands.Bot(
 )
 
 
-def check(guess: str, solution: str) -> str:
-    """ Generates a 'results' string from a guess when the solution is known
+@wordle_bot.before_invoke
+async def start_command_timer(ctx: discord.ext.commands.context.Context):
+    """ Notes when a command started, so its latency can be recorded """
+    ctx.started = time.perf_counter()
+
+@wordle_bot.after_invoke
+async def record_command_time(ctx: discord.ext.commands.context.Context):
+    """ Records how long a command took (this runs even if the command failed) """
+    COMMAND_SECONDS.observe(time.perf_counter() - ctx.started, command=ctx.command.name)
+
+@wordle_bot.listen("on_command_error")
+async def count_command_error(ctx: discord.ext.commands.context.Context, error: Exception):
+    """ Counts failed commands (the default error handler still reports them) """
+    COMMAND_ERRORS.inc(command=ctx.command.name if ctx.command is not None else "unknown",
+                       error=type(error).__name__)
+
+def to_emoji(result) -> str:
+    """ Converts a result code into Discord squares (anything else, like the answer, is kept) """
+    return result if isinstance(result, str) else feedback.to_emoji(result)
+
+def announcement(puzzle: Puzzle) -> str:
+    """ Formats the bot's game for a puzzle like a shared Wordle score
+
+    Args:
+        puzzle (Puzzle): the prepared puzzle
+
+    Returns:
+        str: the message to post
+    """
+    guess_count = len(puzzle.game) if len(puzzle.game) <= 6 else "x"
+    response = f"Wordle {WORDLE_NUMBER:,} {guess_count}/6\n\n"
+    response += "".join(to_emoji(result) + "\n" for _, result in puzzle.game)
+    if puzzle.remaining:
+        response += "Options left: " + " > ".join(f"{count:,}" for count in puzzle.remaining) + "\n"
+    return response
+
+def play_nyt_live() -> Puzzle:
+    """ Plays todays NYT Wordle in the browser (blocking, run it in a thread)
+
+    Returns:
+        Puzzle: the game that was played, the solution is the last guess
+    """
+    game = []
+    with RealPlayer(NYT_URL) as rp:
+        for guess, result in rp.run_generator():
+            game.append((guess, result))
+    return Puzzle(game[-1][0], game, [])
+
+async def prepare_puzzle(solution: str) -> Puzzle:
+    """ Plays the bot's game for a solution in the background
+
+    Args:
+        solution (str): the puzzle solution
+
+    Returns:
+        Puzzle: the solution with the bot's game and candidate curve
+    """
+    game = await simulator.solve(solution)
+    remaining = await simulator.candidate_curve(solution)
+    return Puzzle(solution, game, remaining)
+
+async def prepare_random(date: datetime.date) -> Puzzle:
+    """ Picks a random solution for an afternoon or evening puzzle and plays it
+
+    Args:
+        date (datetime.date): day the puzzle will be released (any day gets a random word)
+
+    Returns:
+        Puzzle: the prepared puzzle
+    """
+    return await prepare_puzzle(random.choice(read_solutions()))
+
+async def prepare_nyt(date: datetime.date) -> Puzzle:
+    """ Looks up the NYT solution for a day and plays it, so nothing is solved at release
+
+    Args:
+        date (datetime.date): day of the puzzle
+
+    Returns:
+        Puzzle: the prepared puzzle, or None if the solution couldn't be looked up yet
+    """
+    try:
+        response = await asyncio.to_thread(requests.get, NYT_PUZZLE_URL.format(date=date), timeout=10)
+        response.raise_for_status()
+        solution = response.json()["solution"].lower()
+    except (requests.RequestException, KeyError, ValueError) as e:
+        print(f"Couldn't look up the NYT solution for {date}: {e}")
+        return None
+    return await prepare_puzzle(solution)
+
+def next_release(mode: int) -> datetime.date:
+    """ Day of the next release of a puzzle mode (today if it hasn't been released yet) """
+    now = datetime.datetime.now(LOCAL_TZ)
+    if now.timetz() < TIMES[mode]:
+        return now.date()
+    return now.date() + datetime.timedelta(days=1)
+
+def schedule_puzzle(mode: int, prepare: Callable[[datetime.date], Awaitable[Puzzle]]):
+    """ Starts preparing the next puzzle of a mode in the background, unless it already is
+
+    Args:
+        mode (int): which puzzle (0, 1, 2 for nyt, afternoon, evening)
+        prepare (Callable): coroutine function that prepares the puzzle for a date
+    """
+    key = (mode, next_release(mode))
+    if key not in upcoming:
+        upcoming[key] = asyncio.create_task(prepare(key[1]))
+
+async def release_puzzle(mode: int, prepare: Callable[[datetime.date], Awaitable[Puzzle]]) -> Puzzle:
+    """ Takes the puzzle that was prepared for today and starts preparing the next one
+
+    The puzzle is only prepared now if it wasn't ahead of time (ex. the bot was just started).
 
     Args:
-        guess (str): the user or system generated guess
-        solution (str): the known solution to the current puzzel iteration
+        mode (int): which puzzle (0, 1, 2 for nyt, afternoon, evening)
+        prepare (Callable): coroutine function that prepares the puzzle for a date
 
     Returns:
-        str: Formatted results string that compares the solution with the guess
+        Puzzle: todays puzzle (or None if it couldn't be prepared)
     """
-    result = "00000"
-
-    # First, eliminate all letters known to be correct, mask the correct letters with whitespace
-    for i in range(5):
-        if guess[i] == solution[i]:
-            result = result[:i] + "2" + result[i+1:]
-            guess = guess[:i] + " " + guess[i+1:]
-            solution = solution[:i] + " " + solution[i+1:]
-        # print(f"{guess=} | {solution=} | {result=}")
-
-    # Next, identify all the characters that are present but not in the correct spot
-    # Doing it this way allows you to identify duplicate letters without looping on confirmed
-    # Additionally, only one "possible" duplicate letter should be marked for each duplicate
-    for i in range(5):
-        if guess[i] != " " and guess[i] in solution:
-            result = result[:i] + "1" + result[i+1:]
-
-            # Replace the character in solution with whitespace to handle duplicates
-            j = solution.index(guess[i])
-            solution = solution[:j] + " " + solution[j+1:]
-        # print(f"{guess=} | {solution=} | {result=}")
-
-    return result
+    today = datetime.date.today()
+    # Drop anything left over from releases that were missed
+    for key in [k for k in upcoming if k[0] == mode and k[1] < today]:
+        upcoming.pop(key).cancel()
+
+    task = upcoming.pop((mode, today), None)
+    puzzle = await task if task is not None else await prepare(today)
+    schedule_puzzle(mode, prepare)
+    return puzzle
 
 @wordle_bot.command()
 async def wordle(ctx: discord.ext.commands.context.Context):
@@ -114,36 +256,17 @@ async def wordle(ctx: discord.ext.commands.context.Context):
     Args:
         ctx (discord.TextChannel): The channel that this was called from
     """
-    url = "https://www.nytimes.com/games/wordle/index.html"
-    first = datetime.date(2021, 6, 19)
-    number = (datetime.date.today() - first).days
-    response = f"Wordle {number:,} #\n\n"
-    guess_count = 0
-
-    # while True:
-    #     try:
-    with RealPlayer(url) as rp:
-        for item in rp.run_generator():
-            line = item[1].replace("2", ":green_square:").replace("1", ":yellow_square:").replace("0", ":black_large_square:")
-            response += line + "\n"
-            guess_count += 1
-
-            if item[1] == "22222" or item[1].isalpha():
-                solutions[0] = item[0]
-                print(solutions)
-
-        if guess_count > 6:
-            guess_count = "x"
-        response = response.replace("#", f"{guess_count}/6")
-        #     break
-        # except:
-        #     pass
-
-    await ctx.send(response)
+    # The browser is blocking, so it is kept off the event loop
+    puzzle = await asyncio.to_thread(play_nyt_live)
+    solutions[0] = puzzle.solution
+    await ctx.send(announcement(puzzle))
 
 
 @wordle_bot.command()
 async def play(ctx: discord.ext.commands.context.Context, word: str, mode: int = 0):
+    # Guesses are checked and scored in lowercase, whatever case they were typed in
+    word = word.lower()
+
     # If the solution is not populated, it must be generated or retrieved
     if solutions[mode] == "":
         match mode:
@@ -152,8 +275,7 @@ async def play(ctx: discord.ext.commands.context.Context, word: str, mode: int =
                 await ctx.message.delete()
                 return
             case _:
-                wb = WordBank()
-                solutions[mode] = wb.get_rand()
+                solutions[mode] = random.choice(read_solutions())
 
     # Check message for errors
     try:
@@ -165,8 +287,8 @@ async def play(ctx: discord.ext.commands.context.Context, word: str, mode: int =
         return
 
     try:
-        wb = WordBank()
-        assert word in wb.original_bank["Words"]
+        # The shared index is built once, not for every message
+        assert word in load_query_index().position
     except AssertionError:
         await ctx.send(f"{ctx.author.mention} Invalid Guess, must be in the wordle database")
         await ctx.message.delete()
@@ -181,37 +303,36 @@ async def play(ctx: discord.ext.commands.context.Context, word: str, mode: int =
         await ctx.message.delete()
         return
 
-    # If the user hasn't guessed today, assign them a spot
-    if ctx.author not in history:
-        history[ctx.author] = []
-    # If they have guessed already, check for victory conditions
-    elif history[ctx.author][len(history[ctx.author]-1)][1] == "22222":
-        await ctx.send(f"{ctx.author.mention} You've already won for the day! Why are you still guessing?")
-        await ctx.message.delete()
-        return
-
-    # Check if the user has exceeded their guess count for the day
-    if len(history[ctx.author]) >= 6:
+    # Only one guess per user is handled at a time, so quick guesses can't skip the checks
+    async with sessions.lock(ctx.author.id):
+        game = sessions.get(ctx.author.id, mode)
+        # If they have guessed already, check for victory conditions
+        if game.solved:
+            await ctx.send(f"{ctx.author.mention} You've already won for the day! Why are you still guessing?")
+            await ctx.message.delete()
+            return
+
+        # Check if the user has exceeded their guess count for the day
+        if len(game) >= 6:
+            try:
+                await ctx.reply("You've exceeded your maximum guesses :(")
+            except discord.errors.HTTPException:
+                await ctx.send(f"{ctx.author.mention} exceeded their maximum guesses :(", ephemeral=True)
+            return
+
+        # Send ephemeral message output of guess
         try:
-            await ctx.reply("You've exceeded your maximum guesses :(")
+            await ctx.reply(f"You played {word}! Only you can see this... (reply)", ephemeral=True)
         except discord.errors.HTTPException:
-            await ctx.send(f"{ctx.author.mention} exceeded their maximum guesses :(", ephemeral=True)
-        return
-
-    # Send ephemeral message output of guess
-    try:
-        await ctx.reply(f"You played {word}! Only you can see this... (reply)", ephemeral=True)
-    except discord.errors.HTTPException:
-        await ctx.send(f"{ctx.author.mention} played {word}! Only you can see this... (send)", ephemeral=True)
+            await ctx.send(f"{ctx.author.mention} played {word}! Only you can see this... (send)", ephemeral=True)
 
-    # Send public message of results
-    result = check(guess=word, solution=solutions[mode])
-    result = result.replace("2", ":green_square:").replace("1", ":yellow_square:").replace("0", ":black_large_square:")
-    history[ctx.author].append((word, result))
-    await ctx.send(f"{ctx.author.mention} Wordle {WORDLE_NUMBER} | Guess {len(history[ctx.author])}: {result}")
+        # Send public message of results
+        result = feedback.check(guess=word, solution=solutions[mode])
+        game.add(word, result)
+        await ctx.send(f"{ctx.author.mention} Wordle {WORDLE_NUMBER} | Guess {len(game)}: {to_emoji(result)}")
 
-    # Delete user message
-    await ctx.message.delete()
+        # Delete user message
+        await ctx.message.delete()
 
 @wordle_bot.command()
 async def stats(ctx: discord.ext.commands.context.Context, user: discord.User=None):
@@ -224,86 +345,101 @@ async def leaderboards(ctx: discord.ext.commands.context.Context, scope: bool=Fa
     await ctx.send(f"Requesting leaderboard stats...")
 
 @wordle_bot.command()
-async def challenge(ctx: discord.ext.commands.context.Context, user: discord.User):
-    await ctx.send(f"{ctx.author.mention} is challenging {user.mention}!")
+async def challenge(ctx: discord.ext.commands.context.Context, user: discord.User = None, mode: int = 1):
+    """ Challenge another player, or the bot itself if no one (or the bot) is mentioned
 
+    Args:
+        ctx (discord.TextChannel): The channel that this was called from
+        user (discord.User, optional): who to challenge. Defaults to the bot.
+        mode (int, optional): which puzzle to compare on (0, 1, 2 for nyt, afternoon, evening). Defaults to 1.
+    """
+    if user is not None and user != wordle_bot.user:
+        await ctx.send(f"{ctx.author.mention} is challenging {user.mention}!")
+        return
 
-@discord.ext.tasks.loop(time=TIMES[0])
-async def wordle_task():
-    """ Play todays Wordle every day at 8am """
-    url = "https://www.nytimes.com/games/wordle/index.html"
-    response = f"Wordle {WORDLE_NUMBER:,} #\n\n"
-    guess_count = 0
+    if mode < 0 or mode >= len(solutions) or solutions[mode] == "":
+        await ctx.send(f"{ctx.author.mention} There is no puzzle to compare on for mode {mode} yet.")
+        return
+
+    # The bot's game is cached per solution, so repeated challenges don't replay it
+    bot_game = await simulator.solve(solutions[mode])
+    user_game = sessions.peek(ctx.author.id, mode)
+    if user_game is None or not user_game.solved:
+        await ctx.send(f"{ctx.author.mention} Solve the puzzle first! The bot took {len(bot_game)} guesses.")
+        return
 
-    with RealPlayer(url) as rp:
-        for item in rp.run_generator():
-            line = item[1].replace("2", ":green_square:").replace("1", ":yellow_square:").replace("0", ":black_large_square:")
-            response += line + "\n"
-            guess_count += 1
+    if len(user_game) < len(bot_game):
+        verdict = "You beat the bot!"
+    elif len(user_game) == len(bot_game):
+        verdict = "It's a tie!"
+    else:
+        verdict = "The bot wins this one."
+    await ctx.send(f"{ctx.author.mention} You: {len(user_game)}/6, Bot: {len(bot_game)}/6. {verdict}")
+
+@wordle_bot.command()
+async def query(ctx: discord.ext.commands.context.Context, *, pattern: str):
+    """ Lists the words that match a pattern (ex. '/query ..ing -s', see query.py for the syntax)
+
+    Args:
+        ctx (discord.TextChannel): The channel that this was called from
+        pattern (str): the query string
+    """
+    try:
+        matches = load_query_index().query(pattern)
+    except ValueError as e:
+        await ctx.send(f"{ctx.author.mention} Invalid query: {e}")
+        return
+
+    # Discord messages are capped at 2000 characters, so only show the first 100 matches
+    shown = ", ".join(matches[:100])
+    more = f" (+{len(matches) - 100} more)" if len(matches) > 100 else ""
+    await ctx.send(f"{ctx.author.mention} {len(matches)} matches for '{pattern}': {shown}{more}")
 
-            if item[1] == "22222" or item[1].isalpha():
-                solutions[0] = item[0]
 
-        if guess_count > 6:
-            guess_count = "x"
-        response = response.replace("#", f"{guess_count}/6")
+@discord.ext.tasks.loop(time=TIMES[0])
+@metrics.timed(TASK_SECONDS, TASK_ERRORS, task="nyt")
+async def wordle_task():
+    """ Post the bot's score on todays Wordle every morning """
+    puzzle = await release_puzzle(0, prepare_nyt)
+    if puzzle is None:
+        # The solution couldn't be looked up ahead of time, so play it live instead
+        puzzle = await asyncio.to_thread(play_nyt_live)
+    solutions[0] = puzzle.solution
 
     for channel in wordle_bot.get_all_channels():
         if channel.name.lower() in ["wordle", "worldle", "nyt"]:
-            await channel.send(response)
+            await channel.send(announcement(puzzle))
 
 @discord.ext.tasks.loop(time=TIMES[1])
+@metrics.timed(TASK_SECONDS, TASK_ERRORS, task="noon")
 async def wordle_noon():
     """ Resets the Noon Wordle at 12pm every day """
-    response = f"Wordle {WORDLE_NUMBER:,} #\n\n"
-    guess_count = 0
-
-    wb = WordBank()
-    solutions[1] = wb.get_rand()
-
-    tester = 
-    # FIXME: Update with Tester Generator for simulated solutions
-    # with RealPlayer(url) as rp:
-    #     for item in rp.run_generator():
-    #         line = item[1].replace("2", ":green_square:").replace("1", ":yellow_square:").replace("0", ":black_large_square:")
-    #         response += line + "\n"
-    #         guess_count += 1
-
-    #     if guess_count > 6:
-    #         guess_count = "x"
-    #     response = response.replace("#", f"{guess_count}/6")
+    # The solution and the bot's game were prepared ahead of time, so this posts right away
+    puzzle = await release_puzzle(1, prepare_random)
+    solutions[1] = puzzle.solution
+    # Games on the previous afternoon puzzle are finished
+    sessions.drop_mode(1)
 
     for channel in wordle_bot.get_all_channels():
         if channel.name.lower() in ["wordle", "worldle", "nyt"]:
             await channel.send("New Afternoon Wordle Available!")
-            await channel.send(response)
+            await channel.send(announcement(puzzle))
 
 @discord.ext.tasks.loop(time=TIMES[2])
+@metrics.timed(TASK_SECONDS, TASK_ERRORS, task="evening")
 async def wordle_evening():
     """ Resets the evening Wordle at 6pm every day """
-    response = f"Wordle {WORDLE_NUMBER:,} #\n\n"
-    guess_count = 0
-
-    wb = WordBank()
-    solutions[2] = wb.get_rand()
-
-    # FIXME: Update with Tester Generator for simulated solutions
-    # with RealPlayer(url) as rp:
-    #     for item in rp.run_generator():
-    #         line = item[1].replace("2", ":green_square:").replace("1", ":yellow_square:").replace("0", ":black_large_square:")
-    #         response += line + "\n"
-    #         guess_count += 1
-
-    #     if guess_count > 6:
-    #         guess_count = "x"
-    #     response = response.replace("#", f"{guess_count}/6")
+    puzzle = await release_puzzle(2, prepare_random)
+    solutions[2] = puzzle.solution
+    sessions.drop_mode(2)
 
     for channel in wordle_bot.get_all_channels():
         if channel.name.lower() in ["wordle", "worldle", "nyt"]:
             await channel.send("New Evening Wordle Available!")
-            await channel.send(response)
+            await channel.send(announcement(puzzle))
 
 @discord.ext.tasks.loop(time=TIMES[3])
+@metrics.timed(TASK_SECONDS, TASK_ERRORS, task="reset")
 async def reset():
     """ Resets everything at midnight """
     global WORDLE_NUMBER
@@ -313,12 +449,33 @@ async def reset():
         if channel.name.lower() in ["wordle", "worldle", "nyt"]:
             await channel.send(f"Resetting the Wordle for Day {WORDLE_NUMBER:,}")
 
-    global history
-    history = {}
+    sessions.clear()
+
+@discord.ext.tasks.loop(seconds=15)
+async def export_metrics():
+    """ Keeps the metrics file up to date for a textfile collector """
+    # Writing the file is blocking I/O, so it is kept off the event loop
+    await asyncio.to_thread(metrics.write_textfile, METRICS_FILE)
 
 @wordle_bot.event
 async def on_ready():
     """ Runs when the DiscordBot has been initialized and is ready """
+    # Start the worker pool for simulated games
+    global simulator
+    if simulator is None:
+        # Every suggestion has to be ready in 2 seconds, whichever method the bot plays
+        simulator = SimulationService(workers=2, budget=2.0)
+    # Build the word index used to check guesses before the first /play needs it
+    await asyncio.to_thread(load_query_index)
+    # Start exporting metrics, if it has been configured
+    if METRICS_PORT and metrics.REGISTRY.server is None:
+        metrics.serve(int(METRICS_PORT))
+    if METRICS_FILE and not export_metrics.is_running():
+        export_metrics.start()
+    # Start preparing the next puzzles, so they are ready before they are announced
+    schedule_puzzle(0, prepare_nyt)
+    schedule_puzzle(1, prepare_random)
+    schedule_puzzle(2, prepare_random)
     # Start the wordle schedule automatically
     if not wordle_task.is_running():
         wordle_task.start()
@@ -331,4 +488,6 @@ async def on_ready():
         activity=discord.Game(name="Today's Wordle")
     )
 
-wordle_bot.run(DISCORD_TOKEN)
+# Worker processes import this module too, so only the main process may start the bot
+if __name__ == "__main__":
+    wordle_bot.run(DISCORD_TOKEN)
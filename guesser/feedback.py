@@ -0,0 +1,89 @@
+""" @file feedback.py
+    @author Sean Duffie
+    @brief Integer result codes, the form a guess's feedback takes everywhere inside the solver
+
+    A result is packed as a base 3 number with the first slot as the most significant digit
+    (0 is grey, 1 is yellow, 2 is green), so "02001" is int("02001", 3) == 55 and a solved
+    game is 242. That is the same value word_index.feedback_matrix produces, so a result can be
+    compared against a column of it or used directly as an index into 243 buckets.
+
+    Strings and emoji only exist at the edges: typed or scraped results are encoded once when
+    they come in, and everything that is shown is decoded from the lookup tables here.
+"""
+from typing import Union
+
+# Result code for "22222", the guess itself was the solution
+SOLVED = 242
+
+# Marks of every code, DIGITS[code][i] is the mark of slot i
+DIGITS = tuple(tuple(code // 3 ** (4 - i) % 3 for i in range(5)) for code in range(243))
+# Result string of every code
+STRINGS = tuple("".join(str(mark) for mark in marks) for marks in DIGITS)
+# Discord squares for every code
+SQUARES = (":black_large_square:", ":yellow_square:", ":green_square:")
+EMOJI = tuple("".join(SQUARES[mark] for mark in marks) for marks in DIGITS)
+
+_CODES = {string: code for code, string in enumerate(STRINGS)}
+
+
+def encode(result: Union[int, str]) -> int:
+    """ Converts a result string ("02001") into its code, codes are passed through
+
+    Args:
+        result (int | str): 5 digits of 0, 1 or 2, or a code that is already encoded
+
+    Raises:
+        ValueError: if the result isn't a valid result
+
+    Returns:
+        int: the result code (0 - 242)
+    """
+    if isinstance(result, str):
+        if result not in _CODES:
+            raise ValueError(f"Invalid result '{result}', must be 5 digits of 0, 1 or 2")
+        return _CODES[result]
+    if not 0 <= result <= SOLVED:
+        raise ValueError(f"Invalid result code {result}, must be 0 - {SOLVED}")
+    return int(result)
+
+
+def decode(code: int) -> str:
+    """ Result string of a code (55 -> "02001") """
+    return STRINGS[code]
+
+
+def to_emoji(code: int) -> str:
+    """ Discord squares of a code """
+    return EMOJI[code]
+
+
+def check(guess: str, solution: str) -> int:
+    """ Generates the result code of a guess when the solution is known
+
+    Greens use up their letter first, then each yellow uses up one of the letters that is
+    left, left to right, so only as many copies of a letter are marked as the solution has.
+
+    Args:
+        guess (str): the user or system generated guess
+        solution (str): the known solution to the current puzzle
+
+    Returns:
+        int: result code of the guess (see the module docstring)
+    """
+    # Solution letters that weren't matched by a green
+    left = [s for g, s in zip(guess, solution) if g != s]
+    code = 0
+    for g, s in zip(guess, solution):
+        code *= 3
+        if g == s:
+            code += 2
+        elif g in left:
+            code += 1
+            left.remove(g)
+    return code
+
+
+if __name__ == "__main__":
+    for GUESS, SOLUTION in [("crane", "react"), ("speed", "abide"), ("eerie", "there"), ("flash", "flash")]:
+        CODE = check(GUESS, SOLUTION)
+        print(f"{GUESS} vs {SOLUTION}: {CODE} {decode(CODE)} {to_emoji(CODE)}")
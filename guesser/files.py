@@ -0,0 +1,21 @@
+""" @file files.py
+    @author Sean Duffie
+    @brief File helpers shared by the modules that write files other processes read
+"""
+import os
+
+
+def write_atomic(path: str, text: str):
+    """ Replaces a file's contents without a reader ever seeing a partly written file
+
+    The text is written next to its destination and then renamed over it, which is atomic as
+    long as both are on the same filesystem.
+
+    Args:
+        path (str): the file to write
+        text (str): its new contents
+    """
+    temp = f"{path}.tmp"
+    with open(temp, "w", encoding="utf-8") as file:
+        file.write(text)
+    os.replace(temp, path)
@@ -0,0 +1,340 @@
+""" @file kernels.py
+    @author Sean Duffie
+    @brief Interchangeable implementations of the solver's hot loops
+
+    Feedback computation, candidate filtering, letter counting and word scoring each have a
+    NumPy implementation (always available), and a numba JIT compiled one that is used when
+    numba is installed. Both work on the WordIndex arrays and give identical results.
+
+    The backend is picked the first time a kernel is used, from the WORDLE_BACKEND environment
+    variable ("auto", "numpy" or "numba", default "auto"), or set with set_backend().
+    verify() checks a backend against plain Python reference implementations (feedback.check
+    for the feedback kernel), and tests/test_kernels.py runs it for every installed backend.
+
+    Example:
+        python kernels.py    prints the active backend, verifies every backend and times them
+"""
+import os
+import random
+import time
+
+import numpy as np
+from feedback import check
+
+
+class NumpyBackend():
+    """ Vectorized NumPy kernels """
+    name = "numpy"
+
+    @staticmethod
+    def feedback_matrix(guesses: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """ Result code of every guess against every target (see word_index.feedback_matrix) """
+        green = guesses[:, None, :] == targets[None, :, :]
+        # Same letter in two slots of the guess, (G, 5, 5)
+        same = guesses[:, :, None] == guesses[:, None, :]
+
+        # How many times each letter appears in each solution, (26, M)
+        counts = np.zeros((26, targets.shape[0]), dtype=np.int8)
+        for k in range(5):
+            np.add.at(counts, (targets[:, k], np.arange(targets.shape[0])), 1)
+
+        result = np.zeros((guesses.shape[0], targets.shape[0]), dtype=np.uint8)
+        for i in range(5):
+            # Start from every copy of this letter in the solution, then take away the ones used up
+            available = counts[guesses[:, i]]
+            for k in range(5):
+                if k < i:
+                    # Earlier copies in the guess use one up, either as a green or as a yellow
+                    available = available - same[:, i, k][:, None]
+                else:
+                    # Later copies in the guess only use one up if they are green
+                    available = available - (green[:, :, k] & same[:, i, k][:, None])
+            yellow = ~green[:, :, i] & (available > 0)
+            result += (2 * green[:, :, i] + yellow).astype(np.uint8) * 3 ** (4 - i)
+        return result
+
+    @staticmethod
+    def constraint_mask(codes: np.ndarray, counts: np.ndarray, slot_allowed: np.ndarray,
+                        min_counts: np.ndarray, max_counts: np.ndarray) -> np.ndarray:
+        """ True for each word that fits the slot and letter count constraints """
+        mask = np.all((counts >= min_counts) & (counts <= max_counts), axis=1)
+        for i in range(5):
+            mask &= slot_allowed[i][codes[:, i]]
+        return mask
+
+    @staticmethod
+    def letter_counts(codes: np.ndarray, weights: np.ndarray) -> tuple:
+        """ Weighted letter statistics of a word list (see WordBank.generate_probs)
+
+        Returns:
+            tuple: (26,) total count, (26,) words containing each letter, (5, 26) count per slot
+        """
+        weights = weights.astype(np.float64)
+        # Flattened word by word, so the weights add up in the same order as a loop over the words
+        letters = codes.ravel()
+        every = np.repeat(weights, 5)
+        # Only the first copy of a letter in each word counts towards containing it
+        first = np.ones(codes.shape, dtype=bool)
+        for i in range(1, 5):
+            first[:, i] = np.all(codes[:, :i] != codes[:, i:i+1], axis=1)
+        first = first.ravel()
+
+        total = np.bincount(letters, weights=every, minlength=26)
+        contains = np.bincount(letters[first], weights=every[first], minlength=26)
+        slots = np.stack([np.bincount(codes[:, i], weights=weights, minlength=26) for i in range(5)])
+        return total, contains, slots
+
+    @staticmethod
+    def slot_scores(codes: np.ndarray, table: np.ndarray, active: np.ndarray) -> np.ndarray:
+        """ Product of table[slot][letter] over the active slots of each word, times 100
+
+        Multiplied one slot at a time in order, so the values match WordBank.solution_odds exactly.
+        """
+        scores = np.full(codes.shape[0], 100.0)
+        for i in range(5):
+            if active[i]:
+                scores *= table[i][codes[:, i]]
+        return scores
+
+
+def _numba_backend():
+    """ Compiles the numba kernels (raises ImportError if numba isn't installed) """
+    import numba
+
+    @numba.njit(cache=True, parallel=True)
+    def feedback_matrix(guesses, targets):
+        result = np.empty((guesses.shape[0], targets.shape[0]), dtype=np.uint8)
+        for g in numba.prange(guesses.shape[0]):
+            available = np.zeros(26, dtype=np.int8)
+            marks = np.zeros(5, dtype=np.uint8)
+            for m in range(targets.shape[0]):
+                for k in range(5):
+                    available[targets[m, k]] += 1
+                    marks[k] = 0
+                # Greens use up their letter first, then yellows take what is left, left to right
+                for k in range(5):
+                    if guesses[g, k] == targets[m, k]:
+                        marks[k] = 2
+                        available[guesses[g, k]] -= 1
+                code = 0
+                for k in range(5):
+                    if marks[k] == 0 and available[guesses[g, k]] > 0:
+                        marks[k] = 1
+                        available[guesses[g, k]] -= 1
+                    code = code * 3 + marks[k]
+                result[g, m] = code
+                for k in range(5):
+                    available[targets[m, k]] = 0
+        return result
+
+    @numba.njit(cache=True)
+    def constraint_mask(codes, counts, slot_allowed, min_counts, max_counts):
+        mask = np.empty(codes.shape[0], dtype=np.bool_)
+        for w in range(codes.shape[0]):
+            ok = True
+            for i in range(5):
+                if not slot_allowed[i, codes[w, i]]:
+                    ok = False
+                    break
+            if ok:
+                for l in range(26):
+                    if counts[w, l] < min_counts[l] or counts[w, l] > max_counts[l]:
+                        ok = False
+                        break
+            mask[w] = ok
+        return mask
+
+    @numba.njit(cache=True)
+    def letter_counts(codes, weights):
+        total = np.zeros(26)
+        contains = np.zeros(26)
+        slots = np.zeros((5, 26))
+        for w in range(codes.shape[0]):
+            weight = float(weights[w])
+            for i in range(5):
+                letter = codes[w, i]
+                total[letter] += weight
+                slots[i, letter] += weight
+                first = True
+                for k in range(i):
+                    if codes[w, k] == letter:
+                        first = False
+                if first:
+                    contains[letter] += weight
+        return total, contains, slots
+
+    @numba.njit(cache=True)
+    def slot_scores(codes, table, active):
+        scores = np.empty(codes.shape[0])
+        for w in range(codes.shape[0]):
+            score = 100.0
+            for i in range(5):
+                if active[i]:
+                    score *= table[i, codes[w, i]]
+            scores[w] = score
+        return scores
+
+    class NumbaBackend():
+        """ JIT compiled kernels, compiled on first use and cached on disk """
+        name = "numba"
+
+    for kernel in [feedback_matrix, constraint_mask, letter_counts, slot_scores]:
+        setattr(NumbaBackend, kernel.__name__, staticmethod(kernel))
+    return NumbaBackend
+
+
+# Backends that can be created, the numba one is only compiled if it is asked for
+BACKENDS = {"numpy": lambda: NumpyBackend, "numba": _numba_backend}
+_ACTIVE = None
+# Backends whose kernels have already run once (see warm_up)
+_WARM = set()
+
+
+def set_backend(name: str = "auto"):
+    """ Chooses which kernels the solver uses
+
+    Args:
+        name (str, optional): "numpy", "numba", or "auto" for numba when it is installed. Defaults to "auto".
+
+    Raises:
+        ValueError: if the backend doesn't exist
+        ImportError: if numba was asked for but isn't installed
+
+    Returns:
+        type: the active backend
+    """
+    global _ACTIVE
+    if name == "auto":
+        try:
+            _ACTIVE = _numba_backend()
+        except ImportError:
+            _ACTIVE = NumpyBackend
+    elif name in BACKENDS:
+        _ACTIVE = BACKENDS[name]()
+    else:
+        raise ValueError(f"Unknown backend '{name}', must be one of {['auto'] + list(BACKENDS)}")
+    return _ACTIVE
+
+
+def backend():
+    """ The active backend, picked from WORDLE_BACKEND the first time it is needed """
+    if _ACTIVE is None:
+        set_backend(os.getenv("WORDLE_BACKEND", "auto"))
+    return _ACTIVE
+
+
+def warm_up(codes: np.ndarray, counts: np.ndarray):
+    """ Runs every kernel of the active backend once on a single word
+
+    The first call of a numba kernel loads it from the disk cache (or compiles it), which can
+    take longer than a whole time budgeted search, so this is done up front. Only the first
+    call for each backend does anything.
+
+    Args:
+        codes (np.ndarray): (N, 5) uint8 letter codes of a word list (see WordIndex)
+        counts (np.ndarray): (N, 26) uint8 letter counts of the same words
+    """
+    kernels = backend()
+    if kernels.name in _WARM:
+        return
+    kernels.feedback_matrix(codes[:1], codes[:1])
+    kernels.constraint_mask(codes[:1], counts[:1], np.ones((5, 26), dtype=bool), np.zeros(26, dtype=np.uint8),
+                            np.full(26, 5, dtype=np.uint8))
+    kernels.letter_counts(codes[:1], np.ones(1))
+    kernels.slot_scores(codes[:1], np.ones((5, 26)), np.ones(5, dtype=bool))
+    _WARM.add(kernels.name)
+
+
+def backend_name() -> str:
+    """ Name of the active backend ("numpy" or "numba") """
+    return backend().name
+
+
+def verify(name: str = None, samples: int = 300, seed: int = 0) -> bool:
+    """ Checks every kernel of a backend against the plain Python reference
+
+    The random words are biased towards repeated letters, where feedback is easiest to get wrong.
+
+    Args:
+        name (str, optional): backend to check. Defaults to the active backend.
+        samples (int, optional): random words to build the checks from. Defaults to 300.
+        seed (int, optional): seed of the random words. Defaults to 0.
+
+    Returns:
+        bool: True if every kernel matched
+    """
+    kernels = backend() if name is None else BACKENDS[name]()
+    rng = random.Random(seed)
+    words = ["".join(rng.choice("aabeeilnorst") for _ in range(5)) for _ in range(samples)]
+    codes = np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8).reshape(-1, 5) - ord("a")
+    counts = np.zeros((samples, 26), dtype=np.uint8)
+    for i in range(5):
+        np.add.at(counts, (np.arange(samples), codes[:, i]), 1)
+    failures = []
+
+    # Feedback
+    expected = np.array([[check(g, t) for t in words] for g in words], dtype=np.uint8)
+    if not np.array_equal(kernels.feedback_matrix(codes, codes), expected):
+        failures.append("feedback_matrix")
+
+    # Filtering, with random constraints
+    slot_allowed = np.array([[rng.random() < 0.8 for _ in range(26)] for _ in range(5)])
+    min_counts = np.array([rng.choice([0, 0, 0, 1, 2]) for _ in range(26)], dtype=np.uint8)
+    max_counts = np.array([rng.choice([1, 2, 5, 5]) for _ in range(26)], dtype=np.uint8)
+    expected = np.array([
+        all(slot_allowed[i][ord(w[i]) - ord("a")] for i in range(5))
+        and all(min_counts[l] <= w.count(chr(ord("a") + l)) <= max_counts[l] for l in range(26))
+        for w in words
+    ])
+    if not np.array_equal(kernels.constraint_mask(codes, counts, slot_allowed, min_counts, max_counts), expected):
+        failures.append("constraint_mask")
+
+    # Letter counts
+    weights = np.array([rng.random() for _ in words])
+    total, contains, slots = np.zeros(26), np.zeros(26), np.zeros((5, 26))
+    for w, weight in zip(words, weights):
+        for i, letter in enumerate(w):
+            total[ord(letter) - ord("a")] += weight
+            slots[i][ord(letter) - ord("a")] += weight
+            if letter not in w[:i]:
+                contains[ord(letter) - ord("a")] += weight
+    result = kernels.letter_counts(codes, weights)
+    if not all(np.array_equal(a, b) for a, b in zip(result, (total, contains, slots))):
+        failures.append("letter_counts")
+
+    # Scoring
+    table = np.array([[rng.random() for _ in range(26)] for _ in range(5)])
+    active = np.array([True, False, True, True, False])
+    expected = []
+    for w in words:
+        score = 100
+        for i in range(5):
+            if active[i]:
+                score *= table[i][ord(w[i]) - ord("a")]
+        expected.append(score)
+    if not np.array_equal(kernels.slot_scores(codes, table, active), np.array(expected)):
+        failures.append("slot_scores")
+
+    if failures:
+        print(f"{kernels.name} backend failed: {failures}")
+    return not failures
+
+
+if __name__ == "__main__":
+    print(f"Active backend: {backend_name()}")
+    from word_index import load_index
+    with open(f"{os.path.dirname(__file__)}/../valid_guesses.csv", encoding="utf-8") as file:
+        INDEX = load_index(tuple(line.strip() for line in file if line.strip()))
+
+    for NAME in BACKENDS:
+        try:
+            KERNELS = BACKENDS[NAME]()
+        except ImportError:
+            print(f"{NAME}: not installed")
+            continue
+        print(f"{NAME}: {'verified' if verify(NAME) else 'FAILED'}")
+        # Warm up (numba compiles on the first call), then time every guess against 2,315 words
+        KERNELS.feedback_matrix(INDEX.codes[:10], INDEX.codes[:10])
+        START = time.perf_counter()
+        KERNELS.feedback_matrix(INDEX.codes, INDEX.codes[:2315])
+        print(f"{NAME}: feedback_matrix {len(INDEX)}x2315 took {time.perf_counter() - START:.3f}s")
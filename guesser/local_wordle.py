@@ -0,0 +1,313 @@
+""" @file local_wordle.py
+    @author Sean Duffie
+    @brief Offline stand-in for the NYT Wordle page
+
+    RealPlayer normally has to be pointed at the live NYT page, which makes the browser path
+    impossible to test or time without a network connection. This module serves a minimal
+    Wordle clone from a local HTTP server that exposes the same DOM hooks RealPlayer relies on:
+        - A "Play" button on the welcome screen
+        - A tutorial modal with the "Modal-module_closeIcon__TcEKb" close icon
+        - 30 "Tile-module_tile__UWEHN" tiles with "1st letter, A, correct" style aria-labels
+        - The "ToastContainer-module_gameToaster__HPkaC" toast container
+
+    The solution and the reveal delay can be set on the server, or overridden per page load
+    with the query string (ex. "/?solution=crane&delay=0.5").
+"""
+import csv
+import http.server
+import json
+import math
+import os
+import re
+import threading
+import time
+import urllib.parse
+
+RTDIR = os.path.dirname(__file__)
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Wordle (Local)</title>
+<style>
+    body { font-family: sans-serif; text-align: center; }
+    .hidden { display: none; }
+    #board { display: grid; grid-template-columns: repeat(5, 52px); gap: 5px; justify-content: center; margin: 20px; }
+    .Tile-module_tile__UWEHN { width: 52px; height: 52px; border: 2px solid #ccc; font-size: 28px; line-height: 52px; text-transform: uppercase; }
+    .correct { background: #6aaa64; color: white; }
+    .present { background: #c9b458; color: white; }
+    .absent { background: #787c7e; color: white; }
+    #ToastContainer-module_gameToaster__HPkaC div { background: black; color: white; display: inline-block; padding: 8px; margin: 4px; }
+</style>
+</head>
+<body>
+<div id="welcome"><h1>Wordle</h1><button type="button">Play</button></div>
+<div id="tutorial" class="hidden">
+    <h2>How To Play</h2>
+    <p>Guess the Wordle in 6 tries.</p>
+    <button type="button" class="Modal-module_closeIcon__TcEKb" aria-label="Close">X</button>
+</div>
+<div id="ToastContainer-module_gameToaster__HPkaC"></div>
+<div id="board"></div>
+<script>
+const SOLUTION = "__SOLUTION__";
+const WORDS = new Set(__WORDS__);
+const REVEAL_MS = __DELAY__;
+const ORDINALS = ["1st", "2nd", "3rd", "4th", "5th"];
+
+let row = 0;
+let entry = "";
+let active = false;
+let busy = false;
+
+const board = document.getElementById("board");
+const toaster = document.getElementById("ToastContainer-module_gameToaster__HPkaC");
+const tiles = [];
+for (let i = 0; i < 30; i++) {
+    const tile = document.createElement("div");
+    tile.className = "Tile-module_tile__UWEHN";
+    tile.setAttribute("aria-label", ORDINALS[i % 5] + " letter, empty");
+    board.appendChild(tile);
+    tiles.push(tile);
+}
+
+document.querySelector("#welcome button").addEventListener("click", () => {
+    document.getElementById("welcome").classList.add("hidden");
+    document.getElementById("tutorial").classList.remove("hidden");
+});
+document.querySelector(".Modal-module_closeIcon__TcEKb").addEventListener("click", () => {
+    document.getElementById("tutorial").classList.add("hidden");
+    active = true;
+});
+
+function toast(text, persist) {
+    const div = document.createElement("div");
+    div.textContent = text;
+    toaster.appendChild(div);
+    if (!persist) {
+        setTimeout(() => div.remove(), 1500);
+    }
+}
+
+function drawEntry() {
+    for (let i = 0; i < 5; i++) {
+        const tile = tiles[row * 5 + i];
+        const letter = entry[i];
+        tile.textContent = letter || "";
+        tile.setAttribute("aria-label", ORDINALS[i] + " letter, " + (letter ? letter.toUpperCase() : "empty"));
+    }
+}
+
+function evaluate(guess) {
+    // Same two pass comparison as feedback.check(), greens first, then yellows
+    const result = ["absent", "absent", "absent", "absent", "absent"];
+    const remaining = SOLUTION.split("");
+    for (let i = 0; i < 5; i++) {
+        if (guess[i] === SOLUTION[i]) {
+            result[i] = "correct";
+            remaining[i] = " ";
+        }
+    }
+    for (let i = 0; i < 5; i++) {
+        if (result[i] !== "correct") {
+            const j = remaining.indexOf(guess[i]);
+            if (j >= 0) {
+                result[i] = "present";
+                remaining[j] = " ";
+            }
+        }
+    }
+    return result;
+}
+
+function submit() {
+    if (entry.length < 5) {
+        toast("Not enough letters", false);
+        return;
+    }
+    if (!WORDS.has(entry)) {
+        toast("Not in word list", false);
+        return;
+    }
+    const guess = entry;
+    const result = evaluate(guess);
+    busy = true;
+    setTimeout(() => {
+        for (let i = 0; i < 5; i++) {
+            const tile = tiles[row * 5 + i];
+            const label = result[i] === "present" ? "present in another position" : result[i];
+            tile.classList.add(result[i]);
+            tile.setAttribute("aria-label", ORDINALS[i] + " letter, " + guess[i].toUpperCase() + ", " + label);
+        }
+        row += 1;
+        entry = "";
+        busy = false;
+        if (guess === SOLUTION) {
+            active = false;
+            toast("Splendid", true);
+        } else if (row >= 6) {
+            active = false;
+            toast(SOLUTION.toUpperCase(), true);
+        }
+    }, REVEAL_MS);
+}
+
+document.addEventListener("keydown", (event) => {
+    if (!active || busy) {
+        return;
+    }
+    if (event.key === "Enter") {
+        submit();
+    } else if (event.key === "Backspace") {
+        entry = entry.slice(0, -1);
+        drawEntry();
+    } else if (/^[a-zA-Z]$/.test(event.key) && entry.length < 5) {
+        entry += event.key.toLowerCase();
+        drawEntry();
+    }
+});
+</script>
+</body>
+</html>
+"""
+
+
+def read_words(path: str = f"{RTDIR}/../valid_guesses.csv") -> list:
+    """ Reads the list of words that the page will accept as guesses
+
+    Args:
+        path (str, optional): location of the word list. Defaults to valid_guesses.csv.
+
+    Returns:
+        list: every valid 5 letter guess
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        return [row[0] for row in csv.reader(file) if row]
+
+
+class LocalWordle():
+    """ Serves the stand-in Wordle page on a background thread
+
+        Works as a context manager, so that a RealPlayer can be pointed at it the same way
+        that it would be pointed at the NYT page:
+
+            with LocalWordle(solution="watch") as site:
+                with RealPlayer(site.url) as rp:
+                    print(list(rp.run_generator()))
+    """
+    def __init__(self, solution: str = "crane", delay: float = 2.0, port: int = 0):
+        """ Constructor for the local Wordle server
+
+        Args:
+            solution (str, optional): default solution for each page load. Defaults to "crane".
+            delay (float, optional): seconds between pressing enter and the tiles revealing. Defaults to 2.0.
+            port (int, optional): port to listen on, 0 picks a free one. Defaults to 0.
+        """
+        self.solution = solution.lower()
+        self.delay = delay
+        self.words = read_words()
+
+        # The word list is by far the largest part of the page, so encode it once
+        words_json = json.dumps(self.words)
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            """ Renders the page for every GET request """
+            def do_GET(self):
+                query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+                solution = query.get("solution", [server.solution])[0].lower()
+                # The solution is written into the page's script, so only plain words are allowed
+                if not re.fullmatch("[a-z]{5}", solution):
+                    self.send_error(400, f"Invalid solution '{solution}', must be 5 letters")
+                    return
+                try:
+                    delay = float(query.get("delay", [server.delay])[0])
+                except ValueError:
+                    delay = math.nan
+                if not 0 <= delay <= 60:
+                    self.send_error(400, "Invalid delay, must be 0 - 60 seconds")
+                    return
+
+                body = PAGE.replace("__SOLUTION__", solution)
+                body = body.replace("__DELAY__", str(int(delay * 1000)))
+                body = body.replace("__WORDS__", words_json).encode("utf-8")
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Keep the request log from flooding benchmark output
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self) -> str:
+        """ Address of the Wordle page being served """
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/games/wordle/index.html"
+
+    def game_url(self, solution: str, delay: float = None) -> str:
+        """ Address of a page with a specific solution (and optionally a different reveal delay)
+
+        Args:
+            solution (str): solution for this page load
+            delay (float, optional): reveal delay for this page load. Defaults to the server setting.
+
+        Returns:
+            str: url that can be handed to RealPlayer
+        """
+        query = {"solution": solution}
+        if delay is not None:
+            query["delay"] = delay
+        return f"{self.url}?{urllib.parse.urlencode(query)}"
+
+    def close(self):
+        """ Stops the server and waits for the background thread to exit """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, exception_traceback):
+        self.close()
+
+
+def benchmark(solutions: list, delay: float = 0.1):
+    """ Times complete automated solves against the local page, no network required
+
+    Args:
+        solutions (list): solutions to play, one browser session each
+        delay (float, optional): tile reveal delay for the page and the player. Defaults to 0.1.
+
+    Returns:
+        list: (solution, guesses, seconds) for every game played
+    """
+    # Selenium is only needed for the benchmark, not for serving the page
+    from real_player import RealPlayer
+
+    results = []
+    with LocalWordle(delay=delay) as site:
+        for solution in solutions:
+            start = time.perf_counter()
+            with RealPlayer(site.game_url(solution), reveal_delay=delay + 0.1) as rp:
+                history = list(rp.run_generator())
+            elapsed = time.perf_counter() - start
+
+            results.append((solution, [guess for guess, _ in history], elapsed))
+            print(f"[{solution=}]: Solved in {len(history)} guesses, took {elapsed:.2f} seconds")
+
+    total = sum(result[2] for result in results)
+    print(f"Played {len(results)} games in {total:.2f} seconds ({total / max(len(results), 1):.2f} per game)")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark(["boxer", "watch", "hound", "crane"])
@@ -0,0 +1,168 @@
+""" @file lookahead.py
+    @author Sean Duffie
+    @brief Two move (2-ply) lookahead guessing
+
+    The other methods only look at what a guess does right now. This scores the best few
+    guesses by what is left after the best possible follow-up in each of their result buckets,
+    so a guess that can't be the solution still wins if it sets up a much better second guess.
+
+    Score of a guess (lower is better): the expected number of options left after it and the
+    best follow-up, where a follow-up leaves sum(size^2) / N options in expectation (minus the
+    bucket where the follow-up was the solution).
+
+    Every follow-up is compared against every candidate once, in one batched feedback matrix.
+    Each bucket then only reads its own columns out of it, and buckets that hold exactly the
+    same candidates (common between similar guesses) are only scored once.
+"""
+import time
+from typing import Tuple
+
+import numpy as np
+from feedback import SOLVED
+from minimax import obvious_guess
+from word_index import WordIndex, feedback_matrix, partition_sizes
+
+
+def expected_left(sizes: np.ndarray) -> np.ndarray:
+    """ Total options left over all solutions for each guess, given its bucket sizes
+
+    Args:
+        sizes (np.ndarray): (G, 243) bucket sizes
+
+    Returns:
+        np.ndarray: sum(size^2) for each guess, not counting the solved bucket
+    """
+    return (sizes ** 2).sum(axis=1) - sizes[:, SOLVED]
+
+
+def bucket_sizes(codes: np.ndarray) -> np.ndarray:
+    """ Bucket sizes of each row of a result code matrix
+
+    Args:
+        codes (np.ndarray): (G, M) result codes
+
+    Returns:
+        np.ndarray: (G, 243) bucket sizes
+    """
+    rows = codes.shape[0]
+    flat = codes.astype(np.int64) + 243 * np.arange(rows)[:, None]
+    return np.bincount(flat.ravel(), minlength=243 * rows).reshape(rows, 243)
+
+
+def two_ply_guess(index: WordIndex, candidates: np.ndarray, pool: np.ndarray = None, top: int = 10,
+                  breadth: int = 100, budget: float = None) -> int:
+    """ Picks the guess with the fewest expected options left after the best follow-up
+
+    Args:
+        index (WordIndex): index of the word list
+        candidates (np.ndarray): rows of the index that could still be the solution
+        pool (np.ndarray, optional): rows of the index that may be guessed. Defaults to every word.
+        top (int, optional): first guesses to look ahead from (the best by one move). Defaults to 10.
+        breadth (int, optional): best one move guesses that are also tried as follow-ups, on
+                                    top of the candidates themselves. Defaults to 100.
+        budget (float, optional): seconds to spend looking ahead, the best first guess is
+                                    always checked. Defaults to no limit, so the same position
+                                    always gets the same guess on any machine.
+
+    Returns:
+        int: row of the best guess
+    """
+    # The budget only limits the lookahead, the one move ranking always finishes
+    deadline = time.perf_counter() + budget if budget is not None else None
+    return _two_ply(index, candidates, pool, top, breadth, None, deadline)[0]
+
+
+def two_ply_search(index: WordIndex, candidates: np.ndarray, pool: np.ndarray = None, top: int = 10,
+                   breadth: int = 100, deadline: float = None) -> Tuple[int, bool]:
+    """ two_ply_guess() that stops everything at a deadline, for callers that can't wait
+
+    The one move ranking is also cut short (scoring the possible solutions first, see
+    minimax.rank_guesses), so on early turns with a lot of options this may only get that far.
+
+    Args:
+        index (WordIndex): index of the word list
+        candidates (np.ndarray): rows of the index that could still be the solution
+        pool (np.ndarray, optional): rows of the index that may be guessed. Defaults to every word.
+        top (int, optional): first guesses to look ahead from. Defaults to 10.
+        breadth (int, optional): one move guesses also tried as follow-ups. Defaults to 100.
+        deadline (float, optional): time.perf_counter() to stop at. Defaults to no limit.
+
+    Returns:
+        tuple: (row of the best guess found, whether the search finished before the deadline)
+    """
+    return _two_ply(index, candidates, pool, top, breadth, deadline, deadline)
+
+
+def _two_ply(index: WordIndex, candidates: np.ndarray, pool: np.ndarray, top: int, breadth: int,
+             rank_deadline: float, look_deadline: float) -> Tuple[int, bool]:
+    """ Shared search of two_ply_guess() and two_ply_search()
+
+    Args:
+        rank_deadline (float): time.perf_counter() to stop the one move ranking at, or None
+        look_deadline (float): time.perf_counter() to stop looking ahead at, or None
+
+    Returns:
+        tuple: (row of the best guess found, whether the search finished before the deadlines)
+    """
+    guess = obvious_guess(candidates)
+    if guess is not None:
+        return guess, True
+    if pool is None:
+        pool = np.arange(len(index))
+    targets = index.codes[candidates]
+
+    # One move: rank every guess by the options it leaves, preferring possible solutions on ties.
+    # Possible solutions are scored first, in case the ranking is cut short (this doesn't change
+    # the order, they win ties anyway)
+    is_candidate = np.isin(pool, candidates)
+    if rank_deadline is not None:
+        pool = np.concatenate([pool[is_candidate], pool[~is_candidate]])
+        is_candidate = np.sort(is_candidate)[::-1]
+    sizes = partition_sizes(index.codes[pool], targets, deadline=rank_deadline)
+    exhaustive = sizes.shape[0] == pool.size
+    pool, is_candidate = pool[:sizes.shape[0]], is_candidate[:sizes.shape[0]]
+    one_move = expected_left(sizes)
+    order = pool[np.lexsort((~is_candidate, one_move))]
+    first = order[:top]
+    # Out of time already, the best by one move is what the lookahead would have returned anyway
+    if look_deadline is not None and time.perf_counter() > look_deadline:
+        return int(first[0]), False
+
+    # Every follow-up against every candidate, shared by the buckets of every first guess
+    follow = np.unique(np.concatenate([candidates, order[:breadth]]))
+    follow_codes = feedback_matrix(index.codes[follow], targets)
+    first_codes = feedback_matrix(index.codes[first], targets)
+
+    memo = {}
+    def best_follow_up(columns: np.ndarray) -> int:
+        """ Options left (summed over the bucket) after the best follow-up for a bucket """
+        if columns.size <= 2:
+            # Guess one of them, the other one is left over if that was wrong
+            return columns.size - 1
+        key = columns.tobytes()
+        if key not in memo:
+            memo[key] = int(expected_left(bucket_sizes(follow_codes[:, columns])).min())
+        return memo[key]
+
+    best, best_score = int(first[0]), None
+    for rank, guess in enumerate(first):
+        if rank > 0 and look_deadline is not None and time.perf_counter() > look_deadline:
+            exhaustive = False
+            break
+        codes = first_codes[rank]
+        score = 0
+        for code in np.unique(codes):
+            if code != SOLVED:
+                score += best_follow_up(np.flatnonzero(codes == code))
+        if best_score is None or score < best_score:
+            best, best_score = int(guess), score
+    return best, exhaustive
+
+
+if __name__ == "__main__":
+    from word_bank import WordBank
+    wb = WordBank()
+    wb.submit_guess("flash", "00100", "slo")
+    START = time.perf_counter()
+    GUESS = two_ply_guess(wb.index, wb.word_bank["Row"].to_numpy())
+    print(f"Two move guess after flash 00100: {wb.index.words[GUESS]} ({time.perf_counter() - START:.3f}s)")
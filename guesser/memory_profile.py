@@ -0,0 +1,120 @@
+""" @file memory_profile.py
+    @author Sean Duffie
+    @brief Opt-in memory instrumentation for long simulation runs
+
+    A MemoryProfiler records one row per unit of work (ex. every start word of a permutations
+    run). Each row has the Python heap traced by tracemalloc (current, peak since the last row,
+    and growth since profiling started), the process resident memory and its peak, and the
+    allocation sites that grew the most since the last row.
+
+    If memory is flat, "Growth MB" stops rising after the first few rows and the top sites are
+    small. A steady climb shows up as a growing "Growth MB" with the same sites at the top of
+    every row.
+
+    tracemalloc slows allocation down noticeably, so this is only turned on when asked for.
+
+    Example:
+        profiler = MemoryProfiler()
+        for start_word in start_words:
+            ...
+            profiler.record(start_word)
+        profiler.write("data/permutation_memory/slo.csv")
+"""
+import os
+import tracemalloc
+
+import metrics
+import pandas as pd
+
+MB = 1024 * 1024
+
+
+class MemoryProfiler():
+    """ tracemalloc snapshots and resident memory after each unit of work """
+    def __init__(self, top: int = 5, frames: int = 1):
+        """ Starts tracing allocations (stop() ends it)
+
+        Args:
+            top (int, optional): allocation sites to keep for each row. Defaults to 5.
+            frames (int, optional): stack frames kept per allocation, more frames point further
+                                    up the call stack but cost more memory. Defaults to 1.
+        """
+        self.top = top
+        self.started = not tracemalloc.is_tracing()
+        if self.started:
+            tracemalloc.start(frames)
+        self.baseline = self.previous = self._snapshot()
+        self.rows = []
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        """ Snapshot of the traced heap, without the profiler's own allocations """
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+    def record(self, label: str) -> dict:
+        """ Adds a row for the work done since the last one
+
+        Args:
+            label (str): what the row is for (ex. the start word)
+
+        Returns:
+            dict: the row that was added
+        """
+        snapshot = self._snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        growth = sum(stat.size_diff for stat in snapshot.compare_to(self.baseline, "filename"))
+        sites = snapshot.compare_to(self.previous, "lineno")[:self.top]
+        self.previous = snapshot
+
+        rss = metrics.resident_memory()
+        peak_rss = metrics.peak_resident_memory()
+        row = {
+            "Label": label,
+            "Traced MB": current / MB,
+            "Peak Traced MB": peak / MB,
+            "Growth MB": growth / MB,
+            "RSS MB": rss / MB if rss is not None else None,
+            "Peak RSS MB": peak_rss / MB if peak_rss is not None else None,
+            "Top Sites": "; ".join(
+                f"{stat.traceback[0].filename.split(os.sep)[-1]}:{stat.traceback[0].lineno} "
+                f"{stat.size_diff / 1024:+.0f} KiB ({stat.count_diff:+d})"
+                for stat in sites
+            ),
+        }
+        self.rows.append(row)
+        return row
+
+    def report(self) -> pd.DataFrame:
+        """ Every row recorded so far """
+        return pd.DataFrame(self.rows)
+
+    def write(self, path: str):
+        """ Saves the rows as a csv (the folder is created if needed)
+
+        Args:
+            path (str): file to write
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.report().to_csv(path, index=False)
+
+    def stop(self):
+        """ Stops tracing, unless it was already running before this profiler started it """
+        if self.started and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    # Memory should level off after the first WordBank, since the index is shared
+    from word_bank import WordBank
+    PROFILER = MemoryProfiler()
+    KEEP = []
+    for GAME in range(5):
+        WB = WordBank()
+        WB.submit_guess("flash", "00100", "slo")
+        KEEP.append(WB.word_bank["Words"].size)
+        PROFILER.record(f"game {GAME}")
+    PROFILER.stop()
+    print(PROFILER.report().to_string())
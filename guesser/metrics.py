@@ -0,0 +1,402 @@
+""" @file metrics.py
+    @author Sean Duffie
+    @brief In-process metrics for the unattended Discord bot
+
+    Counters, gauges and latency histograms are kept in plain dictionaries in the bot's own
+    process, so recording a sample is a dictionary update and a bisect. Nothing is formatted
+    until the metrics are exported in the Prometheus text format, either by writing a file for
+    a node_exporter textfile collector or by serving them on a local HTTP endpoint from a
+    background thread (so a scrape never runs on the event loop).
+
+    Example:
+        GUESSES = metrics.counter("guesses_total", "Guesses played")
+        GUESSES.inc(mode="nyt")
+        with metrics.histogram("solve_seconds", "Time to solve a puzzle").time():
+            ...
+        metrics.serve(9100)
+"""
+import bisect
+import contextlib
+import functools
+import http.server
+import inspect
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, Tuple
+
+from files import write_atomic
+
+# Upper bounds (seconds) of the latency buckets, from a quick command up to a slow browser game
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _label_key(labels: dict) -> Tuple[Tuple[str, str], ...]:
+    """ Turns keyword labels into a hashable key that is the same for any argument order """
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    """ Formats a label key as {name="value",...} (empty when there are no labels) """
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    """ Formats a sample the way Prometheus expects (integers without a trailing .0) """
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric():
+    """ Base for every metric type, holds one value per distinct set of labels """
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str):
+        """ Constructor for a metric
+
+        Args:
+            name (str): metric name (ex. wordle_bot_command_seconds)
+            description (str): help text shown with the exported metric
+        """
+        self.name = name
+        self.description = description
+        self.values: Dict[tuple, object] = {}
+        # Held only long enough to update or copy a value, so the HTTP thread can read safely
+        self.lock = threading.Lock()
+
+    def samples(self) -> list:
+        """ Every (suffix, label key, value) sample of the metric, ready to format
+
+        Returns:
+            list: one tuple per exported line
+        """
+        with self.lock:
+            return [("", key, value) for key, value in self.values.items()]
+
+    def render(self) -> str:
+        """ Formats the metric in the Prometheus text format
+
+        Returns:
+            str: the HELP and TYPE lines followed by every sample
+        """
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, key, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(key)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """ A value that only goes up (commands handled, errors, cache hits) """
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        """ Adds to the counter
+
+        Args:
+            amount (float, optional): how much to add. Defaults to 1.
+            **labels: label values of the sample (ex. command="play")
+        """
+        key = _label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """ A value that can go up and down (active games, memory)
+
+        A gauge can also be given a function, which is only called when the metrics are
+        exported, so values like the size of a dictionary cost nothing to keep up to date.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, fn: Callable[[], float] = None):
+        """ Constructor for a gauge
+
+        Args:
+            name (str): metric name
+            description (str): help text shown with the exported metric
+            fn (Callable, optional): returns the current value at export time. Defaults to None.
+        """
+        super().__init__(name, description)
+        self.fn = fn
+
+    def set(self, value: float, **labels):
+        """ Sets the gauge to a value
+
+        Args:
+            value (float): the new value
+            **labels: label values of the sample
+        """
+        key = _label_key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        """ Adds to the gauge (use a negative amount to subtract) """
+        key = _label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        """ Subtracts from the gauge """
+        self.inc(-amount, **labels)
+
+    def samples(self) -> list:
+        if self.fn is not None:
+            value = self.fn()
+            return [] if value is None else [("", (), value)]
+        return super().samples()
+
+
+class Histogram(Metric):
+    """ Distribution of observed values (latencies), counted into fixed buckets """
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: tuple = DEFAULT_BUCKETS):
+        """ Constructor for a histogram
+
+        Args:
+            name (str): metric name
+            description (str): help text shown with the exported metric
+            buckets (tuple, optional): sorted upper bounds of the buckets. Defaults to DEFAULT_BUCKETS.
+        """
+        super().__init__(name, description)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        """ Records one value
+
+        Args:
+            value (float): the observed value (ex. seconds taken)
+            **labels: label values of the sample
+        """
+        key = _label_key(labels)
+        # Index of the first bucket the value fits in (the extra slot at the end is +Inf)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][slot] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """ Observes how long the body of a with statement takes
+
+        Args:
+            **labels: label values of the sample
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> list:
+        with self.lock:
+            entries = [(key, list(counts), total, count) for key, (counts, total, count) in self.values.items()]
+
+        samples = []
+        for key, counts, total, count in entries:
+            # Exported buckets are cumulative, each one includes every smaller bucket
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket
+                samples.append(("_bucket", key + (("le", _format_value(bound)),), cumulative))
+            samples.append(("_sum", key, total))
+            samples.append(("_count", key, count))
+        return samples
+
+
+class Registry():
+    """ Collection of every metric in the process, and the exporters for them """
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self.lock = threading.Lock()
+        self.server = None
+
+    def _get(self, cls: type, name: str, *args) -> Metric:
+        """ Returns the metric with a name, creating it the first time it is asked for """
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = cls(name, *args)
+            metric = self.metrics[name]
+        if not isinstance(metric, cls):
+            raise ValueError(f"Metric '{name}' is already registered as a {metric.kind}")
+        return metric
+
+    def counter(self, name: str, description: str) -> Counter:
+        """ Gets or creates a counter """
+        return self._get(Counter, name, description)
+
+    def gauge(self, name: str, description: str, fn: Callable[[], float] = None) -> Gauge:
+        """ Gets or creates a gauge (see Gauge for fn) """
+        return self._get(Gauge, name, description, fn)
+
+    def histogram(self, name: str, description: str, buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        """ Gets or creates a histogram """
+        return self._get(Histogram, name, description, buckets)
+
+    def render(self) -> str:
+        """ Formats every metric in the Prometheus text format
+
+        Returns:
+            str: the text exposition of the registry
+        """
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+    def write_textfile(self, path: str):
+        """ Writes the metrics to a file (ex. for the node_exporter textfile collector)
+
+        Args:
+            path (str): where to write the metrics (conventionally ending in .prom)
+        """
+        write_atomic(path, self.render())
+
+    def serve(self, port: int = 9100, host: str = "127.0.0.1") -> http.server.ThreadingHTTPServer:
+        """ Serves the metrics at http://host:port/metrics from a background thread
+
+        Args:
+            port (int, optional): port to listen on. Defaults to 9100.
+            host (str, optional): interface to listen on. Defaults to localhost only.
+
+        Returns:
+            http.server.ThreadingHTTPServer: the running server (call shutdown() to stop it)
+        """
+        registry = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            """ Answers every GET with the current metrics """
+            def do_GET(self):
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Scrapes happen every few seconds, don't print every one
+                pass
+
+        self.server = http.server.ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.server
+
+
+def timed(histogram: Histogram, errors: Counter = None, **labels):
+    """ Decorator that records how long a function (or coroutine) takes
+
+    Args:
+        histogram (Histogram): where the time is recorded
+        errors (Counter, optional): counted when the function raises. Defaults to None.
+        **labels: label values of the samples
+
+    Returns:
+        Callable: the decorator
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with histogram.time(**labels):
+                    try:
+                        return await func(*args, **kwargs)
+                    except Exception:
+                        if errors is not None:
+                            errors.inc(**labels)
+                        raise
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                try:
+                    return func(*args, **kwargs)
+                except Exception:
+                    if errors is not None:
+                        errors.inc(**labels)
+                    raise
+        return wrapper
+    return decorator
+
+
+def _max_rss() -> float:
+    """ Peak resident memory from getrusage(), for platforms without /proc
+
+    Returns:
+        float: peak memory in bytes, or None if it can't be read on this platform
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def resident_memory() -> float:
+    """ Current resident memory of the process in bytes (peak memory where that isn't available)
+
+    Returns:
+        float: memory in bytes, or None if it can't be read on this platform
+    """
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return _max_rss()
+
+
+def peak_resident_memory() -> float:
+    """ Highest resident memory the process has reached, in bytes
+
+    Returns:
+        float: peak memory in bytes, or None if it can't be read on this platform
+    """
+    try:
+        with open("/proc/self/status", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return _max_rss()
+
+
+# The registry shared by everything in the process
+REGISTRY = Registry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+render = REGISTRY.render
+write_textfile = REGISTRY.write_textfile
+serve = REGISTRY.serve
+
+gauge("process_resident_memory_bytes", "Resident memory of the process", resident_memory)
+
+
+if __name__ == "__main__":
+    import urllib.request
+
+    DEMO = histogram("demo_seconds", "Time taken by the demo")
+    for delay in [0.01, 0.02, 0.2]:
+        with DEMO.time(step="sleep"):
+            time.sleep(delay)
+    counter("demo_total", "Demo runs").inc()
+
+    SERVER = serve(0)
+    with urllib.request.urlopen(f"http://127.0.0.1:{SERVER.server_address[1]}/metrics") as response:
+        print(response.read().decode())
+    SERVER.shutdown()
@@ -0,0 +1,204 @@
+""" @file minimax.py
+    @author Sean Duffie
+    @brief Worst case (minimax) guessing and guaranteed depth analysis
+
+    The frequency based methods ('cum', 'uni', 'slo', 'tot') do well on average, but fall apart
+    on words like boxer, watch and hound where several options only differ by one letter. The
+    minimax method instead picks the guess that leaves the fewest options in the worst case,
+    and worst_case_depth() uses the same partitions to prove how many guesses an opener needs
+    in the worst case, without simulating every solution.
+"""
+from typing import Tuple
+
+import numpy as np
+from feedback import SOLVED
+from word_index import WordIndex, feedback_matrix, partition_sizes
+
+
+def obvious_guess(candidates: np.ndarray) -> int:
+    """ The guess to play without searching, if there is one
+
+    With one or two options left, guessing one of them can't be beaten: it either wins now, or
+    leaves the other one to win with next.
+
+    Args:
+        candidates (np.ndarray): rows of the index that could still be the solution
+
+    Returns:
+        int: row of the guess, or None if a search is needed
+    """
+    return int(candidates[0]) if len(candidates) <= 2 else None
+
+
+def rank_guesses(index: WordIndex, candidates: np.ndarray, pool: np.ndarray = None,
+                 deadline: float = None) -> np.ndarray:
+    """ Orders guesses from best to worst by the size of their largest result bucket
+
+    Ties are broken by preferring guesses that could be the solution, then by the smallest
+    expected bucket size.
+
+    Args:
+        index (WordIndex): index of the word list
+        candidates (np.ndarray): rows of the index that could still be the solution
+        pool (np.ndarray, optional): rows of the index that may be guessed. Defaults to every word.
+        deadline (float, optional): time.perf_counter() to stop scoring guesses at. The possible
+                                    solutions are scored first, so there is always a sensible
+                                    answer. Defaults to no limit.
+
+    Returns:
+        np.ndarray: rows of the pool that were scored, best guess first
+    """
+    if pool is None:
+        pool = np.arange(len(index))
+    if deadline is not None:
+        is_candidate = np.isin(pool, candidates)
+        pool = np.concatenate([pool[is_candidate], pool[~is_candidate]])
+    sizes = partition_sizes(index.codes[pool], index.codes[candidates], deadline=deadline)
+    pool = pool[:sizes.shape[0]]
+
+    worst = sizes.max(axis=1)
+    not_candidate = ~np.isin(pool, candidates)
+    expected = (sizes.astype(np.float64) ** 2).sum(axis=1)
+    return pool[np.lexsort((expected, not_candidate, worst))]
+
+
+def minimax_guess(index: WordIndex, candidates: np.ndarray, pool: np.ndarray = None) -> int:
+    """ Picks the guess that minimizes the largest result bucket
+
+    Args:
+        index (WordIndex): index of the word list
+        candidates (np.ndarray): rows of the index that could still be the solution
+        pool (np.ndarray, optional): rows of the index that may be guessed. Defaults to every word.
+
+    Returns:
+        int: row of the best guess
+    """
+    return minimax_search(index, candidates, pool)[0]
+
+
+def minimax_search(index: WordIndex, candidates: np.ndarray, pool: np.ndarray = None,
+                   deadline: float = None) -> Tuple[int, bool]:
+    """ minimax_guess() that stops scoring guesses at a deadline
+
+    Args:
+        index (WordIndex): index of the word list
+        candidates (np.ndarray): rows of the index that could still be the solution
+        pool (np.ndarray, optional): rows of the index that may be guessed. Defaults to every word.
+        deadline (float, optional): time.perf_counter() to stop at (see rank_guesses). Defaults to no limit.
+
+    Returns:
+        tuple: (row of the best guess found, whether every guess in the pool was scored)
+    """
+    guess = obvious_guess(candidates)
+    if guess is not None:
+        return guess, True
+    ranked = rank_guesses(index, candidates, pool, deadline)
+    return int(ranked[0]), len(ranked) == (len(index) if pool is None else len(pool))
+
+
+def split(index: WordIndex, guess: int, candidates: np.ndarray) -> list:
+    """ Groups the candidates by the result they would give for a guess
+
+    Args:
+        index (WordIndex): index of the word list
+        guess (int): row of the guess
+        candidates (np.ndarray): rows of the index that could still be the solution
+
+    Returns:
+        list: arrays of candidate rows, one per result other than "22222", largest first
+    """
+    codes = feedback_matrix(index.codes[guess:guess+1], index.codes[candidates])[0]
+    order = np.argsort(codes, kind="stable")
+    codes, rows = codes[order], candidates[order]
+    bounds = np.flatnonzero(np.diff(codes)) + 1
+    buckets = [
+        bucket for bucket, code in zip(np.split(rows, bounds), codes[np.r_[0, bounds]])
+        if code != SOLVED
+    ]
+    buckets.sort(key=len, reverse=True)
+    return buckets
+
+
+def can_solve(index: WordIndex, candidates: np.ndarray, depth: int, breadth: int = 10,
+              memo: dict = None) -> bool:
+    """ Checks whether every candidate can be guaranteed within a number of guesses
+
+    Only the best few guesses (by largest bucket) are tried at each step, and a guess is
+    abandoned as soon as one of its buckets can't be finished in time. Because a strategy that
+    works is actually found, a True is a real guarantee, a False only means none was found.
+
+    Args:
+        index (WordIndex): index of the word list
+        candidates (np.ndarray): rows of the index that could still be the solution
+        depth (int): number of guesses left
+        breadth (int, optional): how many guesses to try at each step. Defaults to 10.
+        memo (dict, optional): results of previously checked candidate sets. Defaults to None.
+
+    Returns:
+        bool: True if a strategy was found that always finishes within depth guesses
+    """
+    if len(candidates) == 1:
+        return depth >= 1
+    if depth <= 1:
+        return False
+    if len(candidates) == 2:
+        return True
+
+    if memo is None:
+        memo = {}
+    key = (candidates.tobytes(), depth)
+    if key in memo:
+        return memo[key]
+
+    ranked = rank_guesses(index, candidates)
+    solved = False
+    for guess in ranked[:breadth]:
+        buckets = split(index, guess, candidates)
+        # With two guesses left, the next guess has to split everything into single words
+        if depth == 2 and len(buckets[0]) > 1:
+            break
+        if all(can_solve(index, bucket, depth - 1, breadth, memo) for bucket in buckets):
+            solved = True
+            break
+
+    memo[key] = solved
+    return solved
+
+
+def worst_case_depth(index: WordIndex, start: str, candidates: np.ndarray = None, limit: int = 6,
+                     breadth: int = 10):
+    """ Finds the number of guesses an opener can guarantee, no matter what the solution is
+
+    Args:
+        index (WordIndex): index of the word list
+        start (str): the opening guess
+        candidates (np.ndarray, optional): rows that could be the solution. Defaults to every word.
+        limit (int, optional): stop searching past this many guesses. Defaults to 6.
+        breadth (int, optional): how many guesses to try at each step. Defaults to 10.
+
+    Returns:
+        tuple: (guaranteed depth or None if over the limit, size of the largest bucket)
+    """
+    if candidates is None:
+        candidates = np.arange(len(index))
+    buckets = split(index, index.position[start], candidates)
+    if not buckets:
+        return 1, 0
+
+    memo = {}
+    worst = 1
+    for bucket in buckets:
+        # Buckets are largest first, so later ones rarely need more guesses than earlier ones
+        depth = worst
+        while depth < limit and not can_solve(index, bucket, depth, breadth, memo):
+            depth += 1
+        if depth >= limit:
+            return None, len(buckets[0])
+        worst = max(worst, depth)
+    return worst + 1, len(buckets[0])
+
+
+if __name__ == "__main__":
+    from tester import RTDIR, Tester
+    t1 = Tester()
+    t1.worst_cases(["flash", "crane", "slate", "least", "caste"], out=f"{RTDIR}/../data/worst_case_stats.csv")
@@ -0,0 +1,125 @@
+""" @file multi_board.py
+    @author Sean Duffie
+    @brief Solver for multi-board variants (Quordle, Octordle, etc.)
+
+    Running a separate WordBank for each board repeats the filtering and scoring once per board.
+    MultiBoard keeps one shared word index and a candidate array per board instead. Each guess is
+    compared against the union of every board's candidates in one batch, and each board then
+    reads its own columns out of that shared result.
+"""
+import numpy as np
+from feedback import SOLVED
+from word_bank import WordBank
+from word_index import feedback_matrix
+
+
+class MultiBoard():
+    """ Tracks the remaining options for several boards that share every guess """
+    def __init__(self, boards: int = 4, debug: bool = False):
+        """ Constructor for the multi-board solver
+
+        Args:
+            boards (int, optional): how many boards are being played at once. Defaults to 4.
+            debug (bool, optional): print the remaining options after each guess. Defaults to False.
+        """
+        self.debug = debug
+        # The WordBank is only used for its word lists and shared index
+        wb = WordBank()
+        self.index = wb.index
+        # Every word can be guessed, but each board starts with only the solution list
+        self.candidates = [wb.word_bank["Row"].to_numpy() for _ in range(boards)]
+        self.solved = [False for _ in range(boards)]
+        self.guess_count = 0
+
+    def submit_guess(self, word: str, results: list) -> str:
+        """ Filters every board by the results of a guess, then suggests the next guess
+
+        Args:
+            word (str): the guess that was played on every board
+            results (list): result code for each board (see feedback.py)
+
+        Returns:
+            str: recommended next guess, or "Failed" if a board ran out of options
+        """
+        assert len(results) == len(self.candidates)
+        self.guess_count += 1
+
+        open_boards = [b for b, s in enumerate(self.solved) if not s]
+        if not open_boards:
+            return "Solved"
+
+        # One comparison against the union of the boards, instead of one per board
+        union = np.unique(np.concatenate([self.candidates[b] for b in open_boards]))
+        codes = feedback_matrix(self.index.codes[self.index.position[word]][None, :], self.index.codes[union])[0]
+
+        for b in open_boards:
+            res = results[b]
+            if res == SOLVED:
+                self.solved[b] = True
+                self.candidates[b] = np.array([self.index.position[word]])
+                continue
+            board_codes = codes[np.searchsorted(union, self.candidates[b])]
+            self.candidates[b] = self.candidates[b][board_codes == res]
+            if self.candidates[b].size == 0:
+                print(f"Error! No more options on board {b+1}!")
+                return "Failed"
+
+        if self.debug:
+            for b, cands in enumerate(self.candidates):
+                print(f"Board {b+1}: {'solved' if self.solved[b] else f'{cands.size} left'}")
+
+        return self.suggest()
+
+    def suggest(self, chunk: int = 1024) -> str:
+        """ Picks the guess that gives the most combined information across the unsolved boards
+
+        A board down to one option is always played first, since that guess can't be wasted.
+        Otherwise every guess is scored by the sum of the expected information (entropy of the
+        result buckets) it gives each board, with a bonus for being a possible solution.
+
+        Args:
+            chunk (int, optional): guesses scored per batch. Defaults to 1024.
+
+        Returns:
+            str: the recommended guess
+        """
+        open_boards = [b for b, s in enumerate(self.solved) if not s]
+        if not open_boards:
+            return "Solved"
+        for b in open_boards:
+            if self.candidates[b].size == 1:
+                return str(self.index.words[self.candidates[b][0]])
+
+        union = np.unique(np.concatenate([self.candidates[b] for b in open_boards]))
+        columns = [np.searchsorted(union, self.candidates[b]) for b in open_boards]
+        targets = self.index.codes[union]
+
+        scores = np.zeros(len(self.index))
+        for start in range(0, len(self.index), chunk):
+            # Shared work: every guess in the batch against every option on every board
+            codes = feedback_matrix(self.index.codes[start:start+chunk], targets).astype(np.int64)
+            rows = codes.shape[0]
+            offsets = 243 * np.arange(rows)[:, None]
+            for cols in columns:
+                sizes = np.bincount((codes[:, cols] + offsets).ravel(), minlength=243 * rows).reshape(rows, 243)
+                total = cols.size
+                probs = sizes / total
+                entropy = -(probs * np.log2(np.where(sizes > 0, probs, 1))).sum(axis=1)
+                # A guess that can be the solution also has a chance of finishing the board
+                scores[start:start+rows] += entropy + sizes[:, SOLVED] / total
+
+        return str(self.index.words[int(np.argmax(scores))])
+
+    def remaining(self) -> list:
+        """ Number of options left on each board (0 once a board is solved)
+
+        Returns:
+            list: remaining option count per board
+        """
+        return [0 if s else int(c.size) for c, s in zip(self.candidates, self.solved)]
+
+
+if __name__ == "__main__":
+    from tester import Tester
+    t1 = Tester()
+    t1.multi_permutations(boards=4, games=20)
@@ -0,0 +1,155 @@
+""" @file query.py
+    @author Sean Duffie
+    @brief Pattern queries over the word list for manual players
+
+    regex-ex.py answered "..ing" style questions by running a regex over the whole dataframe.
+    This builds posting bitsets once (one Python int per letter per slot, and one per letter
+    per minimum count), so a query is just a few big-integer ANDs.
+
+    Query Syntax (tokens separated by spaces):
+        ..ing       5 slot pattern, "." is any letter
+        s[^ae].e.   "[^ae]" excludes letters from one slot, "[ae]" allows only those letters
+        +ae         word must contain every listed letter (repeat a letter for more: +ee)
+        -rtx        word must not contain any listed letter
+        e=2         exact count of a letter (also e<=1, e>=2)
+
+    Example: "s..e. +a -rt" -> words starting with s, e in slot 4, containing a, no r or t
+"""
+import functools
+import os
+import re
+import sys
+
+import numpy as np
+from word_index import ALPHABET, MAX_COUNT, WordIndex, load_index
+
+RTDIR = os.path.dirname(__file__)
+
+SLOT_PATTERN = re.compile(r"\[\^?[a-z]+\]|[a-z.]")
+COUNT_PATTERN = re.compile(r"^([a-z])(<=|>=|=)(\d)$")
+
+
+def letter_index(letter: str, token: str) -> int:
+    """ Position of a letter in the alphabet, for letters read from a query token
+
+    Raises:
+        ValueError: if it isn't a lowercase letter
+    """
+    if letter not in ALPHABET:
+        raise ValueError(f"Invalid letter '{letter}' in '{token}'")
+    return ALPHABET.index(letter)
+
+
+class QueryIndex():
+    """ Posting bitsets for the word list
+
+        slot_bits[i][l]:  bit j is set if word j has letter l in slot i
+        count_bits[l][k]: bit j is set if word j has at least k copies of letter l
+    """
+    def __init__(self, index: WordIndex):
+        self.words = index.words
+        # Row of each word, also used to check that a word is in the list
+        self.position = index.position
+        self.all_bits = (1 << len(self.words)) - 1
+        self.slot_bits = [[self.to_bits(index.slot_masks[i][l]) for l in range(26)] for i in range(5)]
+        self.count_bits = [[self.to_bits(index.count_masks[l][k]) for k in range(MAX_COUNT + 1)] for l in range(26)]
+
+    def to_bits(self, mask: np.ndarray) -> int:
+        """ Packs a boolean mask over the word list into an int bitset """
+        return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+    def to_words(self, bits: int) -> list:
+        """ Unpacks an int bitset back into the words it contains """
+        raw = np.frombuffer(bits.to_bytes((len(self.words) + 7) // 8, "little"), dtype=np.uint8)
+        mask = np.unpackbits(raw, bitorder="little")[:len(self.words)].astype(bool)
+        return [str(word) for word in self.words[mask]]
+
+    def at_least(self, letter: int, count: int) -> int:
+        """ Words with at least count copies of a letter """
+        if count <= 0:
+            return self.all_bits
+        if count > MAX_COUNT:
+            return 0
+        return self.count_bits[letter][count]
+
+    def match(self, query: str) -> int:
+        """ Evaluates a query against the index
+
+        Args:
+            query (str): query string (see the module docstring for the syntax)
+
+        Raises:
+            ValueError: if the query can't be parsed
+
+        Returns:
+            int: bitset of the words that match
+        """
+        bits = self.all_bits
+        for token in query.lower().split():
+            if token[0] == "+":
+                for letter in set(token[1:]):
+                    bits &= self.at_least(letter_index(letter, token), token.count(letter))
+            elif token[0] == "-":
+                for letter in set(token[1:]):
+                    bits &= ~self.at_least(letter_index(letter, token), 1)
+            elif COUNT_PATTERN.match(token):
+                letter, op, count = COUNT_PATTERN.match(token).groups()
+                letter, count = ALPHABET.index(letter), int(count)
+                if op in ["=", ">="]:
+                    bits &= self.at_least(letter, count)
+                if op in ["=", "<="]:
+                    bits &= ~self.at_least(letter, count + 1)
+            else:
+                slots = SLOT_PATTERN.findall(token)
+                if len(slots) != 5 or "".join(slots) != token:
+                    raise ValueError(f"Invalid pattern '{token}', must be 5 slots (ex. '..ing' or 's[^ae].e.')")
+                for i, slot in enumerate(slots):
+                    bits &= self.slot_match(i, slot)
+        return bits & self.all_bits
+
+    def slot_match(self, i: int, slot: str) -> int:
+        """ Bitset for a single slot of the pattern ("a", ".", "[ab]" or "[^ab]") """
+        if slot == ".":
+            return self.all_bits
+        if len(slot) == 1:
+            return self.slot_bits[i][ALPHABET.index(slot)]
+        allowed = 0
+        for letter in slot.strip("[]^"):
+            allowed |= self.slot_bits[i][ALPHABET.index(letter)]
+        return ~allowed & self.all_bits if slot[1] == "^" else allowed
+
+    def query(self, query: str) -> list:
+        """ Finds every word that matches a query
+
+        Args:
+            query (str): query string (see the module docstring for the syntax)
+
+        Returns:
+            list: matching words, in word list order
+        """
+        return self.to_words(self.match(query))
+
+
+@functools.lru_cache(maxsize=None)
+def load_query_index() -> QueryIndex:
+    """ Builds the query index for the WordBank word list once per process """
+    # Read directly rather than through WordBank, so a query doesn't have to load pandas
+    with open(f"{RTDIR}/../valid_guesses.csv", encoding="utf-8") as file:
+        words = tuple(line.strip() for line in file if line.strip())
+    return QueryIndex(load_index(words))
+
+
+if __name__ == "__main__":
+    qi = load_query_index()
+    if len(sys.argv) > 1:
+        print(qi.query(" ".join(sys.argv[1:])))
+    else:
+        while True:
+            QUERY = input("Enter a query (ex. '..ing -s', or 'q' to quit): ")
+            if QUERY == "q":
+                break
+            try:
+                RESULTS = qi.query(QUERY)
+                print(f"{len(RESULTS)} matches: {RESULTS}")
+            except ValueError as e:
+                print(e)
@@ -6,14 +6,19 @@
 """
 import sys
 import time
-from typing import Generator, Tuple
+from typing import Generator, Tuple, Union
 
+import metrics
 import selenium.webdriver
+from feedback import SOLVED
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
 from word_bank import WordBank
 
+STARTUP_SECONDS = metrics.histogram("real_player_startup_seconds", "Time to launch the browser and reach the puzzle")
+GUESS_SECONDS = metrics.histogram("real_player_guess_seconds", "Time to type a guess and read its result")
+SESSION_SECONDS = metrics.histogram("real_player_session_seconds", "Time each browser session was open")
 
 class RealPlayer():
     """ RealPlayer is a slightly more advanced webscraper than my previous one.
@@ -25,7 +30,20 @@ class RealPlayer():
         This object is also designed to play nicely with both the WordBank object and
         the DiscordBot interfaces.
     """
-    def __init__(self, url: str):
+    def __init__(self, url: str, reveal_delay: float = 2, budget: float = 1.0):
+        """ Constructor for the RealPlayer
+
+        Args:
+            url (str): Wordle page to play on (the NYT page, or a local_wordle stand-in)
+            reveal_delay (float, optional): seconds to wait for the tiles to flip after
+                                            each guess. Defaults to 2.
+            budget (float, optional): seconds the solver gets to suggest each guess (see
+                                        WordBank.submit_guess). Defaults to 1.
+        """
+        self.reveal_delay = reveal_delay
+        self.budget = budget
+        self.opened = time.perf_counter()
+
         # Launch the Chrome browser
         match sys.version_info[1]:
             case 12:
@@ -47,6 +65,7 @@ class RealPlayer():
         time.sleep(.4)
 
         self.counter = 0
+        STARTUP_SECONDS.observe(time.perf_counter() - self.opened)
 
     def __enter__(self):
         return self
@@ -54,6 +73,7 @@ class RealPlayer():
     def __exit__(self, exception_type, exception_value, exception_traceback):
         self.driver.close()
         self.driver.quit()
+        SESSION_SECONDS.observe(time.perf_counter() - self.opened)
 
     def select_button(self, method: str, value: str, delay: float = 0.1) -> None:
         """ Click an element on the webpage
@@ -68,26 +88,28 @@ class RealPlayer():
         self.driver.find_element(by=method, value=value).click()
         time.sleep(delay)
 
-    def play_word(self, word: str) -> str:
+    def play_word(self, word: str) -> Union[int, str]:
         """ Plays a word on the NYT Wordle webpage by typing it.
 
         Args:
             word (str): What word to play?
 
         Returns:
-            str: Results of that word from the site itself
+            int | str: Result code of that word from the site itself (see feedback.py), or the
+                        answer text once the guesses have run out
         """
         # Handle going over the guess limit
         if self.counter >= 6:
             # Instead of returning nothing, we will go over the guess limit by one to get the actual answer
             result = self.driver.find_element(by=By.XPATH, value='//*[@id="ToastContainer-module_gameToaster__HPkaC"]/div').text.lower()
         else:
+            start = time.perf_counter()
             # Send the keypresses to the webpage
             self.actions.send_keys(word + "\n")
             self.actions.perform()
 
             # Give enough time for the animation to finish, then read the results
-            time.sleep(2)
+            time.sleep(self.reveal_delay)
             try:
                 result = self.read_results(self.counter)
             except ValueError:
@@ -98,10 +120,11 @@ class RealPlayer():
 
             # Increment guess counter
             self.counter += 1
+            GUESS_SECONDS.observe(time.perf_counter() - start)
 
         return result
 
-    def read_results(self, row: int) -> str:
+    def read_results(self, row: int) -> int:
         """ Read the results by scanning the table
 
         FIXME: Handle if user requests a row that is not populated yet
@@ -112,10 +135,13 @@ class RealPlayer():
         Args:
             row (int): Which row should you read? (This won't work if there are no results yet)
 
+        Raises:
+            ValueError: if a tile in the row hasn't been revealed
+
         Returns:
-            str: The results parsed into a WordBank friendly string
+            int: The results parsed into a result code (see feedback.py)
         """
-        result = ""
+        result = 0
         div_list = self.driver.find_elements(by=By.CLASS_NAME, value="Tile-module_tile__UWEHN")
 
         for i in range(5):
@@ -124,15 +150,18 @@ class RealPlayer():
 
             match res:
                 case "absent":
-                    result += "0"
+                    result = result * 3
                 case "present in another position":
-                    result += "1"
+                    result = result * 3 + 1
                 case "correct":
-                    result += "2"
+                    result = result * 3 + 2
+                # Not revealed yet ("tbd") or an unknown state, play_word clears the entry
+                case _:
+                    raise ValueError(f"Tile {index} isn't revealed: '{res}'")
 
         return result
 
-    def run_generator(self) -> Generator[Tuple[str, str], None, None]:
+    def run_generator(self) -> Generator[Tuple[str, Union[int, str]], None, None]:
         """ Main runner for RealPlayer """
         wb = WordBank()
         guess = "flash"
@@ -151,12 +180,12 @@ class RealPlayer():
                 yield (guess, result)
 
                 # Check victory conditions, or if out of guesses, get the final result
-                if result == "22222" or result.isalpha():
+                if result == SOLVED or isinstance(result, str):
                     return
 
                 # Get suggestion from the wordbank for the next guess
-                guess = wb.submit_guess(word=guess, res=result, method="slo")
-            except AssertionError:
+                guess = wb.submit_guess(word=guess, res=result, method="slo", budget=self.budget)
+            except (AssertionError, ValueError):
                 if guess.lower() == "failed":
                     print("Error! Word Bank ran out of options! (This shouldn't be possible)")
                     return
@@ -184,12 +213,12 @@ def run():
                 history.append((guess, result))
 
                 # Check for victory conditions, or if out of guesses, get the final result
-                if result == "22222" or result.isalpha():
+                if result == SOLVED or isinstance(result, str):
                     break
 
                 # Get suggestion from the wordbank for the next guess
-                guess = wb.submit_guess(word=guess, res=result, method="slo")
-            except AssertionError:
+                guess = wb.submit_guess(word=guess, res=result, method="slo", budget=player.budget)
+            except (AssertionError, ValueError):
                 if guess.lower() == "failed":
                     print("Error! Word Bank ran out of options! (This shouldn't be possible)")
                     break
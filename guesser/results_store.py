@@ -0,0 +1,175 @@
+""" @file results_store.py
+    @author Sean Duffie
+    @brief Columnar (Parquet) storage for permutation results
+
+    The permutation CSVs store the failures as a Python repr string that has to be eval'd before
+    it can be analyzed, and every comparison loads whole files into pandas. Results are instead
+    written as Parquet datasets partitioned by method (and start word for the games), with typed
+    columns and the failures stored as nested lists. The readers hand back pyarrow Tables and
+    only read the columns and partitions that were asked for.
+
+    Layout:
+        data/permutations/Method=<method>/Start=<start>/part-0.parquet  - one row per game
+        data/permutation_stats/Method=<method>/part-0.parquet  - one row per start word
+
+    Example:
+        read_games(columns=["Word", "Count"], filter=(ds.field("Method") == "slo") & (ds.field("Count") > 6))
+"""
+import ast
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+RTDIR = os.path.dirname(__file__)
+GAMES_DIR = f"{RTDIR}/../data/permutations"
+STATS_DIR = f"{RTDIR}/../data/permutation_stats"
+
+GAMES_PARTITIONING = ds.partitioning(pa.schema([("Method", pa.string()), ("Start", pa.string())]), flavor="hive")
+# A run can cover thousands of start words, so the summaries are only split by method
+STATS_PARTITIONING = ds.partitioning(pa.schema([("Method", pa.string())]), flavor="hive")
+
+GAME_SCHEMA = pa.schema([
+    ("Method", pa.string()),
+    ("Start", pa.string()),
+    ("Word", pa.string()),
+    ("Count", pa.int8()),
+    ("Guesses", pa.list_(pa.string())),
+])
+
+FAILURE_TYPE = pa.struct([
+    ("Word", pa.string()),
+    ("Count", pa.int8()),
+    ("Guesses", pa.list_(pa.string())),
+])
+
+STATS_SCHEMA = pa.schema([
+    ("Method", pa.string()),
+    ("Start", pa.string()),
+    ("Time", pa.duration("us")),
+    ("Average Score", pa.float64()),
+    ("Min Score", pa.int8()),
+    ("Max Score", pa.int8()),
+    ("Failure Count", pa.int32()),
+    ("Failures", pa.list_(FAILURE_TYPE)),
+])
+
+
+def write_games(df: pd.DataFrame, method: str, start: str, root: str = GAMES_DIR):
+    """ Saves every game played by one start word, replacing any earlier run of it
+
+    Args:
+        df (pd.DataFrame): "Word", "Count" and "Guesses" columns (see Tester.play_all)
+        method (str): method the games were played with (including any "_hard" suffix)
+        start (str): start word of the games
+        root (str, optional): dataset directory. Defaults to data/permutations.
+    """
+    table = pa.Table.from_pandas(df.assign(Method=method, Start=start), schema=GAME_SCHEMA, preserve_index=False)
+    _write(table, root, GAMES_PARTITIONING)
+
+
+def write_stats(rows: list, method: str, root: str = STATS_DIR):
+    """ Saves the summary of each start word from a permutation run
+
+    Args:
+        rows (list): [Time, Start, Average Score, Min Score, Max Score, Failure Count, Failures]
+                        for each start word, where Failures is a list of (word, count, guesses)
+        method (str): method the games were played with (including any "_hard" suffix), an
+                        earlier run of the same method is replaced
+        root (str, optional): dataset directory. Defaults to data/permutation_stats.
+    """
+    columns = ["Time", "Start", "Average Score", "Min Score", "Max Score", "Failure Count", "Failures"]
+    df = pd.DataFrame(rows, columns=columns).assign(Method=method)
+    df["Failures"] = df["Failures"].apply(
+        lambda failures: [{"Word": word, "Count": count, "Guesses": list(guesses)} for word, count, guesses in failures]
+    )
+    _write(pa.Table.from_pandas(df, schema=STATS_SCHEMA, preserve_index=False), root, STATS_PARTITIONING)
+
+
+def _write(table: pa.Table, root: str, partitioning: ds.Partitioning):
+    """ Writes a table into its partitions, replacing only the partitions it touches """
+    ds.write_dataset(
+        table,
+        base_dir=root,
+        format="parquet",
+        partitioning=partitioning,
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="delete_matching",
+    )
+
+
+def open_games(root: str = GAMES_DIR) -> ds.Dataset:
+    """ Opens the per-game dataset without reading it """
+    return ds.dataset(root, format="parquet", partitioning=GAMES_PARTITIONING)
+
+
+def open_stats(root: str = STATS_DIR) -> ds.Dataset:
+    """ Opens the per-start-word dataset without reading it """
+    return ds.dataset(root, format="parquet", partitioning=STATS_PARTITIONING)
+
+
+def read_games(columns: list = None, filter: ds.Expression = None, root: str = GAMES_DIR) -> pa.Table:
+    """ Reads only the requested columns and rows of the per-game results
+
+    Filters on Method and Start skip whole partitions, and filters on other columns are pushed
+    down to the Parquet row groups.
+
+    Args:
+        columns (list, optional): columns to read. Defaults to all.
+        filter (ds.Expression, optional): rows to keep (ex. ds.field("Count") > 6). Defaults to all.
+        root (str, optional): dataset directory. Defaults to data/permutations.
+
+    Returns:
+        pa.Table: the matching games (call .to_pandas() for a DataFrame)
+    """
+    return open_games(root).to_table(columns=columns, filter=filter)
+
+
+def read_stats(columns: list = None, filter: ds.Expression = None, root: str = STATS_DIR) -> pa.Table:
+    """ Reads only the requested columns and rows of the per-start-word results
+
+    Args:
+        columns (list, optional): columns to read. Defaults to all.
+        filter (ds.Expression, optional): rows to keep (ex. ds.field("Start") == "flash"). Defaults to all.
+        root (str, optional): dataset directory. Defaults to data/permutation_stats.
+
+    Returns:
+        pa.Table: the matching summaries (call .to_pandas() for a DataFrame)
+    """
+    return open_stats(root).to_table(columns=columns, filter=filter)
+
+
+def compare_methods(starts: list = None, root: str = STATS_DIR) -> pd.DataFrame:
+    """ Average score of each start word under each method, side by side
+
+    Args:
+        starts (list, optional): start words to compare. Defaults to all.
+        root (str, optional): dataset directory. Defaults to data/permutation_stats.
+
+    Returns:
+        pd.DataFrame: one row per start word, one column per method
+    """
+    filter = ds.field("Start").isin(starts) if starts is not None else None
+    table = read_stats(columns=["Method", "Start", "Average Score"], filter=filter, root=root)
+    return table.to_pandas().pivot(index="Start", columns="Method", values="Average Score")
+
+
+def import_csv_stats(path: str, method: str, root: str = STATS_DIR):
+    """ Converts an old permutation_<method>_stats.csv into the Parquet stats dataset
+
+    Args:
+        path (str): location of the csv
+        method (str): method the csv was generated with
+        root (str, optional): dataset directory. Defaults to data/permutation_stats.
+    """
+    df = pd.read_csv(path)
+    df["Time"] = pd.to_timedelta(df["Time"])
+    # The last time these have to be parsed from text
+    df["Failures"] = df["Failures"].apply(ast.literal_eval)
+    write_stats(df.values.tolist(), method, root)
+
+
+if __name__ == "__main__":
+    print(compare_methods())
+    print(read_games(columns=["Method", "Start", "Word", "Count"], filter=ds.field("Count") > 6).to_pandas())
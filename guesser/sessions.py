@@ -0,0 +1,156 @@
+""" @file sessions.py
+    @author Sean Duffie
+    @brief Bounded store of the Discord players' games
+
+    Each game is kept as packed bytes: 5 ASCII letters per guess and one result code per
+    result (see feedback.py, 242 is solved). That is 6 bytes a guess instead of a tuple
+    of strings with the emoji already expanded. Games are keyed by (user id, puzzle mode) and
+    kept in least recently used order, so idle games and anything over the cap are dropped
+    from the front without scanning the rest.
+
+    Command handlers for the same user are serialized with a per-user asyncio lock, so two
+    quick guesses can't both pass the guess limit check before either one is recorded.
+"""
+import asyncio
+import collections
+import time
+import weakref
+from typing import Iterator, Tuple
+
+from feedback import SOLVED, decode, encode
+
+
+class GameSession():
+    """ One player's game on one puzzle """
+    __slots__ = ("guesses", "codes", "last_used")
+
+    def __init__(self):
+        self.guesses = bytearray()
+        self.codes = bytearray()
+        self.last_used = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def add(self, word: str, result: int):
+        """ Records a guess and its result
+
+        Args:
+            word (str): the 5 letter guess
+            result (int): result code (see feedback.py)
+        """
+        self.guesses += word.lower().encode("ascii")
+        self.codes.append(result)
+
+    @property
+    def solved(self) -> bool:
+        """ True if the last guess was correct """
+        return len(self.codes) > 0 and self.codes[-1] == SOLVED
+
+    def turns(self) -> Iterator[Tuple[str, int]]:
+        """ Unpacks the game
+
+        Yields:
+            tuple: (guess, result code) for each guess played
+        """
+        for i, code in enumerate(self.codes):
+            yield self.guesses[5*i:5*i+5].decode("ascii"), code
+
+
+class SessionStore():
+    """ Every player's games, bounded by count and idle time """
+    def __init__(self, max_sessions: int = 10000, idle_seconds: float = 6 * 60 * 60):
+        """ Constructor for the session store
+
+        Args:
+            max_sessions (int, optional): most games kept at once, the least recently used are
+                                            dropped past this (a game is under 100 bytes of
+                                            data). Defaults to 10000.
+            idle_seconds (float, optional): drop games that haven't been played for this
+                                            long. Defaults to 6 hours.
+        """
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.sessions: collections.OrderedDict[Tuple[int, int], GameSession] = collections.OrderedDict()
+        # A lock only lives while a handler is using it, so these never pile up
+        self.locks: weakref.WeakValueDictionary[int, asyncio.Lock] = weakref.WeakValueDictionary()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def lock(self, user_id: int) -> asyncio.Lock:
+        """ Lock that serializes one user's commands (use with "async with")
+
+        Args:
+            user_id (int): discord user id
+
+        Returns:
+            asyncio.Lock: the user's lock
+        """
+        lock = self.locks.get(user_id)
+        if lock is None:
+            lock = self.locks[user_id] = asyncio.Lock()
+        return lock
+
+    def get(self, user_id: int, mode: int) -> GameSession:
+        """ Gets a user's game on a puzzle, starting one if they don't have it
+
+        Args:
+            user_id (int): discord user id
+            mode (int): which puzzle (0, 1, 2 for nyt, afternoon, evening)
+
+        Returns:
+            GameSession: the user's game
+        """
+        key = (user_id, mode)
+        session = self.sessions.get(key)
+        if session is None:
+            session = self.sessions[key] = GameSession()
+        else:
+            self.sessions.move_to_end(key)
+        session.last_used = time.monotonic()
+        self.evict()
+        return session
+
+    def peek(self, user_id: int, mode: int) -> GameSession:
+        """ Looks up a user's game without starting one or counting it as used
+
+        Returns:
+            GameSession: the user's game, or None if they don't have one
+        """
+        return self.sessions.get((user_id, mode))
+
+    def evict(self):
+        """ Drops idle games and the least recently used games over the cap """
+        cutoff = time.monotonic() - self.idle_seconds
+        while self.sessions:
+            key, session = next(iter(self.sessions.items()))
+            if len(self.sessions) <= self.max_sessions and session.last_used >= cutoff:
+                break
+            del self.sessions[key]
+
+    def drop_mode(self, mode: int):
+        """ Drops every game on a puzzle (ex. when a new puzzle is released for that mode) """
+        for key in [k for k in self.sessions if k[1] == mode]:
+            del self.sessions[key]
+
+    def clear(self):
+        """ Drops every game """
+        self.sessions.clear()
+
+    def guess_count(self) -> int:
+        """ Total guesses stored across every game """
+        return sum(len(session) for session in list(self.sessions.values()))
+
+
+if __name__ == "__main__":
+    async def main():
+        store = SessionStore(max_sessions=2)
+        for user in range(3):
+            async with store.lock(user):
+                store.get(user, 1).add("flash", encode("00100"))
+        game = store.get(2, 1)
+        game.add("crane", SOLVED)
+        print(len(store), [(guess, decode(code)) for guess, code in game.turns()], game.solved)
+
+    asyncio.run(main())
@@ -0,0 +1,149 @@
+""" @file sim_service.py
+    @author Sean Duffie
+    @brief Runs solver games for the Discord bot without blocking its event loop
+
+    Solving is CPU work, so it is handed to a small process pool instead of running on the
+    event loop. Results are cached per (solution, start word, method), and requests for a game
+    that is already being played wait on that game instead of starting another one, so
+    repeated challenges against the same puzzle cost nothing.
+
+    The workers send back how long each turn took, and the timings are recorded in the bot's
+    metrics (see metrics.py), since the workers' own metrics are never exported.
+"""
+import asyncio
+import concurrent.futures
+import time
+from typing import Dict, List, Tuple
+
+import metrics
+
+TURN_SECONDS = metrics.histogram("solver_turn_seconds", "Time the solver took to pick each guess")
+GAME_SECONDS = metrics.histogram("solver_game_seconds", "Time to get the bot's game for a puzzle, including waiting for a worker")
+CACHE_HITS = metrics.counter("solver_cache_hits_total", "Bot games answered from the cache or an in-progress game")
+
+# Each worker process builds its own Tester once and keeps it for every game it plays
+_TESTER = None
+
+
+def solve_game(solution: str, start: str, method: str, hard: bool = False,
+               budget: float = None) -> Tuple[List[Tuple[str, int]], List[float], List[int]]:
+    """ Plays one game with this process's Tester, built on the first call (ex. in a pool worker)
+
+    Args:
+        solution (str): the puzzle solution
+        start (str): first guess
+        method (str): probability calculation used for suggestions
+        hard (bool, optional): play by hard mode rules. Defaults to False.
+        budget (float, optional): seconds each suggestion has to be ready in. Defaults to no limit.
+
+    Returns:
+        tuple: (guess, result code) for every guess played, the seconds each turn took and the
+                number of options left after each guess
+    """
+    global _TESTER
+    if _TESTER is None:
+        from tester import Tester
+        _TESTER = Tester()
+    turns = list(_TESTER.simulate(start=start, solution=solution, method=method, hard=hard, budget=budget))
+    elapsed = [turn.elapsed for turn in turns]
+    times = [after - before for before, after in zip([0.0] + elapsed, elapsed)]
+    return [(turn.guess, turn.result) for turn in turns], times, [turn.remaining for turn in turns]
+
+
+class SimulationService():
+    """ Async front end for running many solver games at once """
+    def __init__(self, workers: int = 2, start: str = "flash", method: str = "slo", budget: float = None):
+        """ Constructor for the simulation service
+
+        Args:
+            workers (int, optional): number of worker processes. Defaults to 2.
+            start (str, optional): default first guess. Defaults to "flash".
+            method (str, optional): default probability calculation. Defaults to "slo".
+            budget (float, optional): seconds each suggestion has to be ready in, the slower
+                                        methods return their best guess so far when it runs out
+                                        (see WordBank.submit_guess). Defaults to no limit.
+        """
+        self.start = start
+        self.method = method
+        self.budget = budget
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        # Finished games, and games that are still being played
+        self.cache: Dict[Tuple[str, str, str], List[Tuple[str, int]]] = {}
+        self.pending: Dict[Tuple[str, str, str], asyncio.Future] = {}
+        # Options left after each guess of the finished games
+        self.curves: Dict[Tuple[str, str, str], List[int]] = {}
+
+    async def solve(self, solution: str, start: str = None, method: str = None) -> List[Tuple[str, int]]:
+        """ Plays (or looks up) the bot's game for a solution
+
+        Args:
+            solution (str): the puzzle solution
+            start (str, optional): first guess. Defaults to the service default.
+            method (str, optional): probability calculation. Defaults to the service default.
+
+        Returns:
+            list: (guess, result code) for every guess played
+        """
+        key = (solution, start or self.start, method or self.method)
+        if key in self.cache:
+            CACHE_HITS.inc()
+            return self.cache[key]
+        if key in self.pending:
+            CACHE_HITS.inc()
+            return (await asyncio.shield(self.pending[key]))[0]
+
+        requested = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, solve_game, *key, False, self.budget)
+        self.pending[key] = future
+        try:
+            self.cache[key], times, self.curves[key] = await future
+        finally:
+            del self.pending[key]
+
+        GAME_SECONDS.observe(time.perf_counter() - requested, method=key[2])
+        for seconds in times:
+            TURN_SECONDS.observe(seconds, method=key[2])
+        return self.cache[key]
+
+    async def candidate_curve(self, solution: str, start: str = None, method: str = None) -> List[int]:
+        """ How many options the bot had left after each guess of its game (playing it if needed)
+
+        Args:
+            solution (str): the puzzle solution
+            start (str, optional): first guess. Defaults to the service default.
+            method (str, optional): probability calculation. Defaults to the service default.
+
+        Returns:
+            list: remaining option count after each guess
+        """
+        await self.solve(solution, start, method)
+        return self.curves[(solution, start or self.start, method or self.method)]
+
+    async def solve_many(self, solutions: List[str], start: str = None, method: str = None) -> List[List[Tuple[str, int]]]:
+        """ Plays several games concurrently (limited by the worker count)
+
+        Args:
+            solutions (list): the puzzle solutions
+            start (str, optional): first guess. Defaults to the service default.
+            method (str, optional): probability calculation. Defaults to the service default.
+
+        Returns:
+            list: the guesses for each solution, in the same order
+        """
+        return await asyncio.gather(*(self.solve(solution, start, method) for solution in solutions))
+
+    def close(self):
+        """ Shuts down the worker processes """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    async def main():
+        service = SimulationService(workers=2)
+        games = await service.solve_many(["boxer", "watch", "hound", "boxer"])
+        for game in games:
+            print(game)
+        service.close()
+
+    asyncio.run(main())
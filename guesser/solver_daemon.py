@@ -0,0 +1,219 @@
+""" @file solver_daemon.py
+    @author Sean Duffie
+    @brief Long running solver that other processes ask for guesses over localhost HTTP
+
+    Building a WordBank reads both word lists and builds the word index, and every consumer
+    (the tester, the bot, RealPlayer) was paying for that on its own. The daemon builds it
+    once and keeps it, along with the state after every game history it has seen. Histories
+    share their prefixes (every game starts with the same opener), so a request usually only
+    has to play the last guess, or nothing at all.
+
+    API (JSON over HTTP, keep-alive):
+        GET  /health  ->  {"words": 14855, "solutions": 2310, "cached": 12}
+        POST /solve   <-  {"history": [["flash", "00100"]], "method": "slo", "hard": false, "limit": 20}
+                      ->  {"guess": "cagey", "remaining": 264, "candidates": [...], "solved": false}
+        POST /solve   <-  a list of requests  ->  a list of responses, in the same order
+
+    Usage:
+        python solver_daemon.py [port]
+"""
+import functools
+import http.server
+import json
+import sys
+import threading
+from typing import List, Tuple
+
+import requests
+from feedback import SOLVED, encode
+from word_bank import WordBank
+
+DEFAULT_PORT = 8765
+DEFAULT_START = "flash"
+
+
+class SolverEngine():
+    """ A warm WordBank, with the state after each game history cached """
+    def __init__(self, start: str = DEFAULT_START, cache_size: int = 4096):
+        """ Constructor for the solver engine
+
+        Args:
+            start (str, optional): guess suggested for an empty history. Defaults to "flash".
+            cache_size (int, optional): how many game states to keep. Defaults to 4096.
+        """
+        self.start = start
+        self.base = WordBank()
+        self.state = functools.lru_cache(maxsize=cache_size)(self._replay)
+
+    def _replay(self, history: Tuple[Tuple[str, int], ...], method: str, hard: bool) -> Tuple[WordBank, str]:
+        """ WordBank after a history, built on top of the (cached) state one guess earlier
+
+        Returns:
+            tuple: (WordBank after the last guess, suggested next guess)
+        """
+        if not history:
+            return self.base, self.start
+        parent, _ = self.state(history[:-1], method, hard)
+        word, result = history[-1]
+        return parent.what_if(word, result, method, hard=hard)
+
+    def solve(self, history: List[Tuple[str, str]], method: str = "slo", hard: bool = False, limit: int = 20) -> dict:
+        """ Suggests the next guess for a game
+
+        Args:
+            history (list): (guess, result) for each guess played so far, results can be
+                            strings ("02001") or codes (see feedback.py)
+            method (str, optional): probability calculation (see WordBank.submit_guess). Defaults to 'slo'.
+            hard (bool, optional): only suggest hard mode guesses. Defaults to False.
+            limit (int, optional): how many remaining candidates to list. Defaults to 20.
+
+        Raises:
+            ValueError: if a guess or result in the history is invalid, or hard isn't a bool
+
+        Returns:
+            dict: the next guess, the number of candidates left and the first few of them
+        """
+        # Results come in as strings ("02001") and are only used as codes from here on
+        history = tuple((str(word).lower(), encode(result)) for word, result in history)
+        for word, _ in history:
+            if word not in self.base.index.position:
+                raise ValueError(f"Invalid guess '{word}'")
+        # JSON has real booleans, and bool("false") would be True
+        if not isinstance(hard, bool):
+            raise ValueError(f"Invalid hard '{hard}', expected true or false")
+
+        if history and history[-1][1] == SOLVED:
+            return {"guess": None, "remaining": 1, "candidates": [history[-1][0]], "solved": True}
+
+        wb, guess = self.state(history, method, hard)
+        words = wb.word_bank["Words"]
+        if guess == "Failed":
+            return {"guess": None, "remaining": 0, "candidates": [], "solved": False}
+        return {
+            "guess": str(guess),
+            "remaining": int(words.size),
+            "candidates": [str(word) for word in words[:limit]],
+            "solved": False,
+        }
+
+    def handle(self, request) -> dict:
+        """ Answers one request dict (see the module docstring), errors are returned not raised """
+        try:
+            return self.solve(
+                request.get("history", []),
+                request.get("method", "slo"),
+                request.get("hard", False),
+                request.get("limit", 20),
+            )
+        except (ValueError, AssertionError, TypeError, AttributeError) as e:
+            return {"error": str(e) or type(e).__name__}
+
+
+def make_server(engine: SolverEngine, port: int = DEFAULT_PORT, host: str = "127.0.0.1") -> http.server.ThreadingHTTPServer:
+    """ Creates the HTTP server for an engine (call serve_forever() to run it)
+
+    Args:
+        engine (SolverEngine): the engine that answers requests
+        port (int, optional): port to listen on, 0 picks a free one. Defaults to 8765.
+        host (str, optional): interface to listen on. Defaults to localhost only.
+
+    Returns:
+        http.server.ThreadingHTTPServer: the server
+    """
+    # The engine's cache isn't built for two games being played into it at once
+    lock = threading.Lock()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        """ JSON handler for /health and /solve """
+        # Keep connections open so clients don't reconnect for every request
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately, don't let Nagle hold the body back
+        disable_nagle_algorithm = True
+
+        def send_json(self, status: int, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path != "/health":
+                self.send_json(404, {"error": "Not found"})
+                return
+            self.send_json(200, {
+                "words": len(engine.base.original_bank),
+                "solutions": len(engine.base.word_bank),
+                "cached": engine.state.cache_info().currsize,
+            })
+
+        def do_POST(self):
+            if self.path != "/solve":
+                self.send_json(404, {"error": "Not found"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            except ValueError:
+                self.send_json(400, {"error": "Invalid JSON"})
+                return
+            with lock:
+                if isinstance(body, list):
+                    self.send_json(200, [engine.handle(request) for request in body])
+                else:
+                    response = engine.handle(body)
+                    self.send_json(400 if "error" in response else 200, response)
+
+        def log_message(self, format, *args):
+            pass
+
+    return http.server.ThreadingHTTPServer((host, port), Handler)
+
+
+class SolverClient():
+    """ Client for a running solver daemon """
+    def __init__(self, url: str = f"http://127.0.0.1:{DEFAULT_PORT}"):
+        """ Constructor for the client
+
+        Args:
+            url (str, optional): address of the daemon. Defaults to the default local port.
+        """
+        self.url = url
+        # Reuses one connection for every request
+        self.session = requests.Session()
+
+    def solve(self, history: List[Tuple[str, str]], method: str = "slo", hard: bool = False, limit: int = 20) -> dict:
+        """ Asks for the next guess of one game (see SolverEngine.solve) """
+        response = self.session.post(f"{self.url}/solve", timeout=30, json={
+            "history": history, "method": method, "hard": hard, "limit": limit
+        })
+        return response.json()
+
+    def solve_batch(self, requests_list: List[dict]) -> List[dict]:
+        """ Asks for the next guess of several games in one round trip
+
+        Args:
+            requests_list (list): request dicts (see the module docstring)
+
+        Returns:
+            list: a response for each request, in the same order
+        """
+        return self.session.post(f"{self.url}/solve", json=requests_list, timeout=300).json()
+
+    def health(self) -> dict:
+        """ Word list sizes and cached states of the daemon """
+        return self.session.get(f"{self.url}/health", timeout=5).json()
+
+    def close(self):
+        """ Closes the connection """
+        self.session.close()
+
+
+if __name__ == "__main__":
+    PORT = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    SERVER = make_server(SolverEngine(), PORT)
+    print(f"Solver daemon listening on http://127.0.0.1:{SERVER.server_address[1]}")
+    try:
+        SERVER.serve_forever()
+    except KeyboardInterrupt:
+        SERVER.server_close()
@@ -6,61 +6,225 @@ TODO: If a method/starting word combo have a low amount of failures, maybe guess
 TODO: https://stackoverflow.com/questions/53249133/check-if-a-pattern-is-in-a-list-of-words
 """
 
+import concurrent.futures
+import contextlib
 import datetime
+import heapq
+import itertools
+import math
 import os
 import random
-from typing import Literal
+import statistics
+import time
+from typing import Generator, Literal, NamedTuple, Tuple
 
 import numpy as np
 import pandas as pd
+import results_store
+from feedback import SOLVED, check, decode, encode
+from memory_profile import MemoryProfiler
+from minimax import worst_case_depth
+from multi_board import MultiBoard
 from word_bank import WordBank
+from word_index import load_index, partition_sizes
 
 RTDIR = os.path.dirname(__file__)
+# Memory reports of permutations(profile_memory=True)
+MEMORY_DIR = f"{RTDIR}/../data/permutation_memory"
 
+# Fresh game that every sampled game of a process starts from (see sample_opener)
+_ROOT = None
 
-def check(guess: str, solution: str) -> str:
-    """ Generates a 'results' string from a guess when the solution is known
+
+def bucket_bounds(sizes: np.ndarray, turn: int = 1) -> np.ndarray:
+    """ Fewest total guesses that can solve every word of some result buckets
+
+    Any strategy can solve at most one word of a bucket with its next guess, and at most 242
+    more with the one after (one per remaining result), so a bucket of size s reached after
+    `turn` guesses needs at least (turn + 1) + (turn + 2) * min(s - 1, 242) + (turn + 3) * (anything
+    left over) guesses in total.
+
+    Args:
+        sizes (np.ndarray): bucket sizes (empty buckets cost nothing)
+        turn (int, optional): guesses played before the buckets were split. Defaults to 1.
+
+    Returns:
+        np.ndarray: lower bound on the total guesses needed for each bucket
+    """
+    bound = (turn + 1) + (turn + 2) * np.minimum(sizes - 1, 242) + (turn + 3) * np.maximum(sizes - 243, 0)
+    return bound * (sizes > 0)
+
+def opener_lower_bounds(sizes: np.ndarray) -> np.ndarray:
+    """ Lowest possible total guess count for each opener, from how it splits the solutions
+
+    This holds for any strategy, so it's cheap enough to bound every opener at once but too
+    loose to rule any of them out on its own (see strategy_total for a bound that can).
+
+    Args:
+        sizes (np.ndarray): (G, 243) result bucket sizes for each opener (see partition_sizes)
+
+    Returns:
+        np.ndarray: (G,) lower bound on the total guesses needed to solve every solution
+    """
+    # The "22222" bucket is the opener itself, solved in one
+    return sizes[:, SOLVED] + bucket_bounds(sizes[:, :SOLVED]).sum(axis=1)
+
+def strategy_total(wb: WordBank, guess: str, method: Literal['cum', 'uni', 'slo', 'tot', 'max', 'two'] = 'tot',
+                   hard: bool = False, depth: int = None, turn: int = 1) -> Tuple[int, int]:
+    """ Total guesses a method takes from a guess over every remaining solution
+
+    Instead of playing each solution as its own game (see play_all), this walks the method's
+    decision tree: every solution that has gotten the same results so far is at the same
+    point of the game, so each suggestion is only worked out once. The games are the same ones
+    play_all plays, at a small fraction of the cost.
+
+    With a depth, the tree is only followed that many guesses deep and the buckets left at
+    the bottom are bounded with bucket_bounds. That is a lower bound on the full total for this
+    method, and it gets tighter (and slower) with every guess of depth.
+
+    Args:
+        wb (WordBank): game state before the guess (not changed)
+        guess (str): the guess to play
+        method (str, optional): Probability calculation used for suggestions. Defaults to 'tot'.
+        hard (bool, optional): Play by hard mode rules. Defaults to False.
+        depth (int, optional): guesses to follow the method for. Defaults to the whole game.
+        turn (int, optional): guess number of the guess. Defaults to 1.
+
+    Returns:
+        tuple: (total guesses, games that took more than 6), failures are only counted for
+                games that were followed to the end
+    """
+    total, failed = 0, 0
+    for result, rows in wb.branches(guess).items():
+        if result == SOLVED:
+            total += turn
+            failed += turn > 6
+        elif depth is not None and turn >= depth:
+            total += int(bucket_bounds(np.array(len(rows)), turn))
+        else:
+            child, suggestion = wb.what_if(guess, result, method, hard=hard)
+            subtotal, subfailed = strategy_total(child, suggestion, method, hard, depth, turn + 1)
+            total += subtotal
+            failed += subfailed
+    return total, failed
+
+def sample_opener(start: str, draw: list, method: Literal['cum', 'uni', 'slo', 'tot', 'max', 'two'] = 'tot',
+                  hard: bool = False, batch: int = 25, tolerance: float = 0.1, confidence: float = 0.95,
+                  population: int = None) -> list:
+    """ Plays an opener against a draw of solutions until its average is known well enough
+
+    The games are the ones Tester.simulate() plays, but every point a game reaches is kept, so a
+    later game that gets the same results reuses it instead of starting a new WordBank. Most of
+    a sample shares its first few positions, so this is many times faster than separate games.
+    Module level, so a process pool can run one opener per worker (see Tester.sample_openers).
+
+    Args:
+        start (str): the opener
+        draw (list): solutions to play, in order
+        method (str, optional): Probability calculation used for suggestions. Defaults to 'tot'.
+        hard (bool, optional): Play by hard mode rules. Defaults to False.
+        batch (int, optional): games played between interval checks. Defaults to 25.
+        tolerance (float, optional): stop once the average is known to +/- this. Defaults to 0.1.
+        confidence (float, optional): confidence level of the interval. Defaults to 0.95.
+        population (int, optional): how many solutions the draw came from (see mean_interval).
+                                    Defaults to an infinite population.
+
+    Returns:
+        list: guesses each game took, in the order of the draw
+    """
+    global _ROOT
+    if _ROOT is None:
+        _ROOT = WordBank()
+
+    # (results so far) -> (game after them, next guess)
+    reached = {}
+    counts = []
+    for solution in draw:
+        wb, guess, results = _ROOT, start, ()
+        while True:
+            result = check(guess, solution)
+            if result == SOLVED:
+                break
+            results += (result,)
+            if results not in reached:
+                reached[results] = wb.what_if(guess, result, method, hard=hard)
+            wb, guess = reached[results]
+        counts.append(len(results) + 1)
+
+        if len(counts) % batch == 0:
+            _, low, high = mean_interval(counts, confidence, population)
+            if (high - low) / 2 <= tolerance:
+                break
+    return counts
+
+def mean_interval(values: list, confidence: float = 0.95, population: int = None) -> tuple:
+    """ Confidence interval for the mean of a sample (normal approximation)
+
+    Args:
+        values (list): the sampled values
+        confidence (float, optional): confidence level of the interval. Defaults to 0.95.
+        population (int, optional): size of the population the values were drawn from without
+                                    replacement, which narrows the interval as the sample
+                                    covers more of it. Defaults to an infinite population.
+
+    Returns:
+        tuple: (mean, low, high)
+    """
+    n = len(values)
+    mean = statistics.fmean(values)
+    if n < 2:
+        return mean, -math.inf, math.inf
+    error = statistics.stdev(values) / math.sqrt(n)
+    if population is not None:
+        error *= math.sqrt(max(population - n, 0) / (population - 1))
+    z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    return mean, mean - z * error, mean + z * error
+
+def rate_interval(hits: int, n: int, confidence: float = 0.95) -> tuple:
+    """ Wilson confidence interval for a rate, which stays sensible when the rate is near 0
 
     Args:
-        guess (str): the user or system generated guess
-        solution (str): the known solution to the current puzzel iteration
+        hits (int): how many times it happened
+        n (int): how many tries
+        confidence (float, optional): confidence level of the interval. Defaults to 0.95.
 
     Returns:
-        str: Formatted results string that compares the solution with the guess
+        tuple: (rate, low, high)
     """
-    result = "00000"
-
-    # First, eliminate all letters known to be correct, mask the correct letters with whitespace
-    for i in range(5):
-        if guess[i] == solution[i]:
-            result = result[:i] + "2" + result[i+1:]
-            guess = guess[:i] + " " + guess[i+1:]
-            solution = solution[:i] + " " + solution[i+1:]
-        # print(f"{guess=} | {solution=} | {result=}")
-
-    # Next, identify all the characters that are present but not in the correct spot
-    # Doing it this way allows you to identify duplicate letters without looping on confirmed
-    # Additionally, only one "possible" duplicate letter should be marked for each duplicate
-    for i in range(5):
-        if guess[i] != " " and guess[i] in solution:
-            result = result[:i] + "1" + result[i+1:]
-
-            # Replace the character in solution with whitespace to handle duplicates
-            j = solution.index(guess[i])
-            solution = solution[:j] + " " + solution[j+1:]
-        # print(f"{guess=} | {solution=} | {result=}")
-
-    return result
+    if n == 0:
+        return 0.0, 0.0, 1.0
+    z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    rate = hits / n
+    center = (rate + z * z / (2 * n)) / (1 + z * z / n)
+    spread = z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return rate, max(center - spread, 0.0), min(center + spread, 1.0)
+
+class Turn(NamedTuple):
+    """ One turn of a simulated game, as yielded by Tester.simulate() """
+    guess: str
+    # Result code (see feedback.py)
+    result: int
+    # How many options the WordBank had left after this result
+    remaining: int
+    # Seconds since the start of the game
+    elapsed: float
+    # Whether the next guess came from a search that finished within the budget
+    exhaustive: bool = True
 
 class Tester:
     """ Tester will be what gathers the statistical data from performance testing
     """
     def __init__(self) -> None:
+        # Every word that can be guessed, and the smaller list of words that can be the answer
         self.word_options = self.read_file()
+        self.solutions = self.read_file("valid_solutions.csv")
 
-    def read_file(self):
+    def read_file(self, name: str = "valid_guesses.csv"):
         """ Reads in the word bank downloaded from the interned, then parses for only valid words
 
+        Args:
+            name (str, optional): word list to read. Defaults to "valid_guesses.csv".
+
         Returns:
             pd.Dataframe: Single column Dataframe that has all possible 5 letter words
         """
@@ -79,19 +243,20 @@ class Tester:
                 return word.isalpha()
             return False
 
-        file = pd.read_csv(filepath_or_buffer=f'{RTDIR}\\..\\valid_guesses.csv', names=["Words"])
+        file = pd.read_csv(filepath_or_buffer=f'{RTDIR}/../{name}', names=["Words"])
         mask = file["Words"].apply(valid_word)
         return file[mask].reset_index(drop=True)
 
     # TODO: FIXME: Eventually change the typehinting for method to a more sophisticated dict or other typehint method
-    def play(self, start: str = "crane", solution: str = None, method: Literal['cum', 'uni', 'slo', 'tot'] = 'tot',
-             manual: bool = False):
+    def play(self, start: str = "crane", solution: str = None, method: Literal['cum', 'uni', 'slo', 'tot', 'max', 'two'] = 'tot',
+             manual: bool = False, hard: bool = False):
         """ Controls the actual play process of the game
 
         Args:
             start (str, optional): What should the first guess be? Defaults to "crane".
             solution (str, optional): What is the solution? (For simulation purposes) Defaults to Random.
             manual (bool, optional): Solve it manually or automatically? Defaults to False.
+            hard (bool, optional): Play by hard mode rules (reuse every hint). Defaults to False.
         """
         # Initialize wordbank and guess count, debug controls suppression of prints
         wb = WordBank(debug=manual)
@@ -101,39 +266,32 @@ class Tester:
 
         # If the solution is not defined, generate a random one
         if solution == "rand":
-            print(len(wb.word_bank["Words"]))
-            solution = wb.word_bank["Words"][random.randint(0,2309)]
+            solution = self.solutions["Words"][random.randrange(len(self.solutions["Words"]))]
 
         while True:
             # If the solution is unknown, prompt user for results, otherwise generate them
             if solution is None:
                 while True:
                     try:
-                        result = input(f"What were the results for '{guess}'? (2=green, 1=yellow, 0=grey) (ex. '02001'): ")
-                        if not len(result) == 5:
-                            raise ValueError("Invalid Result size, must be 5 digits. Try Again.")
-                        if not result.isnumeric():
-                            raise ValueError("Result must be numerical (no special or letters). Try Again.")
-                        if any(inv_num in result for inv_num in ['3', '4', '5', '6', '7', '8', '9']):
-                            raise ValueError("Result can only contain [0, 1, 2]. Try Again.")
+                        result = encode(input(f"What were the results for '{guess}'? (2=green, 1=yellow, 0=grey) (ex. '02001'): "))
                         break
                     except ValueError as e:
                         print(e)
                         # logger.error(e)
             else:
                 result = check(guess, solution)
-                print(f"[{solution=}]: Guessing '{guess}' with results '{result}' on attempt {guess_count}")
+                print(f"[{solution=}]: Guessing '{guess}' with results '{decode(result)}' on attempt {guess_count}")
 
             # Log result history
             guesses.append((guess, result))
 
             # Check for victory conditions
-            if result == "22222":
+            if result == SOLVED:
                 print("Victory!")
                 break
 
             # If playing manually, get next guess from user, otherwise generate next guess
-            guess = wb.submit_guess(guess, result, method)
+            guess = wb.submit_guess(guess, result, method, hard=hard)
             if manual:
                 while True:
                     try:
@@ -145,6 +303,8 @@ class Tester:
                         if not self.word_options["Words"].str.contains(guess).any():
                             print(self.word_options["Words"])
                             raise ValueError("Word guess must be in the Wordle database. Try Again.")
+                        if hard and not wb.hard_valid(guess):
+                            raise ValueError("Hard mode: guess must reuse every revealed hint. Try Again.")
                         break
                     except ValueError as e:
                         print(e)
@@ -160,57 +320,395 @@ class Tester:
         # FIXME: Is guess_count necessary now that the guesses are logged as a list?
         return guess_count, guesses
 
-    def permutations(self, method: Literal['cum', 'uni', 'slo', 'tot'] = 'tot'):
+    def simulate(self, start: str = "crane", solution: str = None,
+                 method: Literal['cum', 'uni', 'slo', 'tot', 'max', 'two'] = 'tot', hard: bool = False,
+                 verbose: bool = False, max_guesses: int = None, budget: float = None) -> Generator[Turn, None, None]:
+        """ Plays a game against a known solution one turn at a time
+
+        Unlike play(), nothing is printed unless verbose is set, so this is what bulk runs and
+        the Discord bot use. The game ends when the solution is found, the WordBank runs out of
+        options, or max_guesses is reached.
+
+        Args:
+            start (str, optional): What should the first guess be? Defaults to "crane".
+            solution (str, optional): What is the solution? Defaults to a random word.
+            method (str, optional): Probability calculation used for suggestions. Defaults to 'tot'.
+            hard (bool, optional): Play by hard mode rules (reuse every hint). Defaults to False.
+            verbose (bool, optional): Print each turn as it is played. Defaults to False.
+            max_guesses (int, optional): Stop after this many guesses. Defaults to no limit.
+            budget (float, optional): Seconds each suggestion has to be ready in (see
+                                        WordBank.submit_guess). Defaults to no limit.
+
+        Yields:
+            Turn: (guess, result, remaining, elapsed, exhaustive) for each guess played
+        """
+        wb = WordBank()
+        if solution is None:
+            solution = self.solutions["Words"][random.randrange(len(self.solutions["Words"]))]
+
+        time_start = time.perf_counter()
+        guess = start
+        guess_count = 0
+        while True:
+            result = check(guess, solution)
+            guess_count += 1
+
+            # Only ask for the next guess if there is going to be one
+            next_guess = None
+            remaining = 1
+            if result != SOLVED:
+                next_guess = wb.submit_guess(guess, result, method, hard=hard, budget=budget)
+                remaining = int(wb.word_bank["Words"].size)
+
+            if verbose:
+                print(f"[{solution=}]: Guessing '{guess}' with results '{decode(result)}' on attempt {guess_count}")
+            yield Turn(guess, result, remaining, time.perf_counter() - time_start, wb.exhaustive)
+
+            if next_guess is None or next_guess == "Failed":
+                return
+            if max_guesses is not None and guess_count >= max_guesses:
+                return
+            guess = next_guess
+
+    def play_all(self, start_word: str, method: Literal['cum', 'uni', 'slo', 'tot', 'max', 'two'] = 'tot',
+                 hard: bool = False):
+        """ Plays one start word against every potential solution
+
+        Args:
+            start_word (str): first guess of every game
+            method (str, optional): Probability calculation used for suggestions. Defaults to 'tot'.
+            hard (bool, optional): Play every game by hard mode rules. Defaults to False.
+
+        Returns:
+            tuple: (DataFrame of guess count and guesses per solution, list of failed games)
+        """
+        headers = ["Word", "Count", "Guesses"]
+        rows = []
+        # TODO: Add multiprocessing here
+        failed = []
+
+        # Loop through all potential solutions
+        for solution in self.solutions["Words"]:
+            guesses = [turn.guess for turn in self.simulate(start=start_word, solution=solution, method=method, hard=hard)]
+            count = len(guesses)
+
+            rows.append((solution, count, guesses))
+
+            if count > 6:
+                failed.append((solution, count, guesses))
+
+        return pd.DataFrame(rows, columns=headers), failed
+
+    def permutations(self, method: Literal['cum', 'uni', 'slo', 'tot', 'max', 'two'] = 'tot', hard: bool = False,
+                     start_words: list = None, profile_memory: bool = False):
         """ Runs through all the permutations of starting word compared to solution
 
             All other logic should be handled in the WordBank class
             TODO: Add multiprocessing here for faster runtimes
+
+            Results are saved to the Parquet datasets in data/ (see results_store.py). With
+            profile_memory, a memory report with a row per start word (see memory_profile.py)
+            is saved next to them in data/permutation_memory/{method}.csv
+
+        Args:
+            method (str, optional): Probability calculation used for suggestions. Defaults to 'tot'.
+            hard (bool, optional): Play every game by hard mode rules. Defaults to False.
+            start_words (list, optional): start words to run. Defaults to ['flash'].
+            profile_memory (bool, optional): trace memory after every start word, this slows
+                                                the run down. Defaults to False.
         """
+        # Hard mode results are kept separate so they don't overwrite the normal stats
+        mode = f"{method}_hard" if hard else method
 
         other_headers = ["Time", "Start", "Average Score", "Min Score", "Max Score", "Failure Count", "Failures"]
         df2 = pd.DataFrame(columns=other_headers)
 
+        if start_words is None:
+            start_words = ['flash'] # self.word_options["Words"]: # ['flash', 'caste', 'crane', 'worst']: #
+        profiler = MemoryProfiler() if profile_memory else None
+
         # Loop through all starting words
         time_start_perm = datetime.datetime.now()
-        for start_word in ['flash']: # self.word_options["Words"]: # ['flash', 'caste', 'crane', 'worst']: #
-            headers = ["Word", "Count"]
-            df = pd.DataFrame(columns=headers)
-            # TODO: Add multiprocessing here
-            row = [start_word]
-            failed = []
-
+        for start_word in start_words:
             time_start_word = datetime.datetime.now()
-            # Loop through all potential solutions
-            for solution in self.word_options["Words"]:
-                count, guesses = self.play(start=start_word, solution=solution, manual=False, method=method)
+            df, failed = self.play_all(start_word, method=method, hard=hard)
 
-                row.append(count)
-                df.loc[len(df.index)] = [solution, count]
-
-                if count > 6:
-                    failed.append((solution, count, guesses))
-
-            df.to_csv(path_or_buf=f"{RTDIR}/../data/permutations_{method}_{start_word}_full.csv", index=False)
+            results_store.write_games(df, method=mode, start=start_word)
             time_stop_word = datetime.datetime.now()
-            rrow = np.array(row[1:])
+            rrow = df["Count"].to_numpy()
             word_time = time_stop_word-time_start_word
             print(f"Took {word_time} seconds to process {start_word}")
-            print(f"{start_word} scored an average of {rrow.mean()} and failed {len(failed)} times")
+            print(f"{start_word} scored an average of {rrow.mean()} and failed {len(failed)} times{' (hard mode)' if hard else ''}")
 
             row2 = [word_time, start_word, rrow.mean(), rrow.min(), rrow.max(), len(failed), failed]
 
             df2.loc[len(df2.index)] = row2
 
+            if profiler is not None:
+                row = profiler.record(start_word)
+                print(f"Memory after {start_word}: {row['Traced MB']:.1f} MB traced "
+                      f"({row['Growth MB']:+.1f} MB since the start)")
+
         time_stop_perm = datetime.datetime.now()
         print(f"Took {time_stop_perm-time_start_perm} seconds to complete the permutations")
 
         # df.sort_values(by=["Odds", ""], ascending=False, inplace=True, ignore_index=True)
         df2.sort_values(by=["Average Score", "Failure Count"], ascending=True, inplace=True, ignore_index=True)
 
-        df2.to_csv(path_or_buf=f"{RTDIR}/../data/permutation_{method}_stats.csv", index=False)
+        results_store.write_stats(df2.values.tolist(), method=mode)
 
         print(df2)
 
+        if profiler is not None:
+            profiler.stop()
+            profiler.write(f"{MEMORY_DIR}/{mode}.csv")
+            print(profiler.report().drop(columns=["Top Sites"]).to_string())
+
+    def sample_openers(self, start_words: list, method: Literal['cum', 'uni', 'slo', 'tot', 'max', 'two'] = 'tot',
+                       samples: int = 500, batch: int = 25, tolerance: float = 0.1, confidence: float = 0.95,
+                       seed: int = 0, hard: bool = False, workers: int = 1) -> pd.DataFrame:
+        """ Estimates the average score of start words from a random sample of the solutions
+
+            Every start word plays the same seeded draw of solutions, so differences between
+            them aren't just luck of the draw. Games are played in batches, and a start word
+            stops as soon as the confidence interval of its average is within the tolerance
+            (see sample_opener). The guess counts spread about 0.7 around the average, so a
+            tolerance of 0.1 stops after about 200 games and 0.05 takes about 800.
+
+            Results are saved to data/sample_{method}.csv
+
+        Args:
+            start_words (list): start words to evaluate
+            method (str, optional): Probability calculation used for suggestions. Defaults to 'tot'.
+            samples (int, optional): most solutions to play per start word. Defaults to 500.
+            batch (int, optional): games played between interval checks. Defaults to 25.
+            tolerance (float, optional): stop once the average is known to +/- this many guesses. Defaults to 0.1.
+            confidence (float, optional): confidence level of the intervals. Defaults to 0.95.
+            seed (int, optional): seed of the solution draw. Defaults to 0.
+            hard (bool, optional): Play every game by hard mode rules. Defaults to False.
+            workers (int, optional): processes to spread the start words over. Defaults to 1.
+
+        Returns:
+            pd.DataFrame: estimate and intervals for each start word, best first
+        """
+        mode = f"{method}_hard" if hard else method
+        solutions = list(self.solutions["Words"])
+        draw = random.Random(seed).sample(solutions, min(samples, len(solutions)))
+
+        headers = ["Time", "Start", "Games", "Average Score", "Average Low", "Average High", "Half Width",
+                   "Failure Rate", "Failure Low", "Failure High"]
+        df = pd.DataFrame(columns=headers)
+
+        time_start_sample = datetime.datetime.now()
+        params = (start_words, itertools.repeat(draw), itertools.repeat(method), itertools.repeat(hard),
+                  itertools.repeat(batch), itertools.repeat(tolerance), itertools.repeat(confidence),
+                  itertools.repeat(len(solutions)))
+        with contextlib.ExitStack() as stack:
+            if workers > 1:
+                executor = stack.enter_context(concurrent.futures.ProcessPoolExecutor(max_workers=workers))
+                results = executor.map(sample_opener, *params)
+            else:
+                results = map(sample_opener, *params)
+
+            time_start_word = datetime.datetime.now()
+            for start_word, counts in zip(start_words, results):
+                mean, low, high = mean_interval(counts, confidence, len(solutions))
+                rate, rate_low, rate_high = rate_interval(sum(1 for c in counts if c > 6), len(counts), confidence)
+                # With workers, this is the time since the previous result came in
+                word_time = datetime.datetime.now() - time_start_word
+                time_start_word = datetime.datetime.now()
+                df.loc[len(df.index)] = [word_time, start_word, len(counts), mean, low, high, (high - low) / 2,
+                                         rate, rate_low, rate_high]
+                print(f"{start_word} scored {mean:.4f} +/- {(high - low) / 2:.4f} ({low:.4f} to {high:.4f}) "
+                      f"and failed {rate:.2%} of {len(counts)} games in {word_time}")
+
+        print(f"Took {datetime.datetime.now()-time_start_sample} seconds to sample the start words")
+        df.sort_values(by=["Average Score", "Failure Rate"], ascending=True, inplace=True, ignore_index=True)
+        df.to_csv(path_or_buf=f"{RTDIR}/../data/sample_{mode}.csv", index=False)
+        return df
+
+    def search_openers(self, method: Literal['cum', 'uni', 'slo', 'tot', 'max', 'two'] = 'tot', openers: list = None,
+                       top: int = 10, hard: bool = False, depths: tuple = (2, 3), out: str = None) -> pd.DataFrame:
+        """ Branch and bound search for the opener with the best average score
+
+            Every opener starts with a cheap bound on its average from how it splits the solutions
+            (see opener_lower_bounds). The opener with the lowest bound is then always the next
+            one looked at: its bound is tightened by following the method a guess deeper (see
+            strategy_total with each of depths), and once it has been through every depth, it is
+            played out in full. The search stops as soon as the lowest bound left can't beat the
+            best average that has actually been played, every opener that is left is pruned.
+
+        Args:
+            method (str, optional): Probability calculation used for suggestions. Defaults to 'tot'.
+            openers (list, optional): start words to consider. Defaults to every valid guess.
+            top (int, optional): how many openers to show on the leaderboard. Defaults to 10.
+            hard (bool, optional): Play every game by hard mode rules. Defaults to False.
+            depths (tuple, optional): guesses deep each bound is tightened to, in order, before an
+                                        opener is played in full. Defaults to (2, 3).
+            out (str, optional): csv file the leaderboard is saved to after every played opener.
+                                    Defaults to data/opener_search_{method}.csv
+
+        Returns:
+            pd.DataFrame: leaderboard of the played openers, best first
+        """
+        mode = f"{method}_hard" if hard else method
+        if out is None:
+            out = f"{RTDIR}/../data/opener_search_{mode}.csv"
+        if openers is None:
+            openers = self.word_options["Words"]
+        wb = WordBank()
+        solutions = load_index(tuple(self.solutions["Words"]))
+        index = load_index(tuple(openers))
+
+        # Bound every opener at once, this is the only step that looks at all of them
+        time_start_search = datetime.datetime.now()
+        bounds = opener_lower_bounds(partition_sizes(index.codes, solutions.codes)) / len(solutions)
+        print(f"Bounded {len(index)} openers in {datetime.datetime.now()-time_start_search} seconds")
+
+        # (bound, how many of the depths it has been through, opener), lowest bound first
+        heap = [(bound, 0, i) for i, bound in enumerate(bounds.tolist())]
+        heapq.heapify(heap)
+        tightened = [0] * len(depths)
+
+        board = pd.DataFrame(columns=["Time", "Start", "Lower Bound", "Average Score", "Failure Count"])
+        best = np.inf
+        while heap:
+            bound, level, i = heapq.heappop(heap)
+            # Nothing left in the heap has a lower bound, so none of them can win either
+            if bound >= best:
+                print(f"Pruned the remaining {len(heap) + 1} openers (lower bound {bound:.4f} >= {best:.4f})")
+                break
+
+            start_word = str(index.words[i])
+            if level < len(depths):
+                total, _ = strategy_total(wb, start_word, method, hard, depth=depths[level])
+                heapq.heappush(heap, (total / len(solutions), level + 1, i))
+                tightened[level] += 1
+                if sum(tightened) % 500 == 0:
+                    print(f"Tightened {' / '.join(f'{n} to depth {d}' for n, d in zip(tightened, depths))} bounds, "
+                          f"played {len(board.index)}, lowest bound left {bound:.4f}")
+                continue
+
+            # Every bound has been tightened, so it's worth playing the opener out
+            time_start_word = datetime.datetime.now()
+            total, failed = strategy_total(wb, start_word, method, hard)
+            word_time = datetime.datetime.now() - time_start_word
+
+            average = total / len(solutions)
+            best = min(best, average)
+            board.loc[len(board.index)] = [word_time, start_word, bound, average, failed]
+            board.sort_values(by=["Average Score", "Failure Count"], ascending=True, inplace=True, ignore_index=True)
+            board.to_csv(path_or_buf=out, index=False)
+
+            print(f"[{len(board.index)} played] {start_word} (bound {bound:.4f}) scored an average of {average} in {word_time}")
+            print(board.head(top))
+
+        print(f"Took {datetime.datetime.now()-time_start_search} seconds to search the openers")
+        return board.head(top)
+
+    def worst_cases(self, start_words: list, limit: int = 6, breadth: int = 10, out: str = None) -> pd.DataFrame:
+        """ Reports how many guesses each start word can guarantee in the worst case
+
+            Unlike permutations(), this doesn't play out every solution. It splits the word list
+            by the results of the start word, then searches for a strategy that finishes every
+            group in time (see minimax.worst_case_depth).
+
+        Args:
+            start_words (list): start words to analyze
+            limit (int, optional): give up on a start word past this many guesses. Defaults to 6.
+            breadth (int, optional): guesses tried at each step of the search. Defaults to 10.
+            out (str, optional): csv file to save the report to. Defaults to not saving it.
+
+        Returns:
+            pd.DataFrame: worst case depth for each start word, best first
+        """
+        index = load_index(tuple(self.word_options["Words"]))
+        # Any word can be guessed, but only the solution list has to be solved
+        candidates = self.solutions["Words"].map(index.position).to_numpy()
+        df = pd.DataFrame(columns=["Time", "Start", "Worst Case", "Largest Bucket"])
+
+        for start_word in start_words:
+            time_start_word = datetime.datetime.now()
+            depth, largest = worst_case_depth(index, start_word, candidates, limit=limit, breadth=breadth)
+            word_time = datetime.datetime.now() - time_start_word
+
+            if depth is None:
+                print(f"{start_word} can't guarantee a solve within {limit} guesses (took {word_time})")
+            else:
+                print(f"{start_word} guarantees a solve within {depth} guesses (took {word_time})")
+            df.loc[len(df.index)] = [word_time, start_word, depth, largest]
+
+        df.sort_values(by=["Worst Case", "Largest Bucket"], ascending=True, inplace=True, ignore_index=True)
+        if out:
+            df.to_csv(path_or_buf=out, index=False)
+
+        print(df)
+        return df
+
+    def multi_play(self, solutions: list, start: str = "crane", max_guesses: int = None):
+        """ Simulates a multi-board game (Quordle, Octordle, etc.) with known solutions
+
+        Args:
+            solutions (list): solution for each board
+            start (str, optional): What should the first guess be? Defaults to "crane".
+            max_guesses (int, optional): guess limit. Defaults to 5 more than the board count.
+
+        Returns:
+            tuple: (solved all boards?, guesses played, seconds spent choosing each guess)
+        """
+        if max_guesses is None:
+            max_guesses = len(solutions) + 5
+        mb = MultiBoard(boards=len(solutions))
+        guesses = []
+        turn_times = []
+        guess = start
+
+        while len(guesses) < max_guesses:
+            results = [check(guess, solution) for solution in solutions]
+            guesses.append((guess, results))
+            print(f"[{solutions=}]: Guessing '{guess}' with results {[decode(r) for r in results]} on attempt {len(guesses)}")
+
+            time_start_turn = datetime.datetime.now()
+            guess = mb.submit_guess(guess, results)
+            turn_times.append((datetime.datetime.now() - time_start_turn).total_seconds())
+
+            if guess == "Solved":
+                return True, guesses, turn_times
+            if guess == "Failed":
+                print("Error! Ran out of options! (This shouldn't be possible)")
+                break
+
+        return False, guesses, turn_times
+
+    def multi_permutations(self, boards: int = 4, games: int = 100, start: str = "crane", seed: int = 0):
+        """ Plays a batch of random multi-board games and reports solve rate and turn latency
+
+        Args:
+            boards (int, optional): boards per game. Defaults to 4.
+            games (int, optional): number of games to play. Defaults to 100.
+            start (str, optional): first guess of every game. Defaults to "crane".
+            seed (int, optional): seed for choosing the solutions. Defaults to 0.
+
+        Returns:
+            pd.DataFrame: one row per game
+        """
+        rng = random.Random(seed)
+        df = pd.DataFrame(columns=["Solutions", "Solved", "Guesses", "Mean Turn", "Max Turn"])
+
+        time_start_perm = datetime.datetime.now()
+        for _ in range(games):
+            solutions = rng.sample(list(self.solutions["Words"]), boards)
+            solved, guesses, turn_times = self.multi_play(solutions, start=start)
+            df.loc[len(df.index)] = [solutions, solved, len(guesses), np.mean(turn_times), np.max(turn_times)]
+        time_stop_perm = datetime.datetime.now()
+
+        print(f"Took {time_stop_perm-time_start_perm} seconds to play {games} games on {boards} boards")
+        print(f"Solve rate: {df['Solved'].mean():.2%}, average guesses: {df['Guesses'].mean():.3f}")
+        print(f"Turn latency: mean {df['Mean Turn'].mean()*1000:.1f} ms, worst {df['Max Turn'].max()*1000:.1f} ms")
+
+        df.to_csv(path_or_buf=f"{RTDIR}/../data/multi_{boards}_stats.csv", index=False)
+        return df
+
 
 if __name__ == "__main__":
     t1 = Tester()
@@ -1,13 +1,90 @@
 """_summary_
     https://www.wordunscrambler.net/word-list/wordle-word-list
 """
+import hashlib
+import json
 import os
 
 import pandas as pd
 import requests
+import requests.adapters
 from bs4 import BeautifulSoup
 
 RTDIR = os.path.dirname(__file__)
+CACHE_DIR = f"{RTDIR}/../data/http_cache"
+
+def make_session(pool_size: int = 8) -> requests.Session:
+    """ Creates a session that reuses connections, so repeated requests skip the handshakes
+
+    Args:
+        pool_size (int, optional): connections kept open per host, at least the number of
+                                    threads sharing the session. Defaults to 8.
+
+    Returns:
+        requests.Session: the pooled session
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def fetch_cached(session: requests.Session, url: str, cache_dir: str = CACHE_DIR) -> tuple:
+    """ Gets a page, only downloading it again if the server says it has changed
+
+    The last response body is kept on disk with its ETag and Last-Modified headers, which
+    are sent back as If-None-Match and If-Modified-Since. A 304 reply is answered from disk.
+
+    Args:
+        session (requests.Session): session to send the request with
+        url (str): page to get
+        cache_dir (str, optional): where responses are cached. Defaults to data/http_cache.
+
+    Raises:
+        requests.RequestException: if the request fails and there is nothing cached to fall back on
+
+    Returns:
+        tuple: (page text, True if it was downloaded or False if it came from the cache)
+    """
+    name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    body_path = f"{cache_dir}/{name}.txt"
+    meta_path = f"{cache_dir}/{name}.json"
+
+    headers = {}
+    if os.path.exists(body_path) and os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as file:
+            meta = json.load(file)
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        response = session.get(url=url, headers=headers, timeout=10)
+        if response.status_code != 304:
+            response.raise_for_status()
+    except requests.RequestException:
+        # A source being down shouldn't lose the copy we already have, even one saved without
+        # an ETag or Last-Modified to revalidate it with
+        if not os.path.exists(body_path):
+            raise
+        print(f"Failed to retrieve {url}, using the cached copy.")
+        response = None
+
+    if response is None or response.status_code == 304:
+        with open(body_path, encoding="utf-8") as file:
+            return file.read(), False
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(body_path, "w", encoding="utf-8") as file:
+        file.write(response.text)
+    with open(meta_path, "w", encoding="utf-8") as file:
+        json.dump({
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }, file)
+    return response.text, True
 
 def scrape_website(url: str) -> BeautifulSoup:
     """_summary_
@@ -10,10 +10,17 @@
 """
 import datetime
 import os
-from typing import Literal
+from typing import Dict, Literal, NamedTuple, Tuple
 import random
+import time
 
+import kernels
+import numpy as np
 import pandas as pd
+from feedback import DIGITS, encode
+from lookahead import two_ply_search
+from minimax import minimax_search
+from word_index import ALPHABET, MAX_COUNT, feedback_matrix, load_index, partition_sizes, popcount
 
 RTDIR = os.path.dirname(__file__)
 
@@ -46,16 +53,56 @@ def exact_comp(first_word, second_word):
     score = difflib.SequenceMatcher(None, first_word, second_word).ratio()
     return score
 
+class Snapshot(NamedTuple):
+    """ Everything submit_guess changes, saved by WordBank.snapshot() to roll back to later """
+    word_bank: pd.DataFrame
+    guess_count: int
+    confirmed: list
+    confirmed_count: int
+    rejected: list
+    possible: str
+    slot_allowed: np.ndarray
+    min_counts: np.ndarray
+    max_counts: np.ndarray
+    exhaustive: bool
+
+
 class WordBank:
     """ The WordBank object represents all possible Wordle options
         as they narrow down with more guesses.
     """
-    def __init__(self, debug = False):
+    def __init__(self, debug = False, priors: dict = None):
+        """ Constructor for the WordBank
+
+        Args:
+            debug (bool, optional): print the constraints and remaining options. Defaults to False.
+            priors (dict, optional): relative weight of each solution (ex. word frequency), used
+                                        to weight the letter statistics and the final odds.
+                                        Solutions that aren't listed get the smallest weight
+                                        given to a solution (1.0 if none of them are listed).
+                                        Defaults to equal weights.
+        """
         self.debug = debug
+        # Every word that Wordle accepts as a guess
         self.original_bank = self.read_file()
-        self.word_bank = self.original_bank.copy()
         self.guess_count = 0
 
+        # Array index of the original bank, built once and shared by every WordBank
+        self.index = load_index(tuple(self.original_bank["Words"]))
+        # Row of each word in the index, so filtering can skip looking words up by name
+        self.original_bank["Row"] = np.arange(len(self.original_bank))
+        # Load the kernels now, so the first time budgeted guess doesn't spend its budget on it
+        kernels.warm_up(self.index.codes, self.index.counts)
+
+        # Only words from the solution list can be the answer, so only those are tracked as options
+        self.solution_bank = self.read_file("valid_solutions.csv")
+        self.solution_bank["Row"] = self.solution_bank["Words"].map(self.index.position)
+        # Unlisted solutions get the smallest weight given to a solution, weights of words that
+        # can't be the answer don't count
+        weights = self.solution_bank["Words"].map(priors or {}).astype(float)
+        self.solution_bank["Prior"] = weights.fillna(weights.min() if weights.notna().any() else 1.0)
+        self.word_bank = self.solution_bank.copy()
+
         # When a letter is confirmed to a location (GREEN), it will be placed here
         self.confirmed = ["", "", "", "", ""]
         self.confirmed_count = 0
@@ -64,6 +111,16 @@ class WordBank:
         # If a letter is identified, but location is unknown (YELLOW), it will be placed here
         self.possible = ""
 
+        # The constraints that are actually used for filtering, compiled from every result so far
+        # Which letters are still allowed in each slot
+        self.slot_allowed = np.ones((5, 26), dtype=bool)
+        # Fewest and most copies of each letter the solution can have
+        self.min_counts = np.zeros(26, dtype=np.uint8)
+        self.max_counts = np.full(26, MAX_COUNT, dtype=np.uint8)
+
+        # Whether the last suggestion came from a search that finished (see submit_guess's budget)
+        self.exhaustive = True
+
         # problem_words = []
         # for it, row1 in self.original_bank.iterrows():
         #     word1 = row1["Words"]
@@ -75,9 +132,13 @@ class WordBank:
         # self.original_bank.sort_values(by=["Slot Odds"], ascending=False, inplace=True, ignore_index=True)
         # print(self.original_bank)
 
-    def read_file(self):
+    def read_file(self, name: str = "valid_guesses.csv"):
         """ Reads in the word bank downloaded from the interned, then parses for only valid words
 
+        Args:
+            name (str, optional): word list to read, valid_solutions.csv only has the words that
+                                    can be the answer. Defaults to "valid_guesses.csv".
+
         Returns:
             pd.Dataframe: Single column Dataframe that has all possible 5 letter words
         """
@@ -96,52 +157,76 @@ class WordBank:
         #         return word.isalpha()
         #     return False
 
-        file = pd.read_csv(filepath_or_buffer=f'{RTDIR}\\..\\valid_guesses.csv', names=["Words"])
+        file = pd.read_csv(filepath_or_buffer=f'{RTDIR}/../{name}', names=["Words"])
         # mask = file["Words"].apply(valid_word)
         return file#[mask].reset_index(drop=True)
 
-    def submit_guess(self, word: str, res: str, method: Literal['cum', 'uni', 'slo', 'tot']) -> str:
+    def submit_guess(self, word: str, res: int, method: Literal['cum', 'uni', 'slo', 'tot', 'max', 'two'],
+                     hard: bool = False, budget: float = None) -> str:
         """ Update the database off of recent guess, then select the next most likely
         (or most productive) option to make progress
 
         Args:
             word (str): Guess that will be used to modify the word bank
-            res (str): Results from the guess, 2 is correct, 1 is present, 0 is rejected
+            res (int): Result code of the guess (see feedback.py). A result string like "02001"
+                        (2 is correct, 1 is present, 0 is rejected) is also accepted.
+            method (str): How to score the next guess. 'max' picks the guess with the smallest
+                            worst case instead of using letter probabilities, and 'two' looks
+                            two guesses ahead (see lookahead.py).
+            hard (bool, optional): Only suggest guesses that reuse every revealed hint. Defaults to False.
+            budget (float, optional): Seconds the suggestion has to be ready in. 'max' and 'two' then
+                                        run as anytime searches, returning the best guess found by
+                                        the deadline, and self.exhaustive says whether the search
+                                        finished. The letter odds methods always finish in time.
+                                        Defaults to no limit.
 
         Returns:
             str: recommended next guess based on probability algorithm
         """
+        deadline = time.perf_counter() + budget if budget is not None else None
+        self.exhaustive = True
         # User Input error handling assertions
         assert len(word) == 5
-        assert len(res) == 5
         assert word.isalpha()
-        assert res.isnumeric()
+        marks = DIGITS[encode(res)]
         self.guess_count += 1
 
-        # Parse results and update letter information
+        # Copy-on-write: forks and snapshots share the constraints with this WordBank, so they are
+        # copied before being updated instead of changed in place (the word bank frame is always
+        # replaced by the filter below, never edited before that)
+        self.confirmed = list(self.confirmed)
+        self.rejected = list(self.rejected)
+        self.slot_allowed = self.slot_allowed.copy()
+        self.min_counts = self.min_counts.copy()
+        self.max_counts = self.max_counts.copy()
+
+        # Parse results and update the slot constraints
         for i, letter in enumerate(word):
-            # If the correct letter is in the correct spot
-            if res[i] == "2":
+            l = ALPHABET.index(letter)
+            # If the correct letter is in the correct spot, nothing else can go there
+            if marks[i] == 2:
                 self.confirmed[i] = letter
-                # In case a duplicate letter occurs before this slot is confirmed, remove the letter from rejected
-                self.rejected[i].replace(letter, "")
-            # If the letter is present but in a different spot
-            elif res[i] == "1":
-                self.rejected[i] += letter
-                self.possible += letter
-            # If the letter is not present (or already confirmed)
-            elif res[i] == "0":
-                # TODO: Test and see what happens if the previous duplicate is confirmed
-                # If letter is rejected, it checks for duplicate letters before rejecting all slots
-                loc = word.index(letter)
-                if loc != i and res[loc] in ["1", "2"]:
-                    self.rejected[i] += letter
-                # If there are no duplicate letters, remove from possibilities and reject all slots
-                else:
-                    self.possible.replace(letter, "")
-                    for j in range(5):
-                        if self.confirmed[j] != letter:
-                            self.rejected[j] += letter
+                self.slot_allowed[i] = False
+                self.slot_allowed[i][l] = True
+            # Otherwise (YELLOW or GREY) the letter can't be in this spot, or it would be GREEN
+            else:
+                self.slot_allowed[i][l] = False
+
+        # Parse results and update the letter count constraints
+        for letter in set(word):
+            l = ALPHABET.index(letter)
+            # Every GREEN or YELLOW copy of a letter proves that the solution has one
+            shown = sum(1 for c, m in zip(word, marks) if c == letter and m > 0)
+            self.min_counts[l] = max(self.min_counts[l], shown)
+            # A GREY copy means there are no more than the ones that were shown
+            if any(c == letter and m == 0 for c, m in zip(word, marks)):
+                self.max_counts[l] = shown
+
+        # Keep the readable summaries up to date for debugging
+        for i in range(5):
+            if self.confirmed[i] == "":
+                self.rejected[i] = "".join(ALPHABET[l] for l in np.flatnonzero(~self.slot_allowed[i]))
+        self.possible = "".join(ALPHABET[l] * c for l, c in enumerate(self.min_counts))
 
         count = 0
         for c in self.confirmed:
@@ -154,9 +239,9 @@ class WordBank:
             print(f"{self.confirmed=} | {self.rejected=} | {self.possible=}")
 
         # Generate a mask of the WordBank Dataframe by comparing the options with the known data
-        mask = self.word_bank["Words"].apply(self.search)
-        # pattern = "..ing"
-        # mask2 = self.word_bank["Words"].str.contains(pat=pattern, regex=True)
+        mask = self.index.constraint_mask(
+            self.slot_allowed, self.min_counts, self.max_counts, self.word_bank["Row"].to_numpy()
+        )
         # Apply the mask on the Dataframe and drop all False entries
         self.word_bank = self.word_bank[mask].reset_index(drop=True)
 
@@ -165,28 +250,47 @@ class WordBank:
             print("Error! No more options!")
             return "Failed"
 
+        # Out of time before a slow search could even start, fall back to the letter odds
+        if method in ['max', 'two'] and deadline is not None and time.perf_counter() >= deadline:
+            self.exhaustive = False
+            method = 'slo'
+
+        # Minimax looks at every guess, not just the remaining words, so it skips the odds
+        if method == 'max':
+            guess = self.minimax_guess(hard, deadline)
+            if self.debug:
+                print("\nRemaining:")
+                print(self.word_bank)
+                print(f"Minimax sug: {guess}")
+            return guess
+
+        # Same for the two move lookahead
+        if method == 'two':
+            guess = self.lookahead_guess(hard, deadline=deadline)
+            if self.debug:
+                print("\nRemaining:")
+                print(self.word_bank)
+                print(f"Lookahead sug: {guess}")
+            return guess
+
         # Calculate the probability of remaining options and append as a column (based on config)
         tot_alpha, con_alpha, slot_alpha = self.generate_probs()
         if method in ['cum', 'tot']:
-            self.word_bank["Cumul Odds"] = self.word_bank["Words"].apply(
-                func=self.solution_odds,
-                args=(tot_alpha,)
-            )
-            # TEMP: test with whole bank
+            self.word_bank["Cumul Odds"] = self.score_words(tot_alpha)
         if method in ['uni', 'tot']:
-            self.word_bank["Unique Odds"] = self.word_bank["Words"].apply(func=self.solution_odds, args=(con_alpha,))
-            # TEMP: test with whole bank
+            self.word_bank["Unique Odds"] = self.score_words(con_alpha)
         if method in ['slo', 'tot']:
-            self.word_bank["Slot Odds"] = self.word_bank["Words"].apply(func=self.solution_odds, args=(slot_alpha,True))
-            # TEMP: test with whole bank
-            self.original_bank["Slot Odds"] = self.original_bank["Words"].apply(func=self.solution_odds, args=(slot_alpha,True))
+            self.word_bank["Slot Odds"] = self.score_words(slot_alpha, True)
 
         # If combining configurations, generate a new column will all other data
         if method == 'tot':
             # Combine all of the odds
-            def sum_cats(row):
-                return row["Cumul Odds"] * row["Unique Odds"] * row["Slot Odds"]
-            self.word_bank["Total Odds"] = self.word_bank.apply(func=sum_cats, axis=1)
+            self.word_bank["Total Odds"] = self.word_bank["Cumul Odds"] * self.word_bank["Unique Odds"] * self.word_bank["Slot Odds"]
+
+        # Likelier solutions are worth more (every prior is 1.0 unless priors were given)
+        for column in ["Cumul Odds", "Unique Odds", "Slot Odds", "Total Odds"]:
+            if column in self.word_bank:
+                self.word_bank[column] *= self.word_bank["Prior"]
 
         # Sort the Dataframe based on configuration
         words = ["", "", "", ""]
@@ -205,46 +309,13 @@ class WordBank:
         else:
             print("Invalid probability calculation configuration!")
 
-        def find_bridge(word, char_list):
-            score = 0
-            for l in char_list:
-                if l in word:
-                    score += .2
-            return score
-
-        # TODO: The original bank should only be used to eliminate similar words
-        oddballs = ""
-        flag = False
-        if word == "cower" and res == "02022":
-            oddballs = "pmgbkvnx"
-            flag = True
-        elif word == "baste" and res == "02222":
-            oddballs = "ptwc"
-            flag = True
-        elif word == "grace" and res == "22202":
-            oddballs = "vtdpz"
-            flag = True
-        elif word == "share" and res == "22202":
-            oddballs = "dkmpv"
-            flag = True
-        elif word == "watch" and res == "02222":
-            oddballs = "bchpw"
-            flag = True
-
-        if flag:
-            # Search the original bank for words that may eliminate the missing letters
-            self.original_bank["Sim"] = self.original_bank["Words"].apply(func=find_bridge, args=(oddballs,))
-
-            # Drop values that don't score high enough
-            index_sim = self.original_bank[(self.original_bank['Sim'] <= 0.4)].index
-            self.original_bank.drop(index_sim, inplace=True)
-
-            # Sort the filtered results and reset the index
-            self.original_bank.sort_values(by=["Sim"], ascending=False, inplace=True, ignore_index=True)
-            self.original_bank = self.original_bank.reset_index(drop=True)
-
-            # Return the most likely suggested word
-            return self.original_bank["Words"][0]
+        # When the remaining words only differ in a slot or two, guessing them one at a time can
+        # run out of guesses (watch, match, batch, ...), so look for a guess that splits them
+        splitter = self.find_splitter(hard)
+        if splitter is not None:
+            if self.debug:
+                print(f"Splitting {self.word_bank['Words'].size} similar words with: {splitter}")
+            return splitter
 
         # Print results to user if they are actively participating
         if self.debug:
@@ -254,6 +325,167 @@ class WordBank:
 
         return self.word_bank["Words"][0]
 
+    def snapshot(self) -> Snapshot:
+        """ Saves the current state of the game, to roll back to with rollback()
+
+        Nothing is copied, submit_guess replaces the state instead of changing it in place.
+
+        Returns:
+            Snapshot: the saved state
+        """
+        return Snapshot(*(getattr(self, field) for field in Snapshot._fields))
+
+    def rollback(self, snapshot: Snapshot):
+        """ Returns the game to a saved state, undoing every guess submitted since
+
+        Args:
+            snapshot (Snapshot): state saved by snapshot()
+        """
+        for field, value in zip(Snapshot._fields, snapshot):
+            setattr(self, field, value)
+
+    def fork(self) -> "WordBank":
+        """ Copy of this WordBank that can take more guesses without changing this one
+
+        The word lists, index and current state are shared rather than copied (see snapshot()),
+        so a fork costs about as much as an empty object.
+
+        Returns:
+            WordBank: the fork
+        """
+        child = WordBank.__new__(WordBank)
+        child.__dict__.update(self.__dict__)
+        return child
+
+    def branches(self, word: str) -> Dict[int, np.ndarray]:
+        """ Splits the remaining options by the result a guess would get against each of them
+
+        This is what every possible result of the guess would leave, without submitting it.
+
+        Args:
+            word (str): the guess to explore
+
+        Returns:
+            dict: rows of the index left for each result code that is possible (see feedback.py)
+        """
+        rows = self.word_bank["Row"].to_numpy()
+        codes = feedback_matrix(self.index.codes[self.index.position[word]][None, :], self.index.codes[rows])[0]
+        order = np.argsort(codes, kind="stable")
+        results, starts = np.unique(codes[order], return_index=True)
+        return dict(zip(results.tolist(), np.split(rows[order], starts[1:])))
+
+    def what_if(self, word: str, res: int, method: Literal['cum', 'uni', 'slo', 'tot', 'max', 'two'],
+                hard: bool = False, budget: float = None) -> Tuple["WordBank", str]:
+        """ Submits a guess to a fork, leaving this game as it was
+
+        Args:
+            word (str): the guess
+            res (int): the result to try (see submit_guess)
+            method (str): how to score the next guess (see submit_guess)
+            hard (bool, optional): Only suggest hard mode guesses. Defaults to False.
+            budget (float, optional): Seconds the suggestion has to be ready in. Defaults to no limit.
+
+        Returns:
+            tuple: (the fork after the guess, its suggested next guess)
+        """
+        child = self.fork()
+        return child, child.submit_guess(word, res, method, hard=hard, budget=budget)
+
+    def find_splitter(self, hard: bool = False, breadth: int = 64):
+        """ Finds a guess that separates a cluster of words that only differ in one or two slots
+
+        The letters in the differing slots are packed into a 26 bit mask, and every guess is
+        scored by how many of those letters it covers (a popcount against its own letter mask).
+        The best covering guesses are then checked for how many groups they actually split the
+        cluster into. Nothing on the WordBank is modified.
+
+        Args:
+            hard (bool, optional): Only consider legal hard mode guesses. Defaults to False.
+            breadth (int, optional): how many of the best covering guesses to check. Defaults to 64.
+
+        Returns:
+            str: a guess that splits the cluster better than the top suggestion, or None
+        """
+        rows = self.word_bank["Row"].to_numpy()
+        if rows.size < 3:
+            return None
+        codes = self.index.codes[rows]
+        differing = np.flatnonzero((codes != codes[0]).any(axis=0))
+        if differing.size > 2:
+            return None
+
+        # Every letter that shows up in a differing slot is worth testing for
+        target = np.bitwise_or.reduce(np.uint32(1) << codes[:, differing].ravel().astype(np.uint32))
+
+        pool = np.flatnonzero(self.hard_mask()) if hard else np.arange(len(self.index))
+        cover = popcount(self.index.letter_bits[pool] & target)
+        top = pool[np.argsort(-cover, kind="stable")[:breadth]]
+
+        # Compare the best splitters against just guessing the top suggestion
+        options = np.concatenate([rows[:1], top])
+        groups = (partition_sizes(self.index.codes[options], codes) > 0).sum(axis=1)
+        best = np.argmax(groups[1:]) + 1
+        if groups[best] <= groups[0]:
+            return None
+        return str(self.index.words[options[best]])
+
+    def minimax_guess(self, hard: bool = False, deadline: float = None) -> str:
+        """ Finds the guess that leaves the fewest remaining options in the worst case
+
+        Args:
+            hard (bool, optional): Only consider legal hard mode guesses. Defaults to False.
+            deadline (float, optional): time.perf_counter() to stop searching at, sets
+                                        self.exhaustive. Defaults to no limit.
+
+        Returns:
+            str: the guess with the smallest largest result bucket
+        """
+        candidates = self.word_bank["Row"].to_numpy()
+        pool = np.flatnonzero(self.hard_mask()) if hard else None
+        guess, self.exhaustive = minimax_search(self.index, candidates, pool, deadline)
+        return str(self.index.words[guess])
+
+    def lookahead_guess(self, hard: bool = False, top: int = 10, budget: float = None,
+                        deadline: float = None) -> str:
+        """ Finds the guess that leaves the fewest options after the best follow-up guess
+
+        Args:
+            hard (bool, optional): Only consider legal hard mode guesses. Defaults to False.
+            top (int, optional): how many first guesses to look ahead from. Defaults to 10.
+            budget (float, optional): seconds to spend searching, if there is no deadline. Defaults to no limit.
+            deadline (float, optional): time.perf_counter() to stop searching at. Defaults to no limit.
+
+        Returns:
+            str: the best guess found in time, self.exhaustive says whether the search finished
+        """
+        if deadline is None and budget is not None:
+            deadline = time.perf_counter() + budget
+        candidates = self.word_bank["Row"].to_numpy()
+        pool = np.flatnonzero(self.hard_mask()) if hard else None
+        guess, self.exhaustive = two_ply_search(self.index, candidates, pool, top=top, deadline=deadline)
+        return str(self.index.words[guess])
+
+    def hard_mask(self) -> np.ndarray:
+        """ Finds every word in the original bank that is a legal hard mode guess
+
+        Returns:
+            np.ndarray: boolean mask in the order of the original word list
+        """
+        return self.index.hard_mask(self.confirmed, self.min_counts)
+
+    def hard_valid(self, word: str) -> bool:
+        """ Checks whether a guess reuses every hint that has been revealed so far
+
+        Args:
+            word (str): the guess being checked
+
+        Returns:
+            bool: True if the word is allowed in hard mode
+        """
+        if word not in self.index.position:
+            return False
+        return bool(self.hard_mask()[self.index.position[word]])
+
     def generate_probs(self):
         """ Generate the value of each individual letter in a word, this will later be used to
             calculate the value of a word towards narrowing down the remaining options.
@@ -269,56 +501,17 @@ class WordBank:
             tuple: contains 3 dictionaries that show (for each letter) the total count, the
                     count per slot (5), and the amount of words that contain each letter
         """
-        # Dictionary of all letters in the alphabet, and the percentage of occurances
-        total_alphabet = {
-            "a": 0,
-            "b": 0,
-            "c": 0,
-            "d": 0,
-            "e": 0,
-            "f": 0,
-            "g": 0,
-            "h": 0,
-            "i": 0,
-            "j": 0,
-            "k": 0,
-            "l": 0,
-            "m": 0,
-            "n": 0,
-            "o": 0,
-            "p": 0,
-            "q": 0,
-            "r": 0,
-            "s": 0,
-            "t": 0,
-            "u": 0,
-            "v": 0,
-            "w": 0,
-            "x": 0,
-            "y": 0,
-            "z": 0
-        }
-        # Copy of alphabet dictionary that will only count the first occurance of each letter
-        contains_alphabet = total_alphabet.copy()
-        # Contains an alphabet dictionary for each slot in the word
-        slot_alphabet = [ total_alphabet.copy() for _ in range(5) ]
-
-        for word in self.word_bank["Words"]:
-            processed = ""
-            for i in range(5):
-                # if self.confirmed[i] == "":
-                letter = word[i]
-
-                # Count occurances of each letter in the remaining options. Good for presence. (1)
-                total_alphabet[letter] += 1
-
-                # Similar to above, but slot specific. This is better for correct placement. (2)
-                slot_alphabet[i][letter] += 1
-
-                # Only count the first occurance of each letter. Different statistic for duplicates
-                if letter not in processed:
-                    contains_alphabet[letter] += 1
-                    processed += letter
+        # Each word counts by its prior, so likelier solutions have more say in the letter values.
+        # The counting loop runs in the active kernel backend (see kernels.py)
+        codes = self.index.codes[self.word_bank["Row"].to_numpy()]
+        total, contains, slots = kernels.backend().letter_counts(codes, self.word_bank["Prior"].to_numpy())
+
+        # Count occurances of each letter in the remaining options. Good for presence. (1)
+        total_alphabet = dict(zip(ALPHABET, total.tolist()))
+        # Similar to above, but only the first occurance of each letter. Different statistic for duplicates
+        contains_alphabet = dict(zip(ALPHABET, contains.tolist()))
+        # Similar to the first, but slot specific. This is better for correct placement. (2)
+        slot_alphabet = [dict(zip(ALPHABET, slot.tolist())) for slot in slots]
 
         # # Iterate over letters an additional time
         # for i in range(5):
@@ -391,11 +584,29 @@ class WordBank:
 
         return odds
 
-    def search(self, word: str):
-        """ Helper function to be applied on the wordbank dataframe
+    def score_words(self, alphabet, slot: bool = False) -> np.ndarray:
+        """ solution_odds() for every remaining word at once, using the active kernel backend
 
-        TODO: Optimizations could be made here to make the search more accurate
-        TODO: Handle duplicate letters
+        Args:
+            alphabet (dict | list): letter counts (see generate_probs), a list of 5 if slot is True
+            slot (bool): whether the input alphabet is per slot or cumulative
+
+        Returns:
+            np.ndarray: the value of each word in the word bank, in order
+        """
+        # Table of each letter's share of its slot, divided the same way solution_odds does
+        if slot:
+            table = [[alphabet[i][letter] / sum(alphabet[i].values()) for letter in ALPHABET] for i in range(5)]
+        else:
+            count = sum(alphabet.values())
+            table = [[alphabet[letter] / count for letter in ALPHABET]] * 5
+        # Confirmed letters shouldn't affect the odds
+        active = np.array([letter == "" for letter in self.confirmed])
+        codes = self.index.codes[self.word_bank["Row"].to_numpy()]
+        return kernels.backend().slot_scores(codes, np.array(table), active)
+
+    def search(self, word: str) -> bool:
+        """ Checks a single word against the constraints (submit_guess filters them all at once)
 
         Args:
             word (str): input string that is being compared
@@ -403,18 +614,11 @@ class WordBank:
         Returns:
             bool: True if the word is a possible combination of letters
         """
-        for i in range(5):
-            # First, check to see if the letter is already confirmed, if so, skip to next character
-            if self.confirmed[i] != word[i]:
-                # If it's confirmed, but mismatched, then reject the word
-                if self.confirmed[i] != "":
-                    return False
-                # Second, check to see if any letters were rejected
-                if word[i] in self.rejected[i]:
-                    return False
-        # Finally, check to see that the word contains at least one of each possible letter
-        for c in self.possible:
-            if not c in word:
+        for i, letter in enumerate(word):
+            if not self.slot_allowed[i][ALPHABET.index(letter)]:
+                return False
+        for l, letter in enumerate(ALPHABET):
+            if not self.min_counts[l] <= word.count(letter) <= self.max_counts[l]:
                 return False
         return True
 
@@ -422,18 +626,21 @@ class WordBank:
         """ Gets a random word from the selection
 
         Args:
-            orig (bool, optional): Should it use the whole word bank selection or the narrowed? Defaults to True.
+            orig (bool, optional): Should it use the whole solution list or the narrowed? Defaults to True.
 
         Returns:
             str: The randomly chosen word.
         """
         if orig:
-            return self.original_bank["Words"][random.randint(0, len(self.original_bank["Words"]))]
-        return self.word_bank["Words"][random.randint(0, len(self.word_bank["Words"]))]
+            return self.solution_bank["Words"][random.randrange(len(self.solution_bank["Words"]))]
+        return self.word_bank["Words"][random.randrange(len(self.word_bank["Words"]))]
 
 if __name__ == "__main__":
     # Generate the Wordbank object (This loads the dictionary list)
     wb = WordBank(debug=True)
+    # Every result of a first guess, explored without playing it
+    BRANCHES = wb.branches("flash")
+    print(f"'flash' has {len(BRANCHES)} possible results, the largest leaves {max(map(len, BRANCHES.values()))} options")
     # wb.submit_guess(word="     ", res="00000", method="tot")
     # GUESS_COUNT = 1
 
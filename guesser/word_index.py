@@ -0,0 +1,164 @@
+""" @file word_index.py
+    @author Sean Duffie
+    @brief Precomputed array index over a word list
+
+    The WordBank dataframe is great for sorting and displaying, but answering "which words have
+    an 'a' in slot 2 and at least two 'e's" with apply() rescans every word each turn. This
+    index converts the word list into numpy arrays once, so those questions become a handful of
+    boolean array operations.
+"""
+import functools
+import time
+
+import kernels
+import numpy as np
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+
+# Highest letter count that the count masks track (5 letter words can't go past this)
+MAX_COUNT = 5
+
+
+class WordIndex():
+    """ Array representation of a word list
+
+        codes:       (N, 5) uint8 array, letter number (a=0 ... z=25) for each slot
+        counts:      (N, 26) uint8 array, how many times each letter appears in each word
+        slot_masks:  (5, 26, N) bool array, slot_masks[i][l] is True where slot i is letter l
+        count_masks: (26, MAX_COUNT + 1, N) bool array, count_masks[l][k] is True where
+                        letter l appears at least k times
+    """
+    def __init__(self, words):
+        self.words = np.array(list(words), dtype=str)
+        self.position = {word: i for i, word in enumerate(self.words)}
+
+        self.codes = np.frombuffer(
+            "".join(self.words).encode("ascii"),
+            dtype=np.uint8
+        ).reshape(-1, 5) - ord("a")
+
+        self.counts = np.zeros((len(self.words), 26), dtype=np.uint8)
+        for i in range(5):
+            np.add.at(self.counts, (np.arange(len(self.words)), self.codes[:, i]), 1)
+
+        self.slot_masks = np.stack([
+            self.codes[:, i][None, :] == np.arange(26)[:, None] for i in range(5)
+        ])
+        self.count_masks = self.counts.T[:, None, :] >= np.arange(MAX_COUNT + 1)[None, :, None]
+        # 26 bit mask of the letters in each word (bit 0 is a)
+        self.letter_bits = ((self.counts > 0) * (1 << np.arange(26, dtype=np.uint32))).sum(axis=1, dtype=np.uint32)
+
+    def __len__(self):
+        return len(self.words)
+
+    def constraint_mask(self, slot_allowed: np.ndarray, min_counts: np.ndarray, max_counts: np.ndarray,
+                        rows: np.ndarray = None) -> np.ndarray:
+        """ Finds the words that agree with every result so far, in one vectorized pass
+
+        Args:
+            slot_allowed (np.ndarray): (5, 26) bool, letters still allowed in each slot
+            min_counts (np.ndarray): (26,) fewest copies of each letter the solution can have
+            max_counts (np.ndarray): (26,) most copies of each letter the solution can have
+            rows (np.ndarray, optional): only check these rows of the index. Defaults to all.
+
+        Returns:
+            np.ndarray: boolean mask over the rows, True if the word is still possible
+        """
+        if rows is None:
+            rows = np.arange(len(self.words))
+        return kernels.backend().constraint_mask(self.codes[rows], self.counts[rows], slot_allowed,
+                                                 min_counts, max_counts)
+
+    def hard_mask(self, confirmed, min_counts) -> np.ndarray:
+        """ Finds every word that is a legal guess under hard mode rules
+
+        In hard mode every revealed hint has to be reused, green letters must stay in their
+        slot and yellow letters must appear somewhere in the guess.
+
+        Args:
+            confirmed (list): letter (or "") confirmed for each of the 5 slots
+            min_counts (np.ndarray): minimum number of each letter (26 long) revealed so far
+
+        Returns:
+            np.ndarray: boolean mask over the word list, True if the word is a legal guess
+        """
+        mask = np.ones(len(self.words), dtype=bool)
+        for i, letter in enumerate(confirmed):
+            if letter != "":
+                mask &= self.slot_masks[i][ord(letter) - ord("a")]
+        for letter in np.flatnonzero(min_counts):
+            mask &= self.count_masks[letter][min(min_counts[letter], MAX_COUNT)]
+        return mask
+
+
+def feedback_matrix(guesses: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """ Vectorized version of feedback.check() for many guesses against many solutions
+
+    Each result is packed as a base 3 number with the first slot as the most significant digit,
+    so int("02001", 3) is the same value this produces for that result string. Computed by the
+    active kernel backend (see kernels.py).
+
+    Args:
+        guesses (np.ndarray): (G, 5) letter codes of the guesses
+        targets (np.ndarray): (M, 5) letter codes of the possible solutions
+
+    Returns:
+        np.ndarray: (G, M) uint8 array of result codes (0 - 242)
+    """
+    return kernels.backend().feedback_matrix(guesses, targets)
+
+
+def partition_sizes(guesses: np.ndarray, targets: np.ndarray, chunk: int = 1024,
+                    deadline: float = None) -> np.ndarray:
+    """ Counts how many solutions land in each of the 243 results for every guess
+
+    Args:
+        guesses (np.ndarray): (G, 5) letter codes of the guesses
+        targets (np.ndarray): (M, 5) letter codes of the possible solutions
+        chunk (int, optional): guesses per batch, keeps the (G, M) matrix small. Defaults to 1024.
+        deadline (float, optional): time.perf_counter() to stop at, checked between batches.
+                                    The first batch is always counted. Defaults to no limit.
+
+    Returns:
+        np.ndarray: (G, 243) array of bucket sizes, only the first guesses if the deadline passed
+    """
+    sizes = np.zeros((guesses.shape[0], 243), dtype=np.int64)
+    for start in range(0, guesses.shape[0], chunk):
+        if start > 0 and deadline is not None and time.perf_counter() > deadline:
+            return sizes[:start]
+        codes = feedback_matrix(guesses[start:start+chunk], targets).astype(np.int64)
+        rows = codes.shape[0]
+        codes += 243 * np.arange(rows)[:, None]
+        sizes[start:start+rows] = np.bincount(codes.ravel(), minlength=243 * rows).reshape(rows, 243)
+    return sizes
+
+
+def popcount(bits: np.ndarray) -> np.ndarray:
+    """ Counts the set bits of each value in a uint32 array
+
+    Args:
+        bits (np.ndarray): uint32 bit masks
+
+    Returns:
+        np.ndarray: number of set bits in each mask
+    """
+    bits = bits - ((bits >> 1) & 0x55555555)
+    bits = (bits & 0x33333333) + ((bits >> 2) & 0x33333333)
+    bits = (bits + (bits >> 4)) & 0x0F0F0F0F
+    return (((bits * 0x01010101) & 0xFFFFFFFF) >> 24).astype(np.int64)
+
+
+@functools.lru_cache(maxsize=None)
+def load_index(words: tuple) -> WordIndex:
+    """ Builds the index for a word list once per process
+
+    The Tester builds a new WordBank for every simulated game, so the index is cached here
+    rather than rebuilt each time.
+
+    Args:
+        words (tuple): the word list (must be hashable to be cached)
+
+    Returns:
+        WordIndex: the shared index for that word list
+    """
+    return WordIndex(words)
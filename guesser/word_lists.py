@@ -0,0 +1,180 @@
+""" @file word_lists.py
+    @author Sean Duffie
+    @brief Refreshes the solver's word lists (valid_guesses.csv, valid_solutions.csv) from the web
+
+    Every source is fetched at the same time from a thread pool sharing one pooled session
+    (see web_scraper.make_session). Responses are cached on disk and re-requested with
+    If-None-Match / If-Modified-Since, so an unchanged source costs a 304 and no download.
+
+    The words from every source are validated (5 lowercase letters), merged into the current
+    list and deduplicated. Existing words keep their order and new ones are added at the end,
+    so a refresh never removes a word. A list is only rewritten when its content hash changes,
+    and only then are the in-process word indexes rebuilt.
+
+    Usage:
+        python word_lists.py            refresh from SOURCES
+
+    tests/test_word_lists.py runs the cache and the refresh against a local stand-in server.
+"""
+import concurrent.futures
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, NamedTuple
+
+import pandas as pd
+from bs4 import BeautifulSoup
+from files import write_atomic
+from web_scraper import CACHE_DIR, fetch_cached, make_session, parse_html
+
+RTDIR = os.path.dirname(__file__)
+ROOT = f"{RTDIR}/.."
+VALID_WORD = re.compile(r"^[a-z]{5}$")
+
+# Word list files, by the name sources refer to them with
+LISTS = {"solutions": "valid_solutions.csv", "guesses": "valid_guesses.csv"}
+
+
+class Source(NamedTuple):
+    """ A web page that lists words """
+    url: str
+    # Which list the words belong to ("guesses" or "solutions")
+    list: str
+    # "html" pages are parsed for word links (see web_scraper.parse_html), "text" is one word per line
+    kind: str = "text"
+
+
+SOURCES = [
+    Source("https://www.wordunscrambler.net/word-list/wordle-word-list", "guesses", "html"),
+]
+
+
+def parse_words(text: str, kind: str) -> List[str]:
+    """ Pulls the words out of a source
+
+    Args:
+        text (str): page text
+        kind (str): "html" or "text" (see Source)
+
+    Returns:
+        list: every word on the page, unvalidated
+    """
+    if kind == "html":
+        return list(parse_html(BeautifulSoup(text, "html.parser")))
+    return text.split()
+
+
+def fetch_sources(sources: List[Source], workers: int = 4, cache_dir: str = CACHE_DIR) -> Dict[Source, List[str]]:
+    """ Fetches every source concurrently
+
+    Args:
+        sources (list): sources to fetch
+        workers (int, optional): requests in flight at once. Defaults to 4.
+        cache_dir (str, optional): where responses are cached. Defaults to data/http_cache.
+
+    Returns:
+        dict: the words from each source that could be fetched
+    """
+    session = make_session(workers)
+    results = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fetch_cached, session, source.url, cache_dir): source for source in sources}
+        for future in concurrent.futures.as_completed(futures):
+            source = futures[future]
+            try:
+                text, downloaded = future.result()
+            except Exception as e:
+                print(f"Skipping {source.url}: {e}")
+                continue
+            results[source] = parse_words(text, source.kind)
+            print(f"{'Downloaded' if downloaded else 'Unchanged '} {source.url} ({len(results[source])} words)")
+    session.close()
+    return results
+
+
+def merge(*word_lists: List[str]) -> List[str]:
+    """ Combines word lists, keeping the first copy of each valid word in order
+
+    Args:
+        *word_lists (list): lists to merge, earlier lists come first
+
+    Returns:
+        list: the merged list
+    """
+    merged = {}
+    for words in word_lists:
+        for word in words:
+            word = str(word).strip().lower()
+            if VALID_WORD.match(word):
+                merged.setdefault(word, None)
+    return list(merged)
+
+
+def content_hash(words: List[str]) -> str:
+    """ Hash of a word list, used to tell whether it actually changed """
+    return hashlib.sha256("\n".join(words).encode("utf-8")).hexdigest()
+
+
+def read_list(path: str) -> List[str]:
+    """ Reads a word list csv (empty if it doesn't exist yet) """
+    if not os.path.exists(path):
+        return []
+    return list(pd.read_csv(filepath_or_buffer=path, names=["Words"], keep_default_na=False)["Words"])
+
+
+def refresh(sources: List[Source] = None, root: str = ROOT, workers: int = 4, cache_dir: str = CACHE_DIR) -> Dict[str, bool]:
+    """ Updates the word lists from their sources, only rewriting the ones that changed
+
+    Args:
+        sources (list, optional): sources to merge in. Defaults to SOURCES.
+        root (str, optional): folder with the word list csvs. Defaults to the repo root.
+        workers (int, optional): requests in flight at once. Defaults to 4.
+        cache_dir (str, optional): where responses are cached. Defaults to data/http_cache.
+
+    Returns:
+        dict: whether each list ("guesses", "solutions") was rewritten
+    """
+    if sources is None:
+        sources = SOURCES
+    fetched = fetch_sources(sources, workers, cache_dir)
+
+    changed = {}
+    merged = {}
+    # Solutions are merged first, since every solution also has to be a valid guess
+    for name, file in LISTS.items():
+        path = f"{root}/{file}"
+        current = read_list(path)
+        extra = [merged["solutions"]] if name == "guesses" else []
+        merged[name] = merge(current, *extra, *(words for source, words in fetched.items() if source.list == name))
+
+        changed[name] = content_hash(merged[name]) != content_hash(current)
+        if changed[name]:
+            write_atomic(path, pd.Series(merged[name]).to_csv(index=False, header=False, lineterminator="\n"))
+            print(f"{file}: {len(current)} -> {len(merged[name])} words")
+        else:
+            print(f"{file}: unchanged ({len(current)} words)")
+
+    # Record what the lists were built from, when that has changed
+    manifest = f"{root}/data/word_lists.json"
+    if any(changed.values()) or not os.path.exists(manifest):
+        os.makedirs(f"{root}/data", exist_ok=True)
+        with open(manifest, "w", encoding="utf-8") as file:
+            json.dump({
+                "sources": [source._asdict() for source in sources],
+                "lists": {name: {"file": LISTS[name], "words": len(words), "sha256": content_hash(words)}
+                          for name, words in merged.items()},
+            }, file, indent=4)
+
+    # The word indexes are built from the csvs once per process, so rebuild them on next use
+    if any(changed.values()):
+        from query import load_query_index
+        from word_index import load_index
+        load_index.cache_clear()
+        load_query_index.cache_clear()
+
+    return changed
+
+
+if __name__ == "__main__":
+    print(refresh())
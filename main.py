@@ -1,14 +1,298 @@
-"""_summary_
+""" @file main.py
+    @author Sean Duffie
+    @brief Command line entry point for the solver
+
+    Every subcommand imports only the modules it uses, and the heavy ones (pandas, selenium,
+    discord) are imported inside the subcommand, so "python main.py solve" shows its first
+    prompt before the solver has even finished loading.
+
+    Usage:
+        python main.py [--backend numba] <subcommand> ...
+        python main.py solve [--start flash] [--method slo] [--hard] [--budget 0.5]
+        python main.py simulate [--workers 4] [--shard 1/4] [--limit N] [--out games.csv]
+        python main.py sample crane slate [--samples 500] [--tolerance 0.1] [--seed 0] [--workers 4]
+        python main.py permutations [flash crane] [--method slo] [--memory]
+        python main.py worst flash crane [--limit 6] [--breadth 10] [--out worst.csv]
+        python main.py bench [--games 50] [--browser 3]
+        python main.py query "..ing -s"
+        python main.py daemon [--port 8765]
+        python main.py bot
 """
+import argparse
+import os
+import sys
+import threading
+
+RTDIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(f"{RTDIR}/guesser")
+
+METHODS = ["cum", "uni", "slo", "tot", "max", "two"]
+
+
+def read_solutions() -> list:
+    """ Reads the solution list without pandas """
+    with open(f"{RTDIR}/valid_solutions.csv", encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def launch_solve(args: argparse.Namespace):
+    """ Suggests guesses for a game being played somewhere else, from the results typed in """
+    from feedback import SOLVED, encode
+
+    # Load the solver in the background while the first guess is being played
+    loaded = {}
+    def load():
+        from word_bank import WordBank
+        loaded["wb"] = WordBank()
+    loader = threading.Thread(target=load, daemon=True)
+    loader.start()
+
+    guess = args.start
+    print(f"Play '{guess}'")
+    while True:
+        typed = input("Result (2 correct, 1 present, 0 absent, ex. 02001), '?02001' to preview one, "
+                      "or 'q' to quit: ").strip()
+        if typed == "q":
+            return
+        explore = typed.startswith("?")
+        try:
+            result = encode(typed.lstrip("?"))
+        except ValueError as e:
+            print(e)
+            continue
+        if result == SOLVED and not explore:
+            print(f"Solved with '{guess}'!")
+            return
+
+        loader.join()
+        wb = loaded["wb"]
+        if explore:
+            # Played on a fork, the real game doesn't change
+            child, suggestion = wb.what_if(guess, result, args.method, hard=args.hard, budget=args.budget)
+            if suggestion != "Failed":
+                print(f"If '{guess}' got {typed[1:]}: {child.word_bank['Words'].size} options left, play '{suggestion}'")
+            continue
+        guess = wb.submit_guess(guess, result, args.method, hard=args.hard, budget=args.budget)
+        if guess == "Failed":
+            print("No words match those results, check that they were typed correctly")
+            return
+        print(f"Play '{guess}' ({wb.word_bank['Words'].size} options left"
+              f"{'' if wb.exhaustive else ', best found in time'})")
+
+
+def launch_simulate(args: argparse.Namespace):
+    """ Plays the solver against every solution (or one shard of them) across worker processes """
+    import concurrent.futures
+    import csv
+    import itertools
+    import time
+
+    from sim_service import solve_game
+
+    solutions = read_solutions()
+    # Shards are strided, so each one gets an even mix of easy and hard words
+    index, count = (int(part) for part in args.shard.split("/"))
+    solutions = solutions[index - 1::count][:args.limit]
+
+    start = time.perf_counter()
+    params = (solutions, itertools.repeat(args.start), itertools.repeat(args.method), itertools.repeat(args.hard))
+    if args.workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor:
+            games = list(executor.map(solve_game, *params, chunksize=8))
+    else:
+        games = list(map(solve_game, *params))
+    elapsed = time.perf_counter() - start
+
+    counts = [len(game) for game, _, _ in games]
+    failures = [solution for solution, c in zip(solutions, counts) if c > 6]
+    print(f"Shard {args.shard}: {len(games)} games in {elapsed:.1f} seconds ({args.workers} workers)")
+    print(f"Average: {sum(counts) / max(len(counts), 1):.4f}, Max: {max(counts, default=0)}, "
+          f"Failures: {len(failures)} {failures}")
+
+    if args.out:
+        with open(args.out, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["Word", "Count", "Guesses"])
+            for solution, (game, _, _) in zip(solutions, games):
+                writer.writerow([solution, len(game), " ".join(guess for guess, _ in game)])
+
+
+def launch_sample(args: argparse.Namespace):
+    """ Estimates the average score of start words from a seeded sample of the solutions """
+    from tester import Tester
+    print(Tester().sample_openers(args.openers, method=args.method, samples=args.samples, batch=args.batch,
+                                  tolerance=args.tolerance, confidence=args.confidence, seed=args.seed,
+                                  hard=args.hard, workers=args.workers).to_string())
+
+
+def launch_permutations(args: argparse.Namespace):
+    """ Plays start words against every solution and saves the results (see Tester.permutations) """
+    from tester import Tester
+    Tester().permutations(method=args.method, hard=args.hard, start_words=args.openers or None, profile_memory=args.memory)
+
+
+def launch_worst(args: argparse.Namespace):
+    """ Finds how many guesses start words can guarantee in the worst case (see Tester.worst_cases) """
+    from tester import Tester
+    Tester().worst_cases(args.openers, limit=args.limit, breadth=args.breadth, out=args.out)
+
+
+def launch_bench(args: argparse.Namespace):
+    """ Times loading the solver, the vectorized kernels and full games """
+    import time
+
+    start = time.perf_counter()
+    from word_bank import WordBank
+    imported = time.perf_counter()
+    wb = WordBank()
+    built = time.perf_counter()
+    print(f"Import: {imported - start:.3f}s, WordBank: {built - imported:.3f}s")
+
+    import kernels
+    from word_index import feedback_matrix, partition_sizes
+    solutions = wb.index.codes[wb.word_bank["Row"].to_numpy()]
+    # Run once first, so a JIT backend is compiled before the timing starts
+    feedback_matrix(wb.index.codes[:1], solutions[:1])
+    print(f"Kernel backend: {kernels.backend_name()}")
+    start = time.perf_counter()
+    feedback_matrix(wb.index.codes, solutions)
+    middle = time.perf_counter()
+    partition_sizes(wb.index.codes, solutions)
+    end = time.perf_counter()
+    print(f"feedback_matrix {wb.index.codes.shape[0]}x{solutions.shape[0]}: {middle - start:.3f}s, "
+          f"partition_sizes: {end - middle:.3f}s")
+
+    from tester import Tester
+    tester = Tester()
+    words = read_solutions()[:args.games]
+    turns = 0
+    start = time.perf_counter()
+    for solution in words:
+        turns += len(list(tester.simulate(args.start, solution, args.method)))
+    elapsed = time.perf_counter() - start
+    print(f"{len(words)} games: {elapsed:.3f}s ({1000 * elapsed / max(len(words), 1):.1f} ms per game, "
+          f"{1000 * elapsed / max(turns, 1):.1f} ms per turn)")
+
+    if args.browser:
+        from local_wordle import benchmark
+        benchmark(words[:args.browser])
+
+
+def launch_query(args: argparse.Namespace):
+    """ Lists the words that match a query (see guesser/query.py for the syntax) """
+    from query import load_query_index
+    try:
+        results = load_query_index().query(" ".join(args.pattern))
+    except ValueError as e:
+        print(e)
+        return
+    print(f"{len(results)} matches: {results}")
+
+
+def launch_daemon(args: argparse.Namespace):
+    """ Runs the solver daemon (see guesser/solver_daemon.py) """
+    from solver_daemon import SolverEngine, make_server
+    server = make_server(SolverEngine(start=args.start), args.port)
+    print(f"Solver daemon listening on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+def launch_bot(args: argparse.Namespace):
+    """ Runs the Discord bot """
+    from discord_bot import DISCORD_TOKEN, wordle_bot
+    wordle_bot.run(DISCORD_TOKEN)
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """ Parses the command line
+
+    Args:
+        argv (list, optional): arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: the arguments, with the subcommand's function in "func"
+    """
+    parser = argparse.ArgumentParser(description="Wordle solver")
+    parser.add_argument("--backend", choices=["auto", "numpy", "numba"], default=None,
+                        help="kernel backend (see guesser/kernels.py), defaults to $WORDLE_BACKEND or auto")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    solve = commands.add_parser("solve", help="get guesses for a game by typing in its results")
+    solve.add_argument("--start", default="flash", help="first guess")
+    solve.add_argument("--method", choices=METHODS, default="slo", help="how guesses are scored")
+    solve.add_argument("--hard", action="store_true", help="only suggest hard mode guesses")
+    solve.add_argument("--budget", type=float, default=None, help="seconds each suggestion has to be ready in")
+    solve.set_defaults(func=launch_solve)
+
+    simulate = commands.add_parser("simulate", help="play every solution and report the scores")
+    simulate.add_argument("--start", default="flash", help="first guess")
+    simulate.add_argument("--method", choices=METHODS, default="slo", help="how guesses are scored")
+    simulate.add_argument("--hard", action="store_true", help="play by hard mode rules")
+    simulate.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    simulate.add_argument("--shard", default="1/1", help="only play shard i of n (ex. 2/4)")
+    simulate.add_argument("--limit", type=int, default=None, help="only play the first N solutions of the shard")
+    simulate.add_argument("--out", default=None, help="csv file to save every game to")
+    simulate.set_defaults(func=launch_simulate)
+
+    sample = commands.add_parser("sample", help="estimate start word scores from a random sample")
+    sample.add_argument("openers", nargs="+", help="start words to evaluate")
+    sample.add_argument("--method", choices=METHODS, default="slo", help="how guesses are scored")
+    sample.add_argument("--hard", action="store_true", help="play by hard mode rules")
+    sample.add_argument("--samples", type=int, default=500, help="most solutions to play per start word")
+    sample.add_argument("--batch", type=int, default=25, help="games between interval checks")
+    sample.add_argument("--tolerance", type=float, default=0.1, help="stop once the average is known to +/- this")
+    sample.add_argument("--confidence", type=float, default=0.95, help="confidence level of the intervals")
+    sample.add_argument("--seed", type=int, default=0, help="seed of the solution draw")
+    sample.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    sample.set_defaults(func=launch_sample)
+
+    permutations = commands.add_parser("permutations", help="play start words against every solution and save the results")
+    permutations.add_argument("openers", nargs="*", default=None, help="start words to run (defaults to flash)")
+    permutations.add_argument("--method", choices=METHODS, default="slo", help="how guesses are scored")
+    permutations.add_argument("--hard", action="store_true", help="play by hard mode rules")
+    permutations.add_argument("--memory", action="store_true", help="trace memory after every start word")
+    permutations.set_defaults(func=launch_permutations)
+
+    worst = commands.add_parser("worst", help="find how many guesses start words can guarantee")
+    worst.add_argument("openers", nargs="+", help="start words to analyze")
+    worst.add_argument("--limit", type=int, default=6, help="give up on a start word past this many guesses")
+    worst.add_argument("--breadth", type=int, default=10, help="guesses tried at each step of the search")
+    worst.add_argument("--out", default=None, help="csv file to save the report to")
+    worst.set_defaults(func=launch_worst)
+
+    bench = commands.add_parser("bench", help="time the solver")
+    bench.add_argument("--start", default="flash", help="first guess")
+    bench.add_argument("--method", choices=METHODS, default="slo", help="how guesses are scored")
+    bench.add_argument("--games", type=int, default=50, help="simulated games to time")
+    bench.add_argument("--browser", type=int, default=0, help="also time N browser games on the local page")
+    bench.set_defaults(func=launch_bench)
+
+    query = commands.add_parser("query", help="list the words that match a pattern")
+    query.add_argument("pattern", nargs="+", help="query (ex. '..ing -s', see guesser/query.py)")
+    query.set_defaults(func=launch_query)
+
+    daemon = commands.add_parser("daemon", help="run the solver daemon on localhost")
+    daemon.add_argument("--port", type=int, default=8765, help="port to listen on")
+    daemon.add_argument("--start", default="flash", help="first guess")
+    daemon.set_defaults(func=launch_daemon)
 
-def launch_bot():
-    pass
+    bot = commands.add_parser("bot", help="run the Discord bot")
+    bot.set_defaults(func=launch_bot)
 
-def launch_permutations():
-    pass
+    args = parser.parse_args(argv)
+    if args.command == "simulate":
+        index, _, count = args.shard.partition("/")
+        if not (index.isdigit() and count.isdigit() and 1 <= int(index) <= int(count)):
+            parser.error(f"--shard must look like i/n with 1 <= i <= n, not '{args.shard}'")
+    return args
 
-def launch_manual():
-    pass
 
 if __name__ == "__main__":
-    pass
+    ARGS = parse_args()
+    if ARGS.backend:
+        # Set in the environment so worker processes pick the same backend
+        os.environ["WORDLE_BACKEND"] = ARGS.backend
+    ARGS.func(ARGS)
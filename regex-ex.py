@@ -1,13 +1,14 @@
-import re
 import os
-import pandas as pd
+import sys
 
 RTDIR = os.path.dirname(__file__)
-df = pd.read_csv(filepath_or_buffer=f'{RTDIR}\\valid_guesses.csv', names=["Words"])
+sys.path.append(f"{RTDIR}/guesser")
+from query import load_query_index
 
+# Used to be a str.contains regex over the whole dataframe, see guesser/query.py for the syntax
 pattern = "..ing"
 
-mask = df["Words"].str.contains(pat=pattern, regex=True)
-new_df = df[mask].reset_index(drop=True)
+qi = load_query_index()
+matches = qi.query(pattern)
 
-print(new_df)
+print(matches)
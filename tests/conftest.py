@@ -0,0 +1,11 @@
+""" @file conftest.py
+    @author Sean Duffie
+    @brief Shared pytest setup
+
+    The solver modules import each other by their flat names (main.py adds guesser/ to the path
+    the same way), so the tests do too.
+"""
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "guesser"))
@@ -0,0 +1,46 @@
+""" @file test_feedback.py
+    @author Sean Duffie
+    @brief Result codes and their string forms
+"""
+import itertools
+
+import pytest
+from feedback import EMOJI, SOLVED, STRINGS, check, decode, encode, to_emoji
+
+
+def test_every_code_round_trips():
+    strings = ["".join(marks) for marks in itertools.product("012", repeat=5)]
+    # Ordered like base 3 numbers, so the code of a string is its position
+    assert [encode(string) for string in strings] == list(range(243))
+    assert [decode(code) for code in range(243)] == strings
+    assert list(STRINGS) == strings
+    assert encode("02001") == int("02001", 3) == 55
+    assert decode(SOLVED) == "22222"
+
+
+def test_codes_pass_through():
+    assert [encode(code) for code in (0, 55, SOLVED)] == [0, 55, SOLVED]
+
+
+@pytest.mark.parametrize("result", ["", "0200", "020011", "02003", "2222a", " 2222", -1, 243])
+def test_bad_results_are_rejected(result):
+    with pytest.raises(ValueError):
+        encode(result)
+
+
+def test_emoji():
+    assert to_emoji(encode("21000")) == ":green_square::yellow_square:" + ":black_large_square:" * 3
+    assert len(EMOJI) == 243
+
+
+@pytest.mark.parametrize("guess, solution, result", [
+    ("crane", "crane", "22222"),
+    ("crane", "react", "11201"),
+    # Only as many copies are marked as the solution has, greens first
+    ("speed", "abide", "00101"),
+    ("eerie", "there", "10102"),
+    ("sassy", "essay", "11202"),
+    ("llama", "allow", "12100"),
+])
+def test_check(guess, solution, result):
+    assert decode(check(guess, solution)) == result
@@ -0,0 +1,73 @@
+""" @file test_kernels.py
+    @author Sean Duffie
+    @brief Every installed kernel backend against the plain Python reference
+"""
+import collections
+import os
+import random
+
+import kernels
+import numpy as np
+import pytest
+from feedback import check
+from word_index import feedback_matrix, load_index, partition_sizes
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(params=list(kernels.BACKENDS))
+def backend(request):
+    """ Makes each backend the active one for a test, skipping the ones that aren't installed """
+    if request.param == "numba":
+        pytest.importorskip("numba")
+    previous = kernels._ACTIVE
+    kernels.set_backend(request.param)
+    yield request.param
+    kernels._ACTIVE = previous
+
+
+@pytest.fixture(scope="module")
+def words():
+    """ The guess list, and a seeded sample of it with extra repeated letter words """
+    with open(f"{ROOT}/valid_guesses.csv", encoding="utf-8") as file:
+        index = load_index(tuple(line.strip() for line in file if line.strip()))
+    rng = random.Random(0)
+    sample = rng.sample(list(index.words), 150)
+    sample += [word for word in index.words if len(set(word)) < 4][:50]
+    return index, [index.position[word] for word in sample]
+
+
+def test_verify(backend):
+    assert kernels.verify(backend)
+
+
+def test_feedback_matrix_matches_check(backend, words):
+    index, rows = words
+    codes = feedback_matrix(index.codes[rows], index.codes[rows])
+    expected = [[check(index.words[g], index.words[t]) for t in rows] for g in rows]
+    assert codes.dtype == np.uint8
+    assert np.array_equal(codes, np.array(expected))
+
+
+def test_partition_sizes_match_check(backend, words):
+    index, rows = words
+    # A small chunk, so the batches are stitched back together too
+    sizes = partition_sizes(index.codes[rows], index.codes[rows], chunk=64)
+    assert sizes.shape == (len(rows), 243)
+    for g, row in zip(rows, sizes):
+        counted = collections.Counter(check(index.words[g], index.words[t]) for t in rows)
+        assert dict(counted) == {code: size for code, size in enumerate(row) if size}
+
+
+def test_backends_agree(words):
+    pytest.importorskip("numba")
+    index, rows = words
+    previous = kernels._ACTIVE
+    try:
+        results = []
+        for name in kernels.BACKENDS:
+            kernels.set_backend(name)
+            results.append(feedback_matrix(index.codes, index.codes[rows]))
+    finally:
+        kernels._ACTIVE = previous
+    assert all(np.array_equal(results[0], result) for result in results[1:])
@@ -0,0 +1,54 @@
+""" @file test_query.py
+    @author Sean Duffie
+    @brief Query grammar checked against plain Python filters over the word list
+"""
+import re
+
+import pytest
+from query import load_query_index
+
+
+@pytest.fixture(scope="module")
+def qi():
+    return load_query_index()
+
+
+def words(qi) -> list:
+    return [str(word) for word in qi.words]
+
+
+@pytest.mark.parametrize("query, keep", [
+    ("..ing", lambda w: w.endswith("ing")),
+    ("S..E.", lambda w: w[0] == "s" and w[3] == "e"),
+    ("s[^ae].e.", lambda w: w[0] == "s" and w[1] not in "ae" and w[3] == "e"),
+    ("[ae]....", lambda w: w[0] in "ae"),
+    ("+ae", lambda w: "a" in w and "e" in w),
+    # A repeated letter asks for that many copies
+    ("+ee", lambda w: w.count("e") >= 2),
+    ("+eee", lambda w: w.count("e") >= 3),
+    ("-rtx", lambda w: not set(w) & set("rtx")),
+    ("e=2", lambda w: w.count("e") == 2),
+    ("e<=1", lambda w: w.count("e") <= 1),
+    ("e>=2", lambda w: w.count("e") >= 2),
+    ("a=0", lambda w: "a" not in w),
+    # Every token has to match
+    ("s..e. +a -rt", lambda w: w[0] == "s" and w[3] == "e" and "a" in w and not set(w) & set("rt")),
+    ("..... e>=2 -s", lambda w: w.count("e") >= 2 and "s" not in w),
+    ("", lambda w: True),
+])
+def test_query_matches_a_plain_filter(qi, query, keep):
+    assert qi.query(query) == [word for word in words(qi) if keep(word)]
+
+
+@pytest.mark.parametrize("query, message", [
+    ("..in", "Invalid pattern '..in'"),
+    ("..ings", "Invalid pattern '..ings'"),
+    ("..1ng", "Invalid pattern '..1ng'"),
+    ("s[ae.e.", "Invalid pattern 's[ae.e.'"),
+    ("+a1", "Invalid letter '1' in '+a1'"),
+    ("-r?", "Invalid letter '?' in '-r?'"),
+    ("..ing +é", "Invalid letter 'é' in '+é'"),
+])
+def test_bad_queries_are_rejected(qi, query, message):
+    with pytest.raises(ValueError, match=re.escape(message)):
+        qi.query(query)
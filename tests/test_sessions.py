@@ -0,0 +1,97 @@
+""" @file test_sessions.py
+    @author Sean Duffie
+    @brief Bounds, eviction and locking of the Discord bot's session store
+"""
+import asyncio
+import types
+
+import pytest
+import sessions
+from feedback import SOLVED, encode
+from sessions import SessionStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """ Time that only moves when a test says so """
+    now = types.SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(sessions, "time", types.SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_least_recently_used_is_evicted_at_capacity(clock):
+    store = SessionStore(max_sessions=2)
+    store.get(1, 0).add("flash", encode("00100"))
+    store.get(2, 0)
+    # Using the first game again makes the second one the least recently used
+    store.get(1, 0)
+    store.get(3, 0)
+    assert len(store) == 2
+    assert store.peek(2, 0) is None
+    assert store.peek(1, 0) is not None and store.peek(3, 0) is not None
+
+
+def test_peek_doesnt_count_as_use(clock):
+    store = SessionStore(max_sessions=2)
+    store.get(1, 0)
+    store.get(2, 0)
+    store.peek(1, 0)
+    store.get(3, 0)
+    assert store.peek(1, 0) is None
+
+
+def test_idle_sessions_expire(clock):
+    store = SessionStore(idle_seconds=60)
+    store.get(1, 0)
+    clock.value += 30
+    store.get(2, 0)
+    clock.value += 31
+    # Only the first game has been idle for over a minute
+    store.get(3, 0)
+    assert store.peek(1, 0) is None
+    assert store.peek(2, 0) is not None
+    clock.value += 61
+    store.evict()
+    assert len(store) == 0
+
+
+def test_evicted_session_starts_over(clock):
+    store = SessionStore(max_sessions=1)
+    game = store.get(1, 0)
+    game.add("flash", encode("00100"))
+    game.add("crane", SOLVED)
+    assert game.solved
+    store.get(2, 0)
+
+    again = store.get(1, 0)
+    assert again is not game
+    assert len(again) == 0 and not again.solved
+
+
+def test_turns_round_trip():
+    game = SessionStore().get(1, 0)
+    game.add("FLASH", encode("00100"))
+    game.add("crane", SOLVED)
+    assert list(game.turns()) == [("flash", encode("00100")), ("crane", SOLVED)]
+
+
+def test_user_lock_serializes_commands():
+    store = SessionStore()
+    order = []
+
+    async def command(user_id: int, name: str):
+        async with store.lock(user_id):
+            order.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            order.append(f"{name} end")
+
+    async def main():
+        await asyncio.gather(command(1, "a"), command(1, "b"), command(2, "c"))
+
+    asyncio.run(main())
+    # The same user's commands never overlap, another user's can run in between
+    a, b = order.index("a start"), order.index("b start")
+    assert order[a + 1:b].count("a end") == 1
+    assert order.index("c start") < order.index("a end")
+    # Locks are only kept while someone holds them
+    assert len(store.locks) == 0
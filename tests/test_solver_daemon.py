@@ -0,0 +1,67 @@
+""" @file test_solver_daemon.py
+    @author Sean Duffie
+    @brief Requests answered by the solver daemon's engine
+"""
+import pytest
+from feedback import check, decode, encode
+from solver_daemon import SolverEngine
+from word_bank import WordBank
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return SolverEngine()
+
+
+def test_answers_like_the_word_bank(engine):
+    wb = WordBank()
+    guess = wb.submit_guess("flash", encode("00100"), "slo")
+    response = engine.handle({"history": [["flash", "00100"]], "limit": 3})
+    assert response["guess"] == guess
+    assert response["remaining"] == len(wb.word_bank)
+    assert response["candidates"] == list(wb.word_bank["Words"][:3])
+    assert not response["solved"]
+
+
+def test_empty_history_suggests_the_opener(engine):
+    assert engine.handle({})["guess"] == engine.start
+
+
+def test_histories_share_their_cached_prefix(engine):
+    first = engine.handle({"history": [["crane", check("crane", "eerie")]]})
+    hits = engine.state.cache_info().hits
+    # Results can be sent as strings too, and guesses in any case
+    second = engine.handle({"history": [["CRANE", decode(check("crane", "eerie"))],
+                                        ["geese", check("geese", "eerie")]]})
+    assert engine.state.cache_info().hits > hits
+    assert second["remaining"] < first["remaining"]
+
+
+def test_solved_history(engine):
+    response = engine.handle({"history": [["flash", "00100"], ["cagey", "22222"]]})
+    assert response == {"guess": None, "remaining": 1, "candidates": ["cagey"], "solved": True}
+
+
+@pytest.mark.parametrize("request_body, message", [
+    # Five letters, but not a word the solver knows
+    ({"history": [["zzzzz", "00000"]]}, "Invalid guess 'zzzzz'"),
+    ({"history": [["four", "0000"]]}, None),
+    ({"history": [["flash", "0010"]]}, None),
+    ({"history": [["flash", "00100"]], "hard": "false"}, "Invalid hard 'false', expected true or false"),
+    ({"history": [["flash", "00100"]], "hard": 1}, None),
+    ({"history": "flash"}, None),
+])
+def test_bad_requests_return_an_error(engine, request_body, message):
+    response = engine.handle(request_body)
+    assert set(response) == {"error"}
+    if message is not None:
+        assert response["error"] == message
+
+
+def test_hard_mode_is_cached_separately(engine):
+    history = [["eerie", check("eerie", "there")]]
+    easy = engine.handle({"history": history})
+    hard = engine.handle({"history": history, "hard": True})
+    assert easy["remaining"] == hard["remaining"]
+    wb = WordBank()
+    assert hard["guess"] == wb.submit_guess("eerie", check("eerie", "there"), "slo", hard=True)
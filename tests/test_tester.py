@@ -0,0 +1,40 @@
+""" @file test_tester.py
+    @author Sean Duffie
+    @brief Opener search bounds and pruning
+"""
+import numpy as np
+import pytest
+import tester
+from tester import strategy_total
+from word_bank import WordBank
+
+
+@pytest.fixture(scope="module")
+def games():
+    return tester.Tester()
+
+
+@pytest.fixture(scope="module")
+def wb():
+    return WordBank()
+
+
+def test_strategy_total_matches_play_all(wb):
+    # play_all("crane", "slo") scores an average of 3.64415... (8418 guesses) with 3 failures
+    assert strategy_total(wb, "crane", "slo") == (8418, 3)
+
+
+@pytest.mark.parametrize("opener", ["crane", "qajaq"])
+def test_bounds_tighten_towards_the_played_score(wb, opener):
+    totals = [strategy_total(wb, opener, "slo", depth=depth)[0] for depth in (1, 2, 3, None)]
+    assert totals == sorted(totals)
+
+
+def test_realistic_incumbent_prunes_openers(games, tmp_path):
+    # slate plays an average of about 3.59, the others can't be told apart from it by the
+    # partition bound alone (every opener's is under 3.3), only by the deeper ones
+    openers = ["slate", "crane", "qajaq", "fuzzy", "xylyl", "jujus"]
+    board = games.search_openers(method="slo", openers=openers, out=str(tmp_path / "search.csv"))
+    assert list(board["Start"]) == ["slate"]
+    assert board["Average Score"][0] == pytest.approx(3.5887, abs=1e-4)
+    assert np.all(board["Lower Bound"] <= board["Average Score"])
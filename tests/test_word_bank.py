@@ -0,0 +1,174 @@
+""" @file test_word_bank.py
+    @author Sean Duffie
+    @brief WordBank filtering, state handling and time budgets
+"""
+import copy
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+from feedback import DIGITS, SOLVED, check, encode
+from word_bank import Snapshot, WordBank
+
+
+@pytest.fixture(scope="module")
+def root():
+    """ A fresh game, only ever forked so every test starts from the same state """
+    return WordBank()
+
+
+@pytest.mark.parametrize("method", ["max", "two"])
+def test_exhaustive_reports_a_cut_off_search(root, method):
+    finished = root.fork()
+    finished.submit_guess("qajaq", 0, method)
+    assert finished.exhaustive
+
+    # Too little time for the search over every guess against ~1,000 options
+    rushed = root.fork()
+    rushed.submit_guess("qajaq", 0, method, budget=0.001)
+    assert not rushed.exhaustive
+
+
+def consistent(word_bank: WordBank, history: list) -> set:
+    """ Brute force: every solution that would have given the same results """
+    return {
+        solution for solution in word_bank.solution_bank["Words"]
+        if all(check(guess, solution) == result for guess, result in history)
+    }
+
+
+def hard_legal(word: str, history: list) -> bool:
+    """ Brute force hard mode: greens stay in place, and every revealed copy of a letter is reused """
+    for guess, result in history:
+        marks = DIGITS[result]
+        if any(m == 2 and word[i] != guess[i] for i, m in enumerate(marks)):
+            return False
+        for letter in set(guess):
+            shown = sum(1 for c, m in zip(guess, marks) if c == letter and m > 0)
+            if word.count(letter) < shown:
+                return False
+    return True
+
+
+@pytest.mark.parametrize("history", [
+    # Repeated letters in the guess, the solution, or both
+    [("eerie", encode("10000"))],
+    [("eerie", check("eerie", "there"))],
+    [("geese", check("geese", "sheep"))],
+    [("llama", check("llama", "allow"))],
+    [("mamma", check("mamma", "madam"))],
+    # Gray after yellow (the second e) and gray after green (the second s) cap the count
+    [("speed", check("speed", "abide"))],
+    [("sassy", check("sassy", "essay"))],
+    # Constraints from several guesses have to combine
+    [("arose", check("arose", "error")), ("rarer", check("rarer", "error"))],
+    [("crane", check("crane", "eerie")), ("geese", check("geese", "eerie"))],
+    [("stale", check("stale", "fleet")), ("sleet", check("sleet", "fleet"))],
+])
+def test_filter_matches_brute_force(root, history):
+    wb = root.fork()
+    for guess, result in history:
+        wb.submit_guess(guess, result, "slo")
+    assert set(wb.word_bank["Words"]) == consistent(root, history)
+
+
+def test_filter_matches_brute_force_on_random_games(root):
+    # Words with repeated letters, where compiling the counts is easiest to get wrong
+    rng = random.Random(0)
+    repeats = [word for word in root.solution_bank["Words"] if len(set(word)) < 5]
+    for _ in range(40):
+        solution = rng.choice(repeats)
+        history = [(guess, check(guess, solution)) for guess in rng.sample(repeats, 2)]
+        wb = root.fork()
+        for guess, result in history:
+            wb.submit_guess(guess, result, "slo")
+        assert set(wb.word_bank["Words"]) == consistent(root, history), history
+
+
+@pytest.mark.parametrize("history", [
+    [("eerie", check("eerie", "there"))],
+    [("speed", check("speed", "abide"))],
+    [("llama", check("llama", "allow")), ("allay", check("allay", "allow"))],
+])
+def test_hard_mode_matches_brute_force(root, history):
+    wb = root.fork()
+    for guess, result in history:
+        suggestion = wb.submit_guess(guess, result, "slo", hard=True)
+    legal = {word for word in root.index.words if hard_legal(word, history)}
+    assert set(root.index.words[wb.hard_mask()]) == legal
+    assert suggestion in legal
+
+
+def state(wb: WordBank) -> dict:
+    """ Copy of everything submit_guess changes, to compare against later """
+    return copy.deepcopy(dict(zip(Snapshot._fields, wb.snapshot())))
+
+
+def assert_same_state(wb: WordBank, saved: dict):
+    for field, value in saved.items():
+        current = getattr(wb, field)
+        if isinstance(value, pd.DataFrame):
+            pd.testing.assert_frame_equal(current, value)
+        elif isinstance(value, np.ndarray):
+            assert np.array_equal(current, value), field
+        else:
+            assert current == value, field
+
+
+def test_fork_leaves_the_parent_unchanged(root):
+    parent = root.fork()
+    parent.submit_guess("crane", check("crane", "eerie"), "slo")
+    saved = state(parent)
+
+    child = parent.fork()
+    child.submit_guess("geese", check("geese", "eerie"), "tot")
+    assert_same_state(parent, saved)
+    assert set(child.word_bank["Words"]) < set(parent.word_bank["Words"])
+
+
+def test_what_if_leaves_the_parent_unchanged(root):
+    parent = root.fork()
+    parent.submit_guess("flash", encode("00100"), "slo")
+    saved = state(parent)
+
+    for method in ["slo", "max"]:
+        child, suggestion = parent.what_if("tamer", check("tamer", "wager"), method)
+        assert "wager" in set(child.word_bank["Words"])
+        assert suggestion != "Failed"
+    assert_same_state(parent, saved)
+
+    # And the same position as submitting the result directly
+    direct = parent.fork()
+    assert direct.submit_guess("tamer", check("tamer", "wager"), "max") == suggestion
+    assert_same_state(child, state(direct))
+
+
+def test_branches_split_the_options(root):
+    wb = root.fork()
+    wb.submit_guess("flash", encode("00100"), "slo")
+    saved = state(wb)
+    branches = wb.branches("tamer")
+    assert_same_state(wb, saved)
+
+    assert sum(len(rows) for rows in branches.values()) == len(wb.word_bank)
+    for result, rows in branches.items():
+        assert all(check("tamer", word) == result for word in wb.index.words[rows])
+
+
+def test_rollback_restores_the_earlier_state(root):
+    wb = root.fork()
+    wb.submit_guess("crane", check("crane", "sassy"), "slo")
+    saved = state(wb)
+    snapshot = wb.snapshot()
+
+    wb.submit_guess("sissy", check("sissy", "sassy"), "max", budget=0.001)
+    wb.submit_guess("sassy", SOLVED, "slo")
+    wb.rollback(snapshot)
+    assert_same_state(wb, saved)
+    # The game goes on from there as if the rolled back guesses never happened
+    replay = root.fork()
+    for guess in ["crane", "sissy"]:
+        suggestion = replay.submit_guess(guess, check(guess, "sassy"), "slo")
+    assert wb.submit_guess("sissy", check("sissy", "sassy"), "slo") == suggestion
+    assert_same_state(wb, state(replay))
@@ -0,0 +1,132 @@
+""" @file test_word_lists.py
+    @author Sean Duffie
+    @brief Word list refresh and HTTP cache tests against a local stand-in server
+"""
+import hashlib
+import http.server
+import os
+import shutil
+import threading
+
+import pytest
+import requests
+from web_scraper import fetch_cached
+from word_lists import LISTS, ROOT, Source, read_list, refresh
+
+
+class StandIn():
+    """ Serves one text file, with control over its validators and whether the server is up """
+    def __init__(self):
+        self.body = "crane\nCRANE\nzzzzz\nqwert\nfour\n12345\n"
+        # Send an ETag with every 200, so the next request can be answered with a 304
+        self.etag = True
+        self.statuses = []
+        stand_in = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            """ Answers with the current body, or a 304 if the client already has it """
+            def do_GET(self):
+                tag = f'"{hashlib.sha1(stand_in.body.encode("utf-8")).hexdigest()}"'
+                if stand_in.etag and self.headers.get("If-None-Match") == tag:
+                    stand_in.statuses.append(304)
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                body = stand_in.body.encode("utf-8")
+                stand_in.statuses.append(200)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                if stand_in.etag:
+                    self.send_header("ETag", tag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/words.txt"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """ Takes the server down, later requests fail to connect """
+        if self.thread.is_alive():
+            self.httpd.shutdown()
+            self.thread.join()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    stand_in = StandIn()
+    yield stand_in
+    stand_in.stop()
+
+
+@pytest.fixture
+def session():
+    with requests.Session() as pooled:
+        yield pooled
+
+
+def test_first_fetch_downloads_and_caches(server, session, tmp_path):
+    text, downloaded = fetch_cached(session, server.url, str(tmp_path))
+    assert (text, downloaded) == (server.body, True)
+    assert server.statuses == [200]
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_not_modified_reuses_the_cache(server, session, tmp_path):
+    fetch_cached(session, server.url, str(tmp_path))
+    text, downloaded = fetch_cached(session, server.url, str(tmp_path))
+    assert (text, downloaded) == (server.body, False)
+    assert server.statuses == [200, 304]
+
+
+def test_changed_body_is_downloaded(server, session, tmp_path):
+    fetch_cached(session, server.url, str(tmp_path))
+    server.body = "slate\n"
+    assert fetch_cached(session, server.url, str(tmp_path)) == ("slate\n", True)
+    assert server.statuses == [200, 200]
+    # The new copy is what gets revalidated next time
+    assert fetch_cached(session, server.url, str(tmp_path)) == ("slate\n", False)
+
+
+@pytest.mark.parametrize("etag", [True, False])
+def test_server_down_falls_back_to_the_cache(server, session, tmp_path, etag):
+    # Without an ETag there is nothing to revalidate with, but the cached copy still counts
+    server.etag = etag
+    body = server.body
+    fetch_cached(session, server.url, str(tmp_path))
+    server.stop()
+    assert fetch_cached(session, server.url, str(tmp_path)) == (body, False)
+
+
+def test_server_down_without_a_cache_raises(server, session, tmp_path):
+    server.stop()
+    with pytest.raises(requests.RequestException):
+        fetch_cached(session, server.url, str(tmp_path))
+
+
+def test_refresh_only_rewrites_changed_lists(server, tmp_path):
+    for list_file in LISTS.values():
+        shutil.copy(f"{ROOT}/{list_file}", tmp_path / list_file)
+    before = read_list(str(tmp_path / LISTS["guesses"]))
+    source = [Source(server.url, "guesses")]
+    cache = str(tmp_path / "cache")
+
+    # Only the valid new words are added, at the end, without removing any
+    assert refresh(source, root=str(tmp_path), cache_dir=cache) == {"solutions": False, "guesses": True}
+    after = read_list(str(tmp_path / LISTS["guesses"]))
+    assert after[:len(before)] == before
+    assert after[len(before):] == ["zzzzz", "qwert"]
+    modified = os.path.getmtime(tmp_path / LISTS["guesses"])
+    manifest = os.path.getmtime(tmp_path / "data" / "word_lists.json")
+
+    # The second refresh is a 304 and leaves the files alone
+    assert refresh(source, root=str(tmp_path), cache_dir=cache) == {"solutions": False, "guesses": False}
+    assert server.statuses[-1] == 304
+    assert os.path.getmtime(tmp_path / LISTS["guesses"]) == modified
+    assert os.path.getmtime(tmp_path / "data" / "word_lists.json") == manifest